@@ -2,13 +2,22 @@ from Storage import (
     HierarchicalStorageSystem, 
     MetricsCalculator, 
     DataObject,
+    StorageNodeType,
 )
 
 class AlgorithmBase:
     def __init__(self, sys: HierarchicalStorageSystem):
         self.sys = sys
-        self.metrics_calculator = MetricsCalculator(sys)
-        self.replication_factor = sys.config["num_data_replica"]
+        # Share the system's calculator, and so its cached metrics snapshot, when there is one
+        self.metrics_calculator = sys.metrics_calculator or MetricsCalculator(sys)
+
+    def required_capacity(self, data: DataObject, node_type: StorageNodeType) -> float:
+        """Capacity the data takes on a tier, with the redundancy scheme of the tier (replicas or erasure-coded fragments)."""
+        return self.sys.get_required_capacity(data.size, node_type)
+
+    def fits(self, data: DataObject, node_type: StorageNodeType) -> bool:
+        """Whether the tier has the available capacity to store the data."""
+        return self.sys.get_available_capacity(node_type) >= self.required_capacity(data, node_type)
 
     def apply(self, data: DataObject):
         """Method to be overridden by subclasses."""
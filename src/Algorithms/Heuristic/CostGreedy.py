@@ -13,17 +13,15 @@ class CostGreedy(AlgorithmBase):
         # Start with the current optimization score
         self.currentObject = currentData
 
-        required_capacity = currentData.size * self.replication_factor
-
-        if self.sys.get_available_capacity(StorageNodeType.SLOW) >= required_capacity:
+        if self.fits(currentData, StorageNodeType.SLOW):
             return StorageNodeType.SLOW
-        elif self.sys.get_available_capacity(StorageNodeType.MEDIUM) >= required_capacity:
+        elif self.fits(currentData, StorageNodeType.MEDIUM):
             return StorageNodeType.MEDIUM
-        elif self.sys.get_available_capacity(StorageNodeType.FAST) >= required_capacity:
+        elif self.fits(currentData, StorageNodeType.FAST):
             return StorageNodeType.FAST
         else:
              raise NoStorageAvailableException(
-            f"CostGreedy: No storage node available for data size: {format_data_size(required_capacity)} | "
+            f"CostGreedy: No storage node available for data size: {format_data_size(currentData.size)} | "
             f"FAST: {format_data_size(self.sys.get_available_capacity(StorageNodeType.FAST))}, "
             f"MEDIUM: {format_data_size(self.sys.get_available_capacity(StorageNodeType.MEDIUM))}, "
             f"SLOW: {format_data_size(self.sys.get_available_capacity(StorageNodeType.SLOW))}"
@@ -12,8 +12,6 @@ class HybridGreedy(AlgorithmBase):
         """
         self.currentObject = currentData
 
-        required_capacity = currentData.size * self.replication_factor
-
         # Define weights for each criterion (adjust as needed)
         weights = {
             "cost": 0.3,
@@ -43,11 +41,11 @@ class HybridGreedy(AlgorithmBase):
 
         # Select the best storage node that has enough capacity
         for node_type, score in sorted_nodes:
-            if self.sys.get_available_capacity(node_type) >= required_capacity:
+            if self.fits(currentData, node_type):
                 return node_type
 
         raise NoStorageAvailableException(
-            f"HybridGreedy: No storage node available for data size: {format_data_size(required_capacity)} | "
+            f"HybridGreedy: No storage node available for data size: {format_data_size(currentData.size)} | "
             f"FAST: {format_data_size(self.sys.get_available_capacity(StorageNodeType.FAST))}, "
             f"MEDIUM: {format_data_size(self.sys.get_available_capacity(StorageNodeType.MEDIUM))}, "
             f"SLOW: {format_data_size(self.sys.get_available_capacity(StorageNodeType.SLOW))}"
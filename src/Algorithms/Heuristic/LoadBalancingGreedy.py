@@ -12,8 +12,6 @@ class LoadBalancingGreedy(AlgorithmBase):
         """
         self.currentObject = currentData
 
-        required_capacity = currentData.size * self.replication_factor
-
         # Get current usage per storage node type
         usage = {
             StorageNodeType.FAST: self.sys.get_used_storage_size(StorageNodeType.FAST),
@@ -26,11 +24,11 @@ class LoadBalancingGreedy(AlgorithmBase):
 
         # Select the least loaded storage node that has enough capacity
         for node_type, load in sorted_nodes:
-            if self.sys.get_available_capacity(node_type) >= required_capacity:
+            if self.fits(currentData, node_type):
                 return node_type
 
         raise NoStorageAvailableException(
-            f"LoadBalancingGreedy: No storage node available for data size: {format_data_size(required_capacity)} | "
+            f"LoadBalancingGreedy: No storage node available for data size: {format_data_size(currentData.size)} | "
             f"FAST: {format_data_size(self.sys.get_available_capacity(StorageNodeType.FAST))}, "
             f"MEDIUM: {format_data_size(self.sys.get_available_capacity(StorageNodeType.MEDIUM))}, "
             f"SLOW: {format_data_size(self.sys.get_available_capacity(StorageNodeType.SLOW))}"
@@ -17,21 +17,19 @@ class RandomSelection(AlgorithmBase):
 
       possible_nodes = []
 
-      required_capacity = currentData.size * self.replication_factor
-
       # Get the list of storage nodes
-      if self.sys.get_available_capacity(StorageNodeType.FAST) >= required_capacity:
+      if self.fits(currentData, StorageNodeType.FAST):
           possible_nodes.append(StorageNodeType.FAST)
 
-      if self.sys.get_available_capacity(StorageNodeType.MEDIUM) >= required_capacity:
+      if self.fits(currentData, StorageNodeType.MEDIUM):
           possible_nodes.append(StorageNodeType.MEDIUM)
 
-      if self.sys.get_available_capacity(StorageNodeType.SLOW) >= required_capacity:
+      if self.fits(currentData, StorageNodeType.SLOW):
           possible_nodes.append(StorageNodeType.SLOW)
 
       if len(possible_nodes) == 0:
            raise NoStorageAvailableException(
-            f"RandomSelection: No storage node available for data size: {format_data_size(required_capacity)} | "
+            f"RandomSelection: No storage node available for data size: {format_data_size(currentData.size)} | "
             f"FAST: {format_data_size(self.sys.get_available_capacity(StorageNodeType.FAST))}, "
             f"MEDIUM: {format_data_size(self.sys.get_available_capacity(StorageNodeType.MEDIUM))}, "
             f"SLOW: {format_data_size(self.sys.get_available_capacity(StorageNodeType.SLOW))}"
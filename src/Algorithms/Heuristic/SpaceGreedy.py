@@ -23,16 +23,14 @@ class SpaceGreedy(AlgorithmBase):
         # Sort storage nodes by available space in descending order
         sorted_nodes = sorted(capacities.items(), key=lambda x: x[1], reverse=True)
 
-        required_capacity = currentData.size * self.replication_factor
-
         # Select the storage node with the most available space that can fit the data
         for node, capacity in sorted_nodes:
-            if capacity >= required_capacity:
+            if capacity >= self.required_capacity(currentData, node):
                 return node
 
         # If no storage node can accommodate the data, raise an error
         raise NoStorageAvailableException(
-            f"SpaceGreedy: No storage node available for data size: {format_data_size(required_capacity)} | "
+            f"SpaceGreedy: No storage node available for data size: {format_data_size(currentData.size)} | "
             f"FAST: {format_data_size(self.sys.get_available_capacity(StorageNodeType.FAST))}, "
             f"MEDIUM: {format_data_size(self.sys.get_available_capacity(StorageNodeType.MEDIUM))}, "
             f"SLOW: {format_data_size(self.sys.get_available_capacity(StorageNodeType.SLOW))}"
@@ -1,4 +1,13 @@
 from .AlgorithmBase import AlgorithmBase
 from .exceptions import NoStorageAvailableException
-from .RL.DQN import DQN
-from .RL.RLTrainer import RLTrainer
\ No newline at end of file
+
+def __getattr__(name):
+    # The RL algorithms need their own dependencies, they are imported on first use only
+    # so that the heuristics and the simulator can be used without them
+    if name == "DQN":
+        from .RL.DQN import DQN
+        return DQN
+    if name == "RLTrainer":
+        from .RL.RLTrainer import RLTrainer
+        return RLTrainer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
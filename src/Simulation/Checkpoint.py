@@ -0,0 +1,32 @@
+import os
+import pickle
+import zlib
+
+from utils.logger import logger
+
+CHECKPOINT_MAGIC = b"SIMCKPT1"
+COMPRESSION_LEVEL = 1  # Fast, checkpoints are written periodically during the run
+
+def save_checkpoint(path: str, state: dict):
+    """
+    Write a checkpoint atomically: the compressed pickle of `state` is written to a temporary
+    file that replaces `path` once it is on disk, so a crash never leaves a partial checkpoint.
+    """
+    payload = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), COMPRESSION_LEVEL)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(CHECKPOINT_MAGIC)
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+    logger.info(f"Checkpoint: Saved {len(payload)} bytes to {path}.")
+
+def load_checkpoint(path: str) -> dict:
+    """Read a checkpoint written by save_checkpoint()."""
+    with open(path, "rb") as file:
+        magic = file.read(len(CHECKPOINT_MAGIC))
+        if magic != CHECKPOINT_MAGIC:
+            raise ValueError(f"Checkpoint: {path} is not a simulation checkpoint.")
+        payload = file.read()
+    return pickle.loads(zlib.decompress(payload))
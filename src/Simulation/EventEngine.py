@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from heapq import heappush, heappop
+from typing import Callable, Optional, Sequence
+
+from utils.logger import logger
+
+@dataclass
+class EngineStats:
+    """Statistics of an event engine run, times in milliseconds of simulated time."""
+    num_events: int = 0
+    num_arrivals: int = 0
+    num_completions: int = 0
+    start_time: float = 0
+    end_time: float = 0
+    max_in_flight: int = 0
+    in_flight_time: float = 0  # Integral of the number of in-flight operations over time
+
+    @property
+    def makespan(self) -> float:
+        return self.end_time - self.start_time
+
+    @property
+    def mean_in_flight(self) -> float:
+        return self.in_flight_time / self.makespan if self.makespan > 0 else 0
+
+    @property
+    def throughput(self) -> float:
+        """Completed operations per second of simulated time."""
+        return self.num_completions * 1000 / self.makespan if self.makespan > 0 else 0
+
+class EventEngine:
+    def __init__(self):
+        """
+        Arrival-ordered replay of operations with completion timestamps, on a simulated clock.
+
+        Two kinds of events are processed in time order:
+          - arrivals, one per operation of the trace, at the trace `time`;
+          - completions, at arrival time + the service time returned by the arrival handler.
+
+        The arrival handler runs the whole operation, so its effects on the model are applied at
+        arrival time. A completion only ends the operation in the engine statistics (in-flight
+        operations, makespan, throughput). Operations overlap in time but not in the storage state:
+        an operation sees the effects of every operation that arrived before it, completed or not.
+        Contention between overlapping operations is modeled by the service queues, which keep the
+        node and medium channels busy from the arrival of a request to its completion.
+
+        Arrivals come from an already sorted sequence and are merged with a binary heap of
+        pending completions, so only completions pay for heap operations and consecutive
+        completions due before the next arrival are drained in one batch. On equal times,
+        completions are processed before the arrival.
+        """
+        self.now = 0.0
+        self.stats = EngineStats()
+        self._completions = []  # heap of completion times
+
+    def run(
+        self,
+        arrival_times: Sequence[float],
+        on_arrival: Callable[[int, float], Optional[float]],
+        on_completion: Optional[Callable[[float], None]] = None,
+        drain: bool = True,
+    ) -> EngineStats:
+        """
+        Run the simulation until every arrival has been handled and every operation completed.
+
+        Args:
+            arrival_times (Sequence[float]): Arrival time of each operation in ms, non decreasing.
+            on_arrival (Callable): Called with (operation index, arrival time), returns the service
+                time of the operation in ms, or None if the operation is dropped (no completion).
+            on_completion (Callable): Optional, called with the completion time of each operation.
+            drain (bool): Process the completions left after the last arrival. Use False to feed the
+                arrivals in several calls, the pending completions are kept for the next call.
+
+        Returns:
+            EngineStats: Statistics of the run.
+        """
+        stats = self.stats
+        completions = self._completions
+        now = self.now
+        in_flight = len(completions)
+        max_in_flight = stats.max_in_flight
+        in_flight_time = stats.in_flight_time
+        num_completions = stats.num_completions
+        num_arrivals = stats.num_arrivals
+
+        if arrival_times and num_arrivals == 0 and not completions:
+            now = stats.start_time = arrival_times[0]
+
+        for index, arrival_time in enumerate(arrival_times):
+            if arrival_time < now:
+                raise ValueError(f"EventEngine: arrival time {arrival_time} of operation {index} is before the current time {now}.")
+
+            # Drain the completions due before this arrival
+            while completions and completions[0] <= arrival_time:
+                completion_time = heappop(completions)
+                in_flight_time += in_flight * (completion_time - now)
+                now = completion_time
+                in_flight -= 1
+                num_completions += 1
+                if on_completion is not None:
+                    on_completion(completion_time)
+
+            in_flight_time += in_flight * (arrival_time - now)
+            now = arrival_time
+            num_arrivals += 1
+
+            self.now = now
+            service_time = on_arrival(index, arrival_time)
+            if service_time is None:
+                continue
+
+            heappush(completions, arrival_time + service_time)
+            in_flight += 1
+            if in_flight > max_in_flight:
+                max_in_flight = in_flight
+
+        while drain and completions:
+            completion_time = heappop(completions)
+            in_flight_time += in_flight * (completion_time - now)
+            now = completion_time
+            in_flight -= 1
+            num_completions += 1
+            if on_completion is not None:
+                on_completion(completion_time)
+
+        self.now = now
+        stats.end_time = now
+        stats.num_arrivals = num_arrivals
+        stats.num_completions = num_completions
+        stats.num_events = num_arrivals + num_completions
+        stats.max_in_flight = max_in_flight
+        stats.in_flight_time = in_flight_time
+
+        logger.info(
+            f"EventEngine: Processed {stats.num_events} events, makespan {stats.makespan:.3f} ms, "
+            f"max in flight {stats.max_in_flight}."
+        )
+        return stats
+
+    def reset(self):
+        self.now = 0.0
+        self.stats = EngineStats()
+        self._completions.clear()
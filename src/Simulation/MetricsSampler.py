@@ -0,0 +1,163 @@
+import json
+import os
+import numpy as np
+from typing import List, Optional
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator, LatencyHistogram
+from Storage.storage_types import RequestType
+from utils.logger import logger
+
+# Cumulative counters read from every node, the series stores their per-window deltas
+NODE_COUNTERS = [
+    "num_reads",
+    "num_writes",
+    "num_deletes",
+    "num_unavailable",
+    "total_read_response_time",
+    "total_write_response_time",
+    "total_delete_response_time",
+]
+
+class MetricsSampler:
+    def __init__(
+        self,
+        storage_system: HierarchicalStorageSystem,
+        metrics_calculator: MetricsCalculator,
+        output_path: str,
+        window_ops: Optional[int] = None,
+        window_ms: Optional[float] = None,
+    ):
+        """
+        Sample windowed metrics while the simulation runs and stream them to a binary series file.
+
+        A window is closed every `window_ops` operations and/or every `window_ms` of simulated time
+        (the `time` field of the trace). For each window the sampler stores the deltas of the node
+        counters aggregated per tier, the per-tier utilization, the ESR and the latency percentiles
+        of the requests served during the window. Sampling only reads per-node aggregates, so a
+        window costs O(nodes) regardless of the number of files.
+
+        The series is written as rows of float64 values to `output_path`, the column names are
+        written to `output_path + ".json"`. Use MetricsSampler.load_series() to read it back.
+        """
+        if window_ops is None and window_ms is None:
+            raise ValueError("MetricsSampler: window_ops or window_ms must be set.")
+
+        self.storage_system = storage_system
+        self.metrics_calculator = metrics_calculator
+        self.output_path = output_path
+        self.window_ops = window_ops
+        self.window_ms = window_ms
+
+        self.node_types = storage_system.get_node_types()
+        self.columns = self._build_columns()
+
+        self.num_windows = 0
+        self.ops_in_window = 0
+        self.total_ops = 0
+        self.window_start_time: Optional[float] = None
+        self._previous_counters = self._read_counters()
+        self._previous_histograms = self._read_histograms()
+
+        with open(self.output_path + ".json", "w") as file:
+            json.dump({"dtype": "float64", "columns": self.columns}, file)
+        self._file = open(self.output_path, "wb")
+
+    def __getstate__(self):
+        # The series file is reopened on unpickling (e.g. when resuming from a checkpoint)
+        if not self._file.closed:
+            self._file.flush()
+        state = self.__dict__.copy()
+        state["_file_closed"] = self._file.closed
+        del state["_file"]
+        return state
+
+    def __setstate__(self, state):
+        file_closed = state.pop("_file_closed")
+        self.__dict__.update(state)
+        # Drop the windows written after the state was saved
+        mode = "r+b" if os.path.exists(self.output_path) else "w+b"
+        self._file = open(self.output_path, mode)
+        self._file.truncate(self.num_windows * len(self.columns) * np.dtype(np.float64).itemsize)
+        self._file.seek(0, os.SEEK_END)
+        if file_closed:
+            self._file.close()
+
+    def _build_columns(self) -> List[str]:
+        columns = ["window", "num_ops", "start_time", "end_time"]
+        for node_type in self.node_types:
+            tier = node_type.name.lower()
+            columns += [f"{tier}_{counter}" for counter in NODE_COUNTERS]
+            columns.append(f"{tier}_utilization")
+        columns.append("estimated_system_response")
+        for request_type in RequestType:
+            name = request_type.value
+            columns += [f"{name}_count", f"{name}_p50", f"{name}_p90", f"{name}_p99", f"{name}_p99.9", f"{name}_max"]
+        return columns
+
+    def _read_counters(self) -> np.ndarray:
+        """Read the cumulative node counters aggregated per tier, shape (num tiers, num counters)."""
+        counters = np.zeros((len(self.node_types), len(NODE_COUNTERS)))
+        for i, node_type in enumerate(self.node_types):
+            for node in self.storage_system.get_nodes(node_type):
+                counters[i] += [getattr(node, counter) for counter in NODE_COUNTERS]
+        return counters
+
+    def _read_histograms(self) -> dict:
+        return {
+            request_type: self.metrics_calculator.get_latency_histogram(request_type)
+            for request_type in RequestType
+        }
+
+    def on_operation(self, op_time: float):
+        """Call after every executed operation with its simulated time."""
+        if self.window_start_time is None:
+            self.window_start_time = op_time
+
+        self.ops_in_window += 1
+        self.total_ops += 1
+
+        if self.window_ops is not None and self.ops_in_window >= self.window_ops:
+            self.sample(op_time)
+        elif self.window_ms is not None and op_time - self.window_start_time >= self.window_ms:
+            self.sample(op_time)
+
+    def sample(self, now: float):
+        """Close the current window at the simulated time `now` and write it to the series."""
+        counters = self._read_counters()
+        histograms = self._read_histograms()
+
+        row = [self.num_windows, self.ops_in_window, self.window_start_time or 0, now]
+        for i, node_type in enumerate(self.node_types):
+            row += list(counters[i] - self._previous_counters[i])
+            row.append(self.storage_system.get_utilization(node_type))
+        row.append(self.metrics_calculator.calculate_estimated_system_response())
+        for request_type in RequestType:
+            window_histogram: LatencyHistogram = histograms[request_type].difference(self._previous_histograms[request_type])
+            summary = window_histogram.get_summary()
+            row += [summary["count"], summary["p50"], summary["p90"], summary["p99"], summary["p99.9"], summary["max"]]
+
+        np.asarray(row, dtype=np.float64).tofile(self._file)
+
+        logger.info(f"MetricsSampler: Window {self.num_windows} sampled after {self.total_ops} operations.")
+
+        self.num_windows += 1
+        self.ops_in_window = 0
+        self.window_start_time = now
+        self._previous_counters = counters
+        self._previous_histograms = histograms
+
+    def close(self, now: float = None):
+        """Write the last, partial window and close the series file."""
+        if self._file.closed:
+            return
+        if self.ops_in_window > 0:
+            self.sample(now if now is not None else self.window_start_time)
+        self._file.close()
+
+    @staticmethod
+    def load_series(path: str) -> np.ndarray:
+        """Load a series written by a MetricsSampler as a structured array with one field per column."""
+        with open(path + ".json", "r") as file:
+            header = json.load(file)
+        dtype = np.dtype([(column, header["dtype"]) for column in header["columns"]])
+        return np.fromfile(path, dtype=dtype)
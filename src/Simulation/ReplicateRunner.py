@@ -0,0 +1,200 @@
+import math
+import os
+import random
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, List
+
+from utils.logger import logger
+from .Trace import Trace
+
+# Metrics counting events (successful writes, unavailable nodes...) are integers: an interval of
+# ±0.5 around their mean cannot be told apart from an exact count, and is reachable by the counts
+# of rare events whose mean is near 0, unlike any interval relative to the mean.
+COUNT_METRIC_PREFIX = "total_num_"
+COUNT_HALF_WIDTH = 0.5
+
+def t_cdf(t: float, degrees_of_freedom: int) -> float:
+    """CDF of the Student t distribution, exact for integer degrees of freedom (Abramowitz & Stegun 26.7.3-4)."""
+    v = degrees_of_freedom
+    theta = math.atan(t / math.sqrt(v))
+    cos_squared = math.cos(theta) ** 2
+
+    # P(|T| <= |t|), signed like t, from a finite series in cos²(theta)
+    term = total = 1.0
+    if v % 2:
+        for k in range(1, (v - 1) // 2):
+            term *= 2 * k / (2 * k + 1) * cos_squared
+            total += term
+        probability = 2 / math.pi * (theta + (math.sin(theta) * math.cos(theta) * total if v > 1 else 0))
+    else:
+        for k in range(1, v // 2):
+            term *= (2 * k - 1) / (2 * k) * cos_squared
+            total += term
+        probability = math.sin(theta) * total
+    return (1 + probability) / 2
+
+def t_quantile(p: float, degrees_of_freedom: int) -> float:
+    """
+    Quantile of the Student t distribution.
+
+    Exact for 1 and 2 degrees of freedom. Otherwise the Cornish-Fisher expansion around the
+    normal quantile (off by 4e-3 at 3 degrees of freedom) is refined by Newton steps on t_cdf().
+    """
+    if degrees_of_freedom < 1:
+        raise ValueError("t_quantile: degrees_of_freedom must be at least 1.")
+    if degrees_of_freedom == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if degrees_of_freedom == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+
+    z = NormalDist().inv_cdf(p)
+    v = degrees_of_freedom
+    t = (
+        z
+        + (z ** 3 + z) / (4 * v)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3)
+        + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * v ** 4)
+    )
+    log_density_scale = math.lgamma((v + 1) / 2) - math.lgamma(v / 2) - 0.5 * math.log(v * math.pi)
+    for _ in range(3):
+        density = math.exp(log_density_scale - (v + 1) / 2 * math.log1p(t * t / v))
+        t -= (t_cdf(t, v) - p) / density
+    return t
+
+@dataclass
+class MetricEstimate:
+    """Mean of a metric over the replicates with its confidence interval (mean ± half_width)."""
+    mean: float
+    std: float
+    half_width: float
+    num_replicates: int
+
+    def is_precise(self, relative_half_width: float, absolute_half_width: float = 0.0) -> bool:
+        """The half-width is within `relative_half_width` of the mean, or within `absolute_half_width`."""
+        return self.half_width <= max(relative_half_width * abs(self.mean), absolute_half_width)
+
+def _run_replicate(trace_dir: str, algorithm: type, config: dict, seed: int) -> dict:
+    """Entry point of the worker processes, simulates one replicate and returns its metrics."""
+    from .Simulator import Simulator
+
+    random.seed(seed)
+    np.random.seed(seed)
+    result = Simulator.simulate(Trace.load(trace_dir), algorithm, **config)
+    return {name: value for name, value in result.metrics.items() if name != "algorithm"}
+
+class ReplicateRunner:
+    def __init__(
+        self,
+        trace: Trace,
+        algorithm: type,
+        config: dict = None,
+        confidence: float = 0.95,
+        relative_half_width: float = 0.05,
+        min_replicates: int = 5,
+        max_replicates: int = 30,
+        max_workers: int = None,
+        base_seed: int = 0,
+        absolute_half_widths: Dict[str, float] = None,
+    ):
+        """
+        Run independent replicates (seeds) of a simulation and estimate every result metric
+        with a Student t confidence interval.
+
+        Replicates run in batches of `max_workers` seeds in a process pool. After each batch,
+        once `min_replicates` are done, the runner stops as soon as the half-width of the
+        confidence interval of every metric is within `relative_half_width` of its mean or
+        within the absolute half-width of the metric, or when `max_replicates` are done.
+        A relative tolerance alone is never reached by a metric whose mean is near 0 but whose
+        variance is not, so the count metrics have an absolute half-width of COUNT_HALF_WIDTH
+        and the others 0 unless `absolute_half_widths` sets them.
+
+        Args:
+            trace (Trace): Parsed access pattern, shared by all the replicates.
+            algorithm (type): AlgorithmBase class to simulate.
+            config (dict): Keyword arguments of the Simulator (storage_config, node_config, ...).
+            confidence (float): Confidence level of the intervals.
+            relative_half_width (float): Target half-width of the intervals relative to the mean.
+            min_replicates, max_replicates (int): Bounds of the number of replicates.
+            max_workers (int): Worker processes, one per CPU by default.
+            base_seed (int): Replicate i is seeded with base_seed + i.
+            absolute_half_widths (dict[str, float]): Absolute half-width under which a metric is
+                precise whatever its mean, per metric name.
+        """
+        if min_replicates < 2 or max_replicates < min_replicates:
+            raise ValueError("ReplicateRunner: need 2 <= min_replicates <= max_replicates.")
+
+        self.trace = trace
+        self.algorithm = algorithm
+        self.config = config or {}
+        self.confidence = confidence
+        self.relative_half_width = relative_half_width
+        self.min_replicates = min_replicates
+        self.max_replicates = max_replicates
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.base_seed = base_seed
+        self.absolute_half_widths = absolute_half_widths or {}
+
+        self.replicates: List[dict] = []
+
+    def estimate(self) -> Dict[str, MetricEstimate]:
+        """Estimate every metric from the replicates done so far."""
+        n = len(self.replicates)
+        if n < 2:
+            raise ValueError("ReplicateRunner: at least 2 replicates are needed to estimate a confidence interval.")
+
+        quantile = t_quantile(0.5 + self.confidence / 2, n - 1)
+        estimates = {}
+        for name in self.replicates[0]:
+            values = np.array([replicate[name] for replicate in self.replicates], dtype=np.float64)
+            std = float(values.std(ddof=1))
+            estimates[name] = MetricEstimate(
+                mean=float(values.mean()),
+                std=std,
+                half_width=quantile * std / math.sqrt(n),
+                num_replicates=n,
+            )
+        return estimates
+
+    def get_absolute_half_width(self, name: str) -> float:
+        """Absolute half-width under which a metric is precise, see __init__."""
+        if name in self.absolute_half_widths:
+            return self.absolute_half_widths[name]
+        return COUNT_HALF_WIDTH if name.startswith(COUNT_METRIC_PREFIX) else 0.0
+
+    def _is_precise(self) -> bool:
+        if len(self.replicates) < self.min_replicates:
+            return False
+        return all(
+            estimate.is_precise(self.relative_half_width, self.get_absolute_half_width(name))
+            for name, estimate in self.estimate().items()
+        )
+
+    def run(self) -> Dict[str, MetricEstimate]:
+        """
+        Run replicates until the target precision or max_replicates is reached.
+
+        Returns:
+            dict[str, MetricEstimate]: Estimate of every metric of the results CSV.
+        """
+        self.replicates = []
+        with tempfile.TemporaryDirectory(prefix="trace-") as trace_dir:
+            self.trace.save(trace_dir)
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                while len(self.replicates) < self.max_replicates and not self._is_precise():
+                    # Enough replicates to reach min_replicates, at least a full batch of workers
+                    batch_size = max(self.max_workers, self.min_replicates - len(self.replicates))
+                    batch_size = min(batch_size, self.max_replicates - len(self.replicates))
+                    seeds = range(self.base_seed + len(self.replicates), self.base_seed + len(self.replicates) + batch_size)
+                    futures = [
+                        executor.submit(_run_replicate, trace_dir, self.algorithm, self.config, seed)
+                        for seed in seeds
+                    ]
+                    self.replicates.extend(future.result() for future in futures)
+                    logger.info(f"ReplicateRunner: {len(self.replicates)} replicates done.")
+
+        return self.estimate()
@@ -3,40 +3,61 @@ import Storage
 import json
 
 from Storage.MetricsCalculator import MetricsCalculator
+from Storage.storage_types import RequestType
+from .EventEngine import EngineStats
+from .types import SimulationResult
 from utils.logger import (
-    resultLogger
+    logger,
+    resultLogger,
+    get_tiers_info_file_path,
 )
 
-from utils.Utility import format_data_size
+from utils.Utility import format_data_size, format_energy
 
 class PrintResulter:
     def __init__(self, metrics_calculator: MetricsCalculator):
         self.metrics_calculator = metrics_calculator
 
-    def log_results(self, algorithm_name: str):
+    def log_results(self, algorithm_name: str, log_csv: bool = True) -> dict:
+        """
+        Log the results of a run, returns the metrics row written (or not, if log_csv is False) to the results CSV.
+        """
         resultLogger.info(f"Simulation: Algorithm ({algorithm_name}).")
 
-        self.log_system_metrics(algorithm_name)
+        metrics = self.log_system_metrics(algorithm_name, log_csv=log_csv)
         self.log_tiers_info()
+        if log_csv:
+            self.log_tiers_info_jsonl(algorithm_name)
+        return metrics
 
-    def log_system_metrics(self, algorithm_name: str):
+    @staticmethod
+    def log_simulation_result(result: SimulationResult):
+        """Log the results of a run done in another process, see Simulator.simulate()."""
+        resultLogger.info(result.report.rstrip("\n"))
+        resultLogger.info(f"Simulation: Algorithm ({result.algorithm}) ran in {result.duration:.3f} s.")
+        resultLogger.log_to_csv(result.metrics)
+        if result.tiers_info:
+            PrintResulter.write_tiers_info_jsonl(result.algorithm, result.tiers_info)
+
+    def log_system_metrics(self, algorithm_name: str, log_csv: bool = True) -> dict:
         r = resultLogger
 
-        # Compute all metrics
-        total_cost = self.metrics_calculator.calculate_total_cost()
-        total_read_response_time = self.metrics_calculator.calculate_total_read_response_time()
-        total_write_response_time = self.metrics_calculator.calculate_total_write_response_time()
-        total_delete_response_time = self.metrics_calculator.calculate_total_delete_response_time()
-        total_response_time = total_read_response_time + total_write_response_time + total_delete_response_time
-
-        total_num_unavailable = self.metrics_calculator.calculate_total_num_unavailability()
-        total_num_successful_write = self.metrics_calculator.calculate_total_successful_write()
-        total_num_unsuccessful_write = self.metrics_calculator.calculate_total_unsuccessful_write()
-        total_num_successful_read = self.metrics_calculator.calculate_total_successful_read()
-        total_num_unsuccessful_read = self.metrics_calculator.calculate_total_unsuccessful_read()
-        total_num_reads = self.metrics_calculator.calculate_total_num_read_requests()
-        total_num_writes = self.metrics_calculator.calculate_total_num_write_requests()
-        total_num_deletes = self.metrics_calculator.calculate_total_num_delete_requests()
+        # Compute all metrics from a single snapshot of the storage state
+        snapshot = self.metrics_calculator.get_snapshot()
+        total_cost = snapshot.total_cost
+        total_read_response_time = snapshot.total_read_response_time
+        total_write_response_time = snapshot.total_write_response_time
+        total_delete_response_time = snapshot.total_delete_response_time
+        total_response_time = snapshot.total_response_time
+
+        total_num_unavailable = snapshot.total_unavailability
+        total_num_successful_write = snapshot.num_successful_write
+        total_num_unsuccessful_write = snapshot.num_unsuccessful_write
+        total_num_successful_read = snapshot.num_successful_read
+        total_num_unsuccessful_read = snapshot.num_unsuccessful_read
+        total_num_reads = snapshot.total_reads
+        total_num_writes = snapshot.total_writes
+        total_num_deletes = snapshot.total_deletes
 
         optimization_function = self.metrics_calculator.optimization_function()
         
@@ -44,7 +65,7 @@ class PrintResulter:
         estimated_system_response = self.metrics_calculator.calculate_estimated_system_response()
 
         # CSV log
-        r.log_to_csv({
+        metrics = {
             "algorithm": algorithm_name,
             "optimization_function": optimization_function,
             "estimated_system_response": estimated_system_response,
@@ -55,13 +76,18 @@ class PrintResulter:
             "total_num_unsuccessful_write": total_num_unsuccessful_write,
             "total_num_successful_read": total_num_successful_read,
             "total_num_unsuccessful_read": total_num_unsuccessful_read,
-        })
+        }
+        if log_csv:
+            r.log_to_csv(metrics)
 
         # General summary
         r.info("\n\nSimulation Results:")
         r.info(f"Optimization Function: {optimization_function:.3f}")
         r.info(f"Estimated System Response (ESR): {estimated_system_response:.4f}")
         r.info(f"Total Cost: {total_cost} $")
+        r.info(f"Storage Cost: {snapshot.total_storage_cost} $ ({snapshot.total_storage_gb_hours:.3f} GB-hours)")
+        for node_type, tier_storage_cost in snapshot.tier_storage_costs.items():
+            r.info(f"  {node_type.value}: {tier_storage_cost} $ ({snapshot.tier_storage_gb_hours[node_type]:.3f} GB-hours)")
         r.info(f"Total Response: {total_response_time:.3f} ms")
         r.info(f"Total Number of Unavailable Accesses: {total_num_unavailable}")
         r.info(f"Total Number of Successful Write: {total_num_successful_write}")
@@ -71,17 +97,136 @@ class PrintResulter:
 
         storage_system: HierarchicalStorageSystem = self.metrics_calculator.sys  # assume it's attached
 
-        r.info(f"Total Capacity: {format_data_size(storage_system.total_capacity())}")
-        r.info(f"Total Available Capacity: {format_data_size(storage_system.get_sys_available_capacity())}")
+        r.info(f"Total Capacity: {format_data_size(snapshot.total_capacity)}")
+        r.info(f"Total Available Capacity: {format_data_size(snapshot.total_available_capacity)}")
 
-        r.info(f"Total Read Latency: {total_read_response_time:.3f} ms")
-        r.info(f"Total Write Latency: {total_write_response_time:.3f} ms")
-        r.info(f"Total Delete Latency: {total_delete_response_time:.3f} ms")
+        r.info(f"Total Read Latency (device time): {total_read_response_time:.3f} ms")
+        r.info(f"Total Write Latency (device time): {total_write_response_time:.3f} ms")
+        r.info(f"Total Delete Latency (device time): {total_delete_response_time:.3f} ms")
 
         r.info(f"Total Number of Reads: {total_num_reads}")
         r.info(f"Total Number of Writes: {total_num_writes}")
         r.info(f"Total Number of Deletes: {total_num_deletes}")
 
+        r.info(f"Total Energy: {format_energy(snapshot.total_energy)}")
+        r.info(f"Energy per Served Operation: {self.metrics_calculator.calculate_energy_per_operation():.6f} J")
+        for node_type, tier_energy in snapshot.tier_energy.items():
+            r.info(f"  {node_type.value} Energy: {format_energy(tier_energy)}")
+
+        # Queueing at the nodes (only when the service queues are enabled)
+        if snapshot.tier_queue_utilization:
+            r.info("\nNode Service Queues:")
+            for node_type, utilization in snapshot.tier_queue_utilization.items():
+                r.info(
+                    f"  {node_type.value}: wait {snapshot.tier_queue_wait_time[node_type]:.3f} ms | "
+                    f"max depth {snapshot.tier_max_queue_depth[node_type]} | utilization {utilization:.3f}"
+                )
+
+        # Client-visible response times (after the write/read quorum)
+        r.info("\nClient Response Time Distribution:")
+        for request_type in RequestType:
+            histogram = self.metrics_calculator.get_client_latency_histogram(request_type)
+            r.info(
+                f"{request_type.name.capitalize()} Latency: {self._format_latency_summary(histogram.get_summary())} | "
+                f"total {histogram.total:.3f} ms"
+            )
+
+        # What the retry policies did, abandoned requests are not in the distributions above
+        r.info("\nRetries:")
+        for request_type in RequestType:
+            stats = self.metrics_calculator.get_retry_stats(request_type)
+            r.info(
+                f"{request_type.name.capitalize()}: retries {stats.retries} | timeouts {stats.timeouts} | "
+                f"backoff {stats.backoff_time:.3f} ms | abandoned replicas {stats.abandoned_replicas} | "
+                f"abandoned requests {stats.abandoned_requests} ({stats.abandoned_time:.3f} ms)"
+            )
+
+        selection, selection_stats = self.metrics_calculator.get_replica_selection_stats()
+        r.info(
+            f"\nReplica Selection: {selection} | hedged reads {selection_stats.hedged_reads} "
+            f"({selection_stats.hedge_device_time:.3f} ms device time) | hedge wins {selection_stats.hedge_wins} "
+            f"({selection_stats.hedge_time_saved:.3f} ms saved)"
+        )
+
+        # Erasure-coded tiers: capacity per tier against replication, encode and decode costs in the client latency
+        redundancy_stats = self.metrics_calculator.get_redundancy_stats()
+        if redundancy_stats is not None:
+            r.info(
+                f"\nErasure Coding: encodes {redundancy_stats.encodes} ({redundancy_stats.encode_time:.3f} ms) | "
+                f"degraded reads {redundancy_stats.degraded_reads} ({redundancy_stats.decode_time:.3f} ms) | "
+                f"unreadable {redundancy_stats.unreadable}"
+            )
+            for node_type, capacity in self.metrics_calculator.get_redundancy_capacity().items():
+                r.info(
+                    f"Tier {node_type.name} Redundancy: {capacity['scheme']} | data {format_data_size(capacity['data_kb'])} | "
+                    f"stored {format_data_size(capacity['stored_kb'])} | replicated {format_data_size(capacity['replicated_kb'])} | "
+                    f"saved {format_data_size(capacity['saved_kb'])}"
+                )
+
+        # Read cache on the FAST tier, its hits are in the client read latency
+        cache_stats = self.metrics_calculator.get_read_cache_stats()
+        if cache_stats is not None:
+            cache_capacity = self.metrics_calculator.get_read_cache_capacity()
+            cache = storage_system.data_manager.read_cache
+            r.info(
+                f"\nRead Cache: {cache.name} | hit ratio {cache_stats.hit_ratio():.2%} "
+                f"(byte hit ratio {cache_stats.byte_hit_ratio():.2%}) | hits {cache_stats.hits} | "
+                f"misses {cache_stats.misses} | fallbacks {cache_stats.fallbacks}"
+            )
+            r.info(
+                f"Read Cache Capacity: {format_data_size(cache_capacity['used_capacity'])} used of "
+                f"{format_data_size(cache_capacity['capacity'])} | fills {cache_stats.fills} "
+                f"({format_data_size(cache_stats.fill_kb)}, {cache_stats.fill_time:.3f} ms) | "
+                f"evictions {cache_stats.evictions} | invalidations {cache_stats.invalidations}"
+            )
+
+        # Write-back buffer on the FAST tier, the client write latency of the buffered writes is the buffer's
+        write_back_stats = self.metrics_calculator.get_write_back_stats()
+        if write_back_stats is not None:
+            occupancy = self.metrics_calculator.get_write_back_occupancy()
+            r.info(
+                f"\nWrite-Back Buffer: buffered writes {write_back_stats.buffered_writes} "
+                f"({format_data_size(write_back_stats.buffered_kb)}) | write-throughs {write_back_stats.write_throughs} | "
+                f"coalesced {write_back_stats.coalesced} ({format_data_size(write_back_stats.coalesced_kb)}) | "
+                f"discarded {write_back_stats.discarded} | reads {write_back_stats.reads} | "
+                f"stalls {write_back_stats.stalls} ({write_back_stats.stall_time:.3f} ms)"
+            )
+            r.info(
+                f"Write-Back Occupancy: mean {format_data_size(occupancy['mean_occupancy'])} | "
+                f"max {format_data_size(occupancy['max_occupancy'])} | now {format_data_size(occupancy['used_capacity'])} "
+                f"in {occupancy['pending_writes']} writes | capacity {format_data_size(occupancy['capacity'])}"
+            )
+            r.info(
+                f"Destage: destages {write_back_stats.destages} ({format_data_size(write_back_stats.destaged_kb)}, "
+                f"{write_back_stats.destage_time:.3f} ms) | failures {write_back_stats.destage_failures}"
+            )
+            if write_back_stats.buffered_writes and write_back_stats.destages:
+                r.info(
+                    f"Buffered Write Latency: {write_back_stats.buffered_time / write_back_stats.buffered_writes:.3f} ms "
+                    f"(foreground) | destage {write_back_stats.destage_time / write_back_stats.destages:.3f} ms per write (background)"
+                )
+
+        # Background tier migrations, their time is not in the client response times
+        migration_enabled, migration_stats = self.metrics_calculator.get_migration_stats()
+        if migration_enabled:
+            r.info(
+                f"\nMigration: rounds {migration_stats.rounds} | promotions {migration_stats.promotions} | "
+                f"demotions {migration_stats.demotions} | pressure demotions {migration_stats.pressure_demotions} | "
+                f"migrated {format_data_size(migration_stats.migrated_kb)} ({migration_stats.migration_time:.3f} ms) | "
+                f"deferred {migration_stats.deferred} | blocked {migration_stats.blocked} | cooled {migration_stats.cooled}"
+            )
+
+        # Device response time distributions (one sample per replica), system wide and per tier
+        r.info("\nDevice Response Time Distribution:")
+        for request_type in RequestType:
+            summary = self.metrics_calculator.get_latency_summary(request_type)
+            r.info(f"{request_type.name.capitalize()} Latency: {self._format_latency_summary(summary)}")
+        for node_type in storage_system.get_node_types():
+            r.info(f"Tier {node_type.name}:")
+            for request_type in RequestType:
+                summary = self.metrics_calculator.get_latency_summary(request_type, node_type)
+                r.info(f"  {request_type.name.capitalize()} Latency: {self._format_latency_summary(summary)}")
+
         # Node-level stats
         for node in storage_system.node_manager.storage_nodes.values():
             r.info("\n\n")
@@ -90,16 +235,61 @@ class PrintResulter:
             r.info(f"Total Number of Writes: {node.num_writes}")
             r.info(f"Total Number of Deletes: {node.num_deletes}")
             r.info(f"Total Number of Unavailable Accesses: {node.num_unavailable}")
+            if cache_stats is not None:
+                r.info(f"Total Number of Cache Reads: {node.num_cache_reads}")
+            if migration_enabled:
+                r.info(f"Total Number of Migrations: {node.num_migrated_in} in, {node.num_migrated_out} out")
             r.info(f"Total Read Latency: {node.total_read_response_time:.3f} ms")
             r.info(f"Total Write Latency: {node.total_write_response_time:.3f} ms")
             r.info(f"Total Delete Latency: {node.total_delete_response_time:.3f} ms")
+            for request_type, histogram in node.response_time_histograms.items():
+                r.info(f"{request_type.name.capitalize()} Latency: {self._format_latency_summary(histogram.get_summary())}")
             r.info(f"Total Capacity: {format_data_size(node.get_total_capacity())}")
             r.info(f"Total Available Capacity: {format_data_size(node.get_node_available_space())}")
+            r.info(f"Energy: {format_energy(node.get_energy())}")
+            if node.service_queue is not None:
+                r.info(f"Service Queue: {self._format_queue_summary(node.service_queue.get_summary())}")
+            for medium in node.storage_media:
+                if medium.service_queue is not None:
+                    r.info(f"  Medium {medium.name} Service Queue: {self._format_queue_summary(medium.service_queue.get_summary())}")
+            for medium_name, medium_energy in node.get_media_energy().items():
+                r.info(f"  Medium {medium_name} Energy: {format_energy(medium_energy)}")
 
         r.info("\nSimulation complete.")
+        return metrics
+
+    @staticmethod
+    def log_replicate_estimates(algorithm_name: str, estimates: dict, confidence: float):
+        """Log the mean and confidence interval of every metric, see ReplicateRunner."""
+        r = resultLogger
+        num_replicates = next(iter(estimates.values())).num_replicates
+        r.info(f"\nSimulation: Algorithm ({algorithm_name}), {num_replicates} replicates, {confidence:.0%} confidence intervals:")
+        for name, estimate in estimates.items():
+            r.info(f"{name}: {estimate.mean:.6g} ± {estimate.half_width:.6g} (std {estimate.std:.6g})")
+
+    def log_engine_stats(self, stats: EngineStats):
+        r = resultLogger
+        r.info("\nEvent Engine:")
+        r.info(f"Events: {stats.num_events} ({stats.num_arrivals} arrivals, {stats.num_completions} completions)")
+        r.info(f"Makespan: {stats.makespan:.3f} ms")
+        r.info(f"Throughput: {stats.throughput:.3f} ops/s")
+        r.info(f"In-flight Operations: mean {stats.mean_in_flight:.3f} | max {stats.max_in_flight}")
+
+    @staticmethod
+    def _format_queue_summary(summary: dict) -> str:
+        return (
+            f"served {summary['served']} | mean wait {summary['mean_wait']:.3f} ms | mean depth {summary['mean_depth']:.3f} | "
+            f"max depth {summary['max_depth']} | utilization {summary['utilization']:.3f}"
+        )
+
+    @staticmethod
+    def _format_latency_summary(summary: dict) -> str:
+        return (
+            f"count {summary['count']} | p50 {summary['p50']:.3f} ms | p90 {summary['p90']:.3f} ms | "
+            f"p99 {summary['p99']:.3f} ms | p99.9 {summary['p99.9']:.3f} ms | max {summary['max']:.3f} ms"
+        )
 
     def log_tiers_info(self):
-        self.log_tiers_info_jsonl()
         r = resultLogger
         r.info("\n\nStorage Tiers Information:")
 
@@ -113,45 +303,58 @@ class PrintResulter:
             r.info(f"Total Data Size: {format_data_size(tier_info['total_data_size'])}")
             r.info(f"Data Objects: {len(tier_info['data_objects'])}")
             
-            for data_object in tier_info['data_objects']:
+            for data_object, replicas_size, temperature in zip(tier_info['data_objects'], tier_info['replicas_sizes'], tier_info['temperatures']):
                 data_object: Storage.DataObject = data_object
-                r.info(f"  - id: {data_object.id} size: ({format_data_size(data_object.size)}) replicas size: ({format_data_size(data_object.size * 3)}) total_access: {data_object.get_total_accesses()} temp: {data_object.get_temperature()})")
+                r.info(f"  - id: {data_object.id} size: ({format_data_size(data_object.size)}) replicas size: ({format_data_size(replicas_size)}) total_access: {data_object.get_total_accesses()} temp: {temperature})")
 
         r.info("\nAll tiers information logged successfully.")
 
-    def log_tiers_info_jsonl(self):
+    def get_tiers_info_records(self) -> list[dict]:
+        """Build the lines of the tiers information JSONL, one dict per tier."""
         tiers_info: dict[Storage.StorageNodeType, dict[str, any]] = self.metrics_calculator.get_tiers_capacities_info_with_data_objects()
 
-        # Specify your output .jsonl file path
-        jsonl_file = "tiers_info.jsonl"
+        records = []
+        for tier_name, tier_info in tiers_info.items():
+            # Build a dict for the tier
+            tier_data = {
+                "tier_name": str(tier_name),
+                "available_capacity": tier_info['available_capacity'],
+                "used_capacity": tier_info['used_capacity'],
+                "total_capacity": tier_info['total_capacity'],
+                "total_data_size": tier_info['total_data_size'],
+                "data_objects_count": len(tier_info['data_objects']),
+                "data_objects": []
+            }
 
-        with open(jsonl_file, "w") as f:
-            for tier_name, tier_info in tiers_info.items():
-                # Build a dict for the tier
-                tier_data = {
-                    "tier_name": str(tier_name),
-                    "available_capacity": tier_info['available_capacity'],
-                    "used_capacity": tier_info['used_capacity'],
-                    "total_capacity": tier_info['total_capacity'],
-                    "total_data_size": tier_info['total_data_size'],
-                    "data_objects_count": len(tier_info['data_objects']),
-                    "data_objects": []
+            for data_object, replicas_size, temperature in zip(tier_info['data_objects'], tier_info['replicas_sizes'], tier_info['temperatures']):
+                data_object: Storage.DataObject = data_object
+                obj_data = {
+                    "id": data_object.id,
+                    "size": data_object.size,
+                    "replicas_size": replicas_size,
+                    "total_access": data_object.get_total_accesses(),
+                    "temperature": round(temperature, 3)
                 }
+                tier_data["data_objects"].append(obj_data)
+            records.append(tier_data)
+        return records
 
-                for data_object in tier_info['data_objects']:
-                    data_object: Storage.DataObject = data_object
-                    obj_data = {
-                        "id": data_object.id,
-                        "size": data_object.size,
-                        "replicas_size": data_object.size * 3,
-                        "total_access": data_object.get_total_accesses(),
-                        "temperature": round(data_object.get_temperature(), 3)
-                    }
-                    tier_data["data_objects"].append(obj_data)
+    def log_tiers_info_jsonl(self, algorithm_name: str):
+        PrintResulter.write_tiers_info_jsonl(algorithm_name, self.get_tiers_info_records())
 
+    @staticmethod
+    def write_tiers_info_jsonl(algorithm_name: str, records: list[dict]):
+        """
+        Write the tiers information of a run to its own file (see get_tiers_info_file_path), the
+        worker processes return the records to the parent instead (see Simulator.simulate()).
+        """
+        jsonl_file = get_tiers_info_file_path(algorithm_name)
+
+        with open(jsonl_file, "w") as f:
+            for tier_data in records:
                 # Write this tier as a JSON line
                 f.write(json.dumps(tier_data) + "\n")
 
-        print("All tiers information written to tiers_info.jsonl successfully.")
+        logger.info(f"All tiers information written to {jsonl_file} successfully.")
 
 
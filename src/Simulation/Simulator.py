@@ -1,14 +1,30 @@
 import json
+import os
+import pickle
+import random
+import numpy as np
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from .types import DataOperation
+from .types import DataOperation, SimulationResult
+from .Trace import Trace
+from . import Checkpoint
+from .sim_config import SIM_CONFIG
+from .MetricsSampler import MetricsSampler
+from .EventEngine import EventEngine
 from DataObject import File
 from Storage import (
     HierarchicalStorageSystem, 
     StorageNodeType,
     MetricsCalculator
 )
+from Storage.exceptions import RequestAbandonedException
 from utils.logger import (
     logger,
+    get_series_file_path,
+    capture_result_log,
+    get_checkpoint_file_path,
 )
 
 from utils.StorageVisualizer import StorageVisualizer
@@ -20,22 +36,53 @@ from Algorithms.Heuristic import (
     HybridGreedy,
     LoadBalancingGreedy
 )
-from Algorithms.RL import DQN, DDQN
 from utils.Utility import format_data_size
 from Algorithms import AlgorithmBase, NoStorageAvailableException
 from .ResultPrinter import PrintResulter
 
+def _simulate_in_worker(trace_dir: str, random_states: tuple, algorithm: AlgorithmBase) -> SimulationResult:
+    """Entry point of the worker processes, the trace is memory-mapped from the directory shared by all workers."""
+    # Forked workers reseed the random module, every algorithm starts from the generator states of the parent
+    random.setstate(random_states[0])
+    np.random.set_state(random_states[1])
+    return Simulator.simulate(Trace.load(trace_dir), algorithm, tiers_info=True)
+
+def _simulate_branch_in_worker(trace_dir: str, snapshot: bytes, algorithm: AlgorithmBase) -> SimulationResult:
+    """Entry point of the worker processes of Simulator.run_branches()."""
+    return Simulator.simulate_branch(Trace.load(trace_dir), snapshot, algorithm, tiers_info=True)
+
 class Simulator:
-    def __init__(self, access_pattern_path: str):
-        self.access_pattern = self.load_access_pattern(access_pattern_path)
-        self.storage_system = HierarchicalStorageSystem()
-        self.metrics_calculator = MetricsCalculator(self.storage_system)
+    def __init__(
+        self,
+        access_pattern_path: str = None,
+        *,
+        trace: Trace = None,
+        storage_config: dict = None,
+        node_config: dict = None,
+        medium_config: dict = None,
+        metrics_weights: dict = None,
+    ):
+        """
+        Args:
+            access_pattern_path (str): JSON Lines access pattern to load.
+            trace (Trace): Already parsed access pattern, used instead of access_pattern_path.
+            storage_config, node_config, medium_config (dict): Storage system configuration,
+                see HierarchicalStorageSystem (the module configs by default).
+            metrics_weights (dict): Optimization function weights (alpha, beta, gamma, delta), 1 by default.
+        """
+        self.access_pattern = trace if trace is not None else self.load_access_pattern(access_pattern_path)
+        self.storage_system = HierarchicalStorageSystem(storage_config, node_config, medium_config)
+        self.metrics_calculator = MetricsCalculator(self.storage_system, **(metrics_weights or {}))
         self.storage_system.initialize_metrics_calculator(self.metrics_calculator)
 
         self.storage_system.print_system_architecture()
 
         self.print_resulter = PrintResulter(self.metrics_calculator)
 
+        self.event_engine = EventEngine()
+        self.engine_stats = None  # Set when the access pattern runs on the event engine
+        self.checkpoint_path = None  # Set when checkpoints are enabled
+
     def load_config(self, config_path: str):
         """Load simulation configuration from a JSON file."""
         with open(config_path, "r") as file:
@@ -76,9 +123,16 @@ class Simulator:
 
     @staticmethod
     def run(access_pattern_path: str):
-        """Run the simulation."""
+        """
+        Run the simulation of every algorithm on the access pattern.
+
+        The access pattern is parsed once and the algorithms run in parallel worker processes
+        (up to SIM_CONFIG["max_workers"], all CPUs by default), their results are logged in order.
+        """
         logger.info("Simulation: Running simulation.")
-        
+        # Imported here, the RL algorithms are only needed to run them
+        from Algorithms.RL import DQN, DDQN
+
         algorithms = {
             # "TimeGreedy": TimeGreedy,
             # "Random": RandomSelection,
@@ -90,8 +144,122 @@ class Simulator:
             # "DDQN": DDQN
         }
         
-        for name, algorithm in algorithms.items():
-            Simulator.run_algorithm(access_pattern_path, algorithm)
+        trace = Trace.from_jsonl(access_pattern_path)
+        results = Simulator.run_algorithms(trace, list(algorithms.values()), SIM_CONFIG.get("max_workers"))
+        for result in results:
+            PrintResulter.log_simulation_result(result)
+
+    @staticmethod
+    def run_algorithms(trace: Trace, algorithms: list, max_workers: int = None) -> list[SimulationResult]:
+        """
+        Simulate each algorithm on the trace in its own worker process.
+
+        The trace is saved once to a temporary directory that the workers memory-map, so it is
+        neither parsed nor copied per algorithm. Every algorithm starts from the random generator
+        states of the caller, as if it were simulated alone in-process.
+
+        Returns:
+            list[SimulationResult]: Results in the order of the algorithms.
+        """
+        if not algorithms:
+            return []
+
+        max_workers = min(max_workers or os.cpu_count() or 1, len(algorithms))
+        random_states = (random.getstate(), np.random.get_state())
+        with tempfile.TemporaryDirectory(prefix="trace-") as trace_dir:
+            trace.save(trace_dir)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_simulate_in_worker, trace_dir, random_states, algorithm) for algorithm in algorithms
+                ]
+                return [future.result() for future in futures]
+
+    @staticmethod
+    def run_branches(
+        trace: Trace,
+        prefix_algorithm: AlgorithmBase,
+        prefix_length: int,
+        algorithms: list,
+        max_workers: int = None,
+        **config,
+    ) -> list[SimulationResult]:
+        """
+        Simulate the first `prefix_length` operations of the trace once with `prefix_algorithm`
+        (e.g. a bulk load or an initial placement period), then continue from that shared state
+        with each algorithm in its own worker process.
+
+        The state after the prefix is pickled once in memory and restored by every branch,
+        random generators included, so the branches only differ by their algorithm. The results
+        (and their durations) cover the branch part only; windowed metrics are not sampled.
+
+        Returns:
+            list[SimulationResult]: Results in the order of the algorithms.
+        """
+        if not algorithms:
+            return []
+
+        start_time = time.perf_counter()
+        sim = Simulator(trace=trace, **config)
+        prefix_strategy: AlgorithmBase = prefix_algorithm(sim.storage_system)
+        logger.info(f"\n\nSimulation: Executing the first {prefix_length} operations using algorithm: {prefix_strategy.name()}")
+        sim.event_engine.reset()
+        last_op_time = sim._execute(prefix_strategy, None, start_index=0, last_op_time=0, end_index=prefix_length)
+        snapshot = pickle.dumps(sim._capture_state(None, None, prefix_length, last_op_time), protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(
+            f"Simulation: Prefix executed in {time.perf_counter() - start_time:.3f} s, "
+            f"branching {len(algorithms)} algorithms from a {len(snapshot)} bytes snapshot."
+        )
+
+        max_workers = min(max_workers or os.cpu_count() or 1, len(algorithms))
+        with tempfile.TemporaryDirectory(prefix="trace-") as trace_dir:
+            trace.save(trace_dir)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_simulate_branch_in_worker, trace_dir, snapshot, algorithm)
+                    for algorithm in algorithms
+                ]
+                return [future.result() for future in futures]
+
+    @staticmethod
+    def simulate_branch(trace: Trace, snapshot: bytes, algorithm: AlgorithmBase, tiers_info: bool = False) -> SimulationResult:
+        """Continue the simulation from a snapshot taken by run_branches() with the given algorithm, see simulate()."""
+        start_time = time.perf_counter()
+        state = pickle.loads(snapshot)
+        sim = Simulator(trace=trace)
+        sim._restore_state(state)
+        strategy: AlgorithmBase = algorithm(sim.storage_system)
+        logger.info(f"\n\nSimulation: Branching at operation {state['cursor']} using algorithm: {strategy.name()}")
+        sim._execute(strategy, None, start_index=state["cursor"], last_op_time=state["last_op_time"])
+        return sim._collect_result(strategy, start_time, tiers_info)
+
+    @staticmethod
+    def simulate(trace: Trace, algorithm: AlgorithmBase, tiers_info: bool = False, **config) -> SimulationResult:
+        """
+        Simulate an algorithm on the trace, the results are returned instead of being written to the result sinks.
+        With `tiers_info`, the records of the tiers information JSONL are returned too, for the parent to write.
+
+        The other keyword arguments configure the Simulator (storage_config, node_config, medium_config, metrics_weights).
+        """
+        start_time = time.perf_counter()
+        sim = Simulator(trace=trace, **config)
+        strategy: AlgorithmBase = algorithm(sim.storage_system)
+        sim.execute_access_pattern(strategy)
+        return sim._collect_result(strategy, start_time, tiers_info)
+
+    def _collect_result(self, strategy: AlgorithmBase, start_time: float, tiers_info: bool = False) -> SimulationResult:
+        sim = self
+        with capture_result_log() as report:
+            metrics = sim.print_resulter.log_results(strategy.name(), log_csv=False)
+            if sim.engine_stats is not None:
+                sim.print_resulter.log_engine_stats(sim.engine_stats)
+
+        return SimulationResult(
+            algorithm=strategy.name(),
+            metrics=metrics,
+            report=report.getvalue(),
+            duration=time.perf_counter() - start_time,
+            tiers_info=sim.print_resulter.get_tiers_info_records() if tiers_info else [],
+        )
 
     @staticmethod
     def run_algorithm(access_pattern_path: str, algorithm: AlgorithmBase):
@@ -100,6 +268,8 @@ class Simulator:
         strategy: AlgorithmBase = algorithm(sim.storage_system)
         sim.execute_access_pattern(strategy)
         sim.print_resulter.log_results(strategy.name())
+        if sim.engine_stats is not None:
+            sim.print_resulter.log_engine_stats(sim.engine_stats)
 
         types = [node_type.name for node_type in StorageNodeType]
         capacities = [sim.storage_system.get_nodes_capacity(node_type) for node_type in StorageNodeType]
@@ -107,38 +277,234 @@ class Simulator:
         # visualizer = StorageVisualizer(types, capacities, used_capacities, strategy.name())
         # visualizer.plot_storage_utilization()
         
+    def create_metrics_sampler(self, algorithm_name: str):
+        """Create the windowed metrics sampler if it is enabled in SIM_CONFIG."""
+        window_ops = SIM_CONFIG.get("metrics_window_ops")
+        window_ms = SIM_CONFIG.get("metrics_window_ms")
+        if window_ops is None and window_ms is None:
+            return None
+
+        return MetricsSampler(
+            self.storage_system,
+            self.metrics_calculator,
+            get_series_file_path(algorithm_name),
+            window_ops=window_ops,
+            window_ms=window_ms,
+        )
+
     def execute_access_pattern(self, algorithm: AlgorithmBase):
-        """Execute the file operations defined in the access pattern."""
+        """
+        Execute the file operations defined in the access pattern.
+
+        With SIM_CONFIG["engine"] == "event" the operations are replayed on the event engine in
+        the order of their trace time, with their completion times (see EventEngine), otherwise
+        they run one after another in trace order.
+        With SIM_CONFIG["checkpoint_interval_ops"] set, a checkpoint is saved every N operations
+        (see resume_from_checkpoint).
+        """
         logger.info(f"\n\nSimulation: Executing access pattern using algorithm: {algorithm.name()}")
-        for op in self.access_pattern:
-            logger.info(f"\nSimulation: Executing operation: {op}")
-            file_id: str = op.get("file_id", None)
-            file_size: int = op.get("size", 100)  # Default size: 100 KB
-            op_type = op.get("operation_type", None)
+        sampler = self.create_metrics_sampler(algorithm.name())
+        if SIM_CONFIG.get("checkpoint_interval_ops") and self.checkpoint_path is None:
+            self.checkpoint_path = get_checkpoint_file_path(algorithm.name())
+
+        self.event_engine.reset()
+        self._execute(algorithm, sampler, start_index=0, last_op_time=0)
+
+    def resume_from_checkpoint(self, checkpoint_path: str) -> AlgorithmBase:
+        """
+        Restore the state saved in a checkpoint and execute the rest of the access pattern.
+
+        The storage system, algorithm, metrics sampler, event engine and random generators are
+        restored, so the results are the same as the ones of an uninterrupted run. Checkpoints
+        keep being saved to the same path.
+
+        Returns:
+            AlgorithmBase: The restored algorithm, e.g. to log the results with its name.
+        """
+        state = Checkpoint.load_checkpoint(checkpoint_path)
+        self._restore_state(state)
+        self.checkpoint_path = checkpoint_path
+
+        algorithm: AlgorithmBase = state["algorithm"]
+        logger.info(f"\n\nSimulation: Resuming access pattern using algorithm {algorithm.name()} at operation {state['cursor']}")
+        self._execute(algorithm, state["sampler"], start_index=state["cursor"], last_op_time=state["last_op_time"])
+        return algorithm
+
+    def save_checkpoint(self, algorithm: AlgorithmBase, sampler: MetricsSampler, cursor: int, last_op_time: float):
+        """
+        Save the simulation state before the operation at `cursor`. Its size depends on the number
+        of files and nodes, not on the length of the access pattern.
+        """
+        Checkpoint.save_checkpoint(self.checkpoint_path, self._capture_state(algorithm, sampler, cursor, last_op_time))
+
+    def _capture_state(self, algorithm: AlgorithmBase, sampler: MetricsSampler, cursor: int, last_op_time: float) -> dict:
+        return {
+            "num_operations": len(self.access_pattern),
+            "cursor": cursor,
+            "last_op_time": last_op_time,
+            "storage_system": self.storage_system,  # with its metrics calculator
+            "algorithm": algorithm,
+            "sampler": sampler,
+            "event_engine": self.event_engine,
+            "random_state": random.getstate(),
+            "numpy_random_state": np.random.get_state(),
+        }
+
+    def _restore_state(self, state: dict):
+        if state["num_operations"] != len(self.access_pattern):
+            raise ValueError(
+                f"Simulation: saved state is for an access pattern of {state['num_operations']} "
+                f"operations, not {len(self.access_pattern)}."
+            )
+
+        self.storage_system = state["storage_system"]
+        self.metrics_calculator = self.storage_system.metrics_calculator
+        self.print_resulter = PrintResulter(self.metrics_calculator)
+        self.event_engine = state["event_engine"]
+        random.setstate(state["random_state"])
+        np.random.set_state(state["numpy_random_state"])
+
+    def _execute(self, algorithm: AlgorithmBase, sampler: MetricsSampler, start_index: int, last_op_time: float, end_index: int = None) -> float:
+        """
+        Execute the operations from start_index up to end_index (the end of the access pattern by default).
+        The run is finished (metrics sampler closed, event engine drained) only when reaching the end.
+
+        Returns:
+            float: Time of the last executed operation.
+        """
+        if end_index is None:
+            end_index = len(self.access_pattern)
+        if SIM_CONFIG.get("engine", "sequential") == "event":
+            return self._execute_with_event_engine(algorithm, sampler, start_index, last_op_time, end_index)
+        return self._execute_sequentially(algorithm, sampler, start_index, last_op_time, end_index)
+
+    def _execute_sequentially(self, algorithm: AlgorithmBase, sampler: MetricsSampler, start_index: int, last_op_time: float, end_index: int) -> float:
+        checkpoint_interval = SIM_CONFIG.get("checkpoint_interval_ops") if self.checkpoint_path is not None else None
+        num_operations = len(self.access_pattern)
+        # Runs of consecutive reads are executed as one batch, the sampler needs every response time
+        batch_reads = SIM_CONFIG.get("batch_reads", False) and sampler is None
+        pending_reads = []
+
+        op_time = last_op_time
+        for index in range(start_index, end_index):
+            op = self.access_pattern[index]
             op_time = op.get("time", 0) # Default time: 0 ms
-            timestamp = op.get("operation_num", 0)  # Default timestamp: 0
+            # A read due after the next background work (tier migrations) runs alone, after that work
+            if (
+                batch_reads
+                and op.get("operation_type", None) == DataOperation.READ.value
+                and op.get("file_id", None) is not None
+                and op_time < self.storage_system.next_tick_time
+            ):
+                pending_reads.append(op)
+            else:
+                self._execute_reads(pending_reads)
+                response_time = self._execute_operation(op, algorithm)
+
+                if sampler is not None and response_time is not None:
+                    sampler.on_operation(op_time)
+
+            if checkpoint_interval and (index + 1) % checkpoint_interval == 0 and index + 1 < num_operations:
+                self._execute_reads(pending_reads)
+                self.save_checkpoint(algorithm, sampler, index + 1, op_time)
+
+        self._execute_reads(pending_reads)
+
+        if sampler is not None and end_index == num_operations:
+            sampler.close(op_time)
+        return op_time
+
+    def _execute_reads(self, ops: list):
+        """Execute read operations with one batched call and clear the list."""
+        if not ops:
+            return
+        self.storage_system.read_many(
+            [op["file_id"] for op in ops],
+            [op.get("operation_num", 0) for op in ops],
+            [op.get("time", 0) for op in ops],
+        )
+        ops.clear()
 
-            if file_id is None or op_type is None:
-                logger.error("Simulation: Invalid operation format.")
-                continue
+    def _execute_with_event_engine(self, algorithm: AlgorithmBase, sampler: MetricsSampler, start_index: int, last_op_time: float, end_index: int) -> float:
+        # Arrivals are processed in time order, operations with the same time keep the trace order
+        if isinstance(self.access_pattern, Trace):
+            times = np.asarray(self.access_pattern.times, dtype=np.float64)
+        else:
+            times = np.array([op.get("time", 0) for op in self.access_pattern], dtype=np.float64)
+        order = np.argsort(times, kind="stable")
+        arrival_times = times[order].tolist()
+        order = order.tolist()
+        num_operations = len(order)
 
-            if op_type == DataOperation.READ.value:
-                self._handle_read(file_id, timestamp)
-            elif op_type == DataOperation.WRITE.value:
-                file: File = self.generate_file(file_id, file_size)
-                self._handle_write(file, algorithm, timestamp)
-            elif op_type == DataOperation.DELETE.value:
-                self._handle_delete(file_id, timestamp)
+        # Arrivals are fed to the engine in chunks between checkpoints, the pending completions
+        # stay in the engine so the events are processed in the same order as in one run
+        checkpoint_interval = SIM_CONFIG.get("checkpoint_interval_ops") if self.checkpoint_path is not None else None
+        chunk_size = checkpoint_interval or max(num_operations, 1)
+        chunk_start = start_index
+        while True:
+            chunk_end = min(chunk_start + chunk_size, end_index)
 
-    def _handle_read(self, file_id: str, timestamp: int):
+            def on_arrival(index: int, arrival_time: float):
+                response_time = self._execute_operation(self.access_pattern[order[chunk_start + index]], algorithm)
+                if sampler is not None and response_time is not None:
+                    sampler.on_operation(arrival_time)
+                return response_time
+
+            self.engine_stats = self.event_engine.run(
+                arrival_times[chunk_start:chunk_end], on_arrival, drain=chunk_end == num_operations
+            )
+            if chunk_end == end_index:
+                break
+            self.save_checkpoint(algorithm, sampler, chunk_end, arrival_times[chunk_end - 1])
+            chunk_start = chunk_end
+
+        if sampler is not None and end_index == num_operations:
+            sampler.close(self.event_engine.now)
+        return arrival_times[end_index - 1] if end_index > start_index else last_op_time
+
+    def _execute_operation(self, op: dict, algorithm: AlgorithmBase):
+        """
+        Execute a single operation of the access pattern.
+
+        Returns:
+            float: Response time of the operation in ms (0 if it failed, the time until the retry policy gave
+                up if it was abandoned), None if the operation is invalid.
+        """
+        logger.info(f"\nSimulation: Executing operation: {op}")
+        file_id: str = op.get("file_id", None)
+        file_size: int = op.get("size", 100)  # Default size: 100 KB
+        op_type = op.get("operation_type", None)
+        op_time = op.get("time", 0) # Default time: 0 ms
+        timestamp = op.get("operation_num", 0)  # Default timestamp: 0
+        self.storage_system.tick(op_time)
+
+        if file_id is None or op_type is None:
+            logger.error("Simulation: Invalid operation format.")
+            return None
+
+        if op_type == DataOperation.READ.value:
+            return self._handle_read(file_id, timestamp)
+        elif op_type == DataOperation.WRITE.value:
+            file: File = self.generate_file(file_id, file_size)
+            return self._handle_write(file, algorithm, timestamp)
+        elif op_type == DataOperation.DELETE.value:
+            return self._handle_delete(file_id, timestamp)
+        return 0
+
+    def _handle_read(self, file_id: str, timestamp: int) -> float:
         """Handle a read operation on a file."""
         logger.info(f"Simulation: Reading file: {file_id}")
         try:
-            self.storage_system.read_data(file_id, timestamp)
+            return self.storage_system.read_data(file_id, timestamp)
+        except RequestAbandonedException as e:
+            # The client waited until the retry policy gave up
+            logger.info(f"Simulation: Read abandoned: {e}")
+            return e.response_time
         except Exception as e:
             logger.info(f"Simulation: Error during read: {e}")
+            return 0
 
-    def _handle_write(self, file: File, algorithm: AlgorithmBase, timestamp: int):
+    def _handle_write(self, file: File, algorithm: AlgorithmBase, timestamp: int) -> float:
         """Handle a write operation on a file."""
         try: 
             node_type = algorithm.apply(file)
@@ -146,23 +512,31 @@ class Simulator:
         except NoStorageAvailableException as e:
             self.storage_system.increment_num_unsuccessful_write()
             logger.info(f"Simulation: No storage available for writing file: {e}")
-            return
+            return 0
         except Exception as e:
             logger.info(f"Simulation: Error applying the algorithm: {e}")
-            return
+            return 0
         
         try:
-            self.storage_system.write_to_node(node_type, file, timestamp)
+            return self.storage_system.write_to_node(node_type, file, timestamp)
+        except RequestAbandonedException as e:
+            logger.info(f"Simulation: Write abandoned: {e}")
+            return e.response_time
         except Exception as e:
             logger.info(f"Simulation: Error during write: {e}")
+            return 0
 
-    def _handle_delete(self, file_id: str, timestamp: int):
+    def _handle_delete(self, file_id: str, timestamp: int) -> float:
         """Handle a delete operation on a file."""
         logger.info(f"Simulation: Deleting file: {file_id}")
         try:
-            self.storage_system.delete_data(file_id, timestamp)
+            return self.storage_system.delete_data(file_id, timestamp)
+        except RequestAbandonedException as e:
+            logger.info(f"Simulation: Delete abandoned: {e}")
+            return e.response_time
         except Exception as e:
             logger.error(f"Simulation: Error during delete: {e}")
+            return 0
 
 # Example Usage
 if __name__ == "__main__":
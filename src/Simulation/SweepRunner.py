@@ -0,0 +1,160 @@
+import copy
+import csv
+import itertools
+import os
+import random
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG, STORAGE_NODE_CONFIG, STORAGE_MEDIUM_CONFIG
+from Storage.storage_types import StorageNodeType, StorageMediumType
+from utils.logger import logger
+from .Trace import Trace
+
+METRICS_WEIGHTS = ("alpha", "beta", "gamma", "delta")
+NODE_PREFIX = "node."
+MEDIUM_PREFIX = "medium."
+
+def _run_sweep_point(trace_dir: str, point: dict, seed: int) -> dict:
+    """Entry point of the worker processes, simulates one point of the grid and returns its results row."""
+    from .Simulator import Simulator
+
+    row = {name: SweepRunner.format_value(value) for name, value in point.items()}
+    algorithm, config = SweepRunner.build_config(point)
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        result = Simulator.simulate(Trace.load(trace_dir), algorithm, **config)
+    except Exception as e:
+        logger.error(f"SweepRunner: Run {row} failed: {e}")
+        row["error"] = str(e)
+        return row
+
+    row.update({name: value for name, value in result.metrics.items() if name != "algorithm"})
+    row["duration"] = result.duration
+    return row
+
+class SweepRunner:
+    def __init__(self, trace: Trace, grid: Dict[str, list], max_workers: int = None, seed: int = 0):
+        """
+        Run the simulation over the cartesian product of a parameter grid.
+
+        Grid keys:
+          - "algorithm": AlgorithmBase classes (required);
+          - keys of HIERARCHICAL_STORAGE_CONFIG, e.g. "num_fast_nodes", "num_data_replica";
+          - "alpha", "beta", "gamma", "delta": optimization function weights;
+          - "node.<StorageNodeType name>.<parameter>", e.g. "node.FAST.process_time";
+          - "medium.<StorageMediumType name>.<parameter>", e.g. "medium.SSD.capacity".
+
+        Each run gets its own copy of the configs, the module-level configs are never modified.
+        Every run is seeded with `seed` so the points of the grid are compared on the same random numbers.
+
+        Args:
+            trace (Trace): Parsed access pattern, shared by all the runs.
+            grid (dict): Values to sweep per parameter.
+            max_workers (int): Worker processes, one per CPU by default.
+            seed (int): Seed of the random generators of every run.
+        """
+        if "algorithm" not in grid:
+            raise ValueError("SweepRunner: the grid must contain the algorithms to run.")
+        for name in grid:
+            self._validate_parameter(name)
+
+        self.trace = trace
+        self.grid = grid
+        self.max_workers = max_workers
+        self.seed = seed
+
+    @staticmethod
+    def _validate_parameter(name: str):
+        if name == "algorithm" or name in HIERARCHICAL_STORAGE_CONFIG or name in METRICS_WEIGHTS:
+            return
+        for prefix, types, config in (
+            (NODE_PREFIX, StorageNodeType, STORAGE_NODE_CONFIG),
+            (MEDIUM_PREFIX, StorageMediumType, STORAGE_MEDIUM_CONFIG),
+        ):
+            if name.startswith(prefix):
+                type_name, _, parameter = name[len(prefix):].partition(".")
+                if type_name in types.__members__ and parameter in config[types[type_name]]:
+                    return
+        raise ValueError(f"SweepRunner: unknown grid parameter {name}.")
+
+    def points(self) -> List[dict]:
+        """All the points of the grid, in the order they are run."""
+        names = list(self.grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(self.grid[name] for name in names))]
+
+    @staticmethod
+    def build_config(point: dict) -> Tuple[type, dict]:
+        """
+        Build the algorithm and the Simulator configuration of a point of the grid.
+
+        Returns:
+            tuple: (algorithm class, keyword arguments of Simulator)
+        """
+        storage_config = copy.deepcopy(HIERARCHICAL_STORAGE_CONFIG)
+        node_config = copy.deepcopy(STORAGE_NODE_CONFIG)
+        medium_config = copy.deepcopy(STORAGE_MEDIUM_CONFIG)
+        metrics_weights = {}
+
+        for name, value in point.items():
+            if name == "algorithm":
+                continue
+            elif name in METRICS_WEIGHTS:
+                metrics_weights[name] = value
+            elif name.startswith(NODE_PREFIX):
+                type_name, _, parameter = name[len(NODE_PREFIX):].partition(".")
+                node_config[StorageNodeType[type_name]][parameter] = value
+            elif name.startswith(MEDIUM_PREFIX):
+                type_name, _, parameter = name[len(MEDIUM_PREFIX):].partition(".")
+                medium_config[StorageMediumType[type_name]][parameter] = value
+            else:
+                storage_config[name] = value
+
+        return point["algorithm"], {
+            "storage_config": storage_config,
+            "node_config": node_config,
+            "medium_config": medium_config,
+            "metrics_weights": metrics_weights,
+        }
+
+    @staticmethod
+    def format_value(value) -> str:
+        return value.__name__ if isinstance(value, type) else value
+
+    def run(self, output_path: str) -> List[dict]:
+        """
+        Run every point of the grid in a process pool and write one results row per run to a CSV file.
+
+        Returns:
+            list[dict]: Results rows (parameters, metrics and duration of each run) in the order of points().
+        """
+        points = self.points()
+        logger.info(f"SweepRunner: Running {len(points)} configurations.")
+        if not points:
+            return []
+
+        max_workers = min(self.max_workers or os.cpu_count() or 1, len(points))
+        with tempfile.TemporaryDirectory(prefix="trace-") as trace_dir:
+            self.trace.save(trace_dir)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_run_sweep_point, trace_dir, point, self.seed) for point in points]
+                rows = [future.result() for future in futures]
+
+        self.write_rows(rows, output_path)
+        return rows
+
+    @staticmethod
+    def write_rows(rows: List[dict], output_path: str):
+        columns = []
+        for row in rows:
+            columns.extend(name for name in row if name not in columns)
+
+        with open(output_path, mode="w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        logger.info(f"SweepRunner: Results of {len(rows)} runs written to {output_path}.")
@@ -0,0 +1,120 @@
+import json
+import os
+import numpy as np
+from typing import Dict, Iterable, Iterator, List
+
+from utils.logger import logger
+
+DEFAULT_SIZE = 100  # KB, used when an operation has no size
+ITERATION_CHUNK = 65536  # Rows converted to Python values at a time when iterating
+
+# Numeric columns, saved as one .npy file each
+COLUMNS = {
+    "file_ids": np.int32,  # index in file_names, -1 if missing
+    "operation_types": np.int8,  # index in operation_type_names, -1 if missing
+    "sizes": np.int64,
+    "times": np.float64,
+    "operation_nums": np.int64,
+}
+NAMES_FILE = "names.json"
+
+class Trace:
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        file_names: List[str],
+        operation_type_names: List[str],
+    ):
+        """
+        Parsed access pattern stored column-wise in numpy arrays.
+
+        A trace is parsed once (see from_jsonl), saved to a directory of .npy files and loaded
+        memory-mapped and read-only by every worker process, so the operations are shared
+        through the page cache instead of being parsed or pickled per process.
+
+        Iterating or indexing a trace gives the operations as dicts with the same keys as the
+        JSON Lines access pattern ("file_id", "size", "operation_type", "time", "operation_num").
+        """
+        self.columns = columns
+        self.file_names = file_names
+        self.operation_type_names = operation_type_names
+
+        for column in self.columns.values():
+            if isinstance(column, np.ndarray) and column.flags.writeable:
+                column.flags.writeable = False
+
+    @classmethod
+    def from_operations(cls, operations: Iterable[dict]) -> "Trace":
+        """Build a trace from operation dicts, missing fields get the same defaults as in the Simulator."""
+        file_codes: Dict[str, int] = {}
+        operation_type_codes: Dict[str, int] = {}
+        rows = {name: [] for name in COLUMNS}
+
+        for op in operations:
+            file_id = op.get("file_id", None)
+            operation_type = op.get("operation_type", None)
+            rows["file_ids"].append(-1 if file_id is None else file_codes.setdefault(file_id, len(file_codes)))
+            rows["operation_types"].append(
+                -1 if operation_type is None else operation_type_codes.setdefault(operation_type, len(operation_type_codes))
+            )
+            rows["sizes"].append(op.get("size", DEFAULT_SIZE))
+            rows["times"].append(op.get("time", 0))
+            rows["operation_nums"].append(op.get("operation_num", 0))
+
+        columns = {name: np.array(rows[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        return cls(columns, list(file_codes), list(operation_type_codes))
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "Trace":
+        """Parse an access pattern JSON Lines file, invalid lines are skipped."""
+        def operations():
+            with open(path, "r") as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.error(f"Trace: Error decoding JSON from line in access pattern file: {path}")
+
+        return cls.from_operations(operations())
+
+    def save(self, directory: str):
+        """Save the trace to a directory, one .npy file per column."""
+        os.makedirs(directory, exist_ok=True)
+        for name in COLUMNS:
+            np.save(os.path.join(directory, f"{name}.npy"), self.columns[name])
+        with open(os.path.join(directory, NAMES_FILE), "w") as file:
+            json.dump({"file_names": self.file_names, "operation_type_names": self.operation_type_names}, file)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "Trace":
+        """Load a trace saved with save(), memory-mapped read-only by default."""
+        mmap_mode = "r" if mmap else None
+        columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in COLUMNS}
+        with open(os.path.join(directory, NAMES_FILE), "r") as file:
+            names = json.load(file)
+        return cls(columns, names["file_names"], names["operation_type_names"])
+
+    @property
+    def times(self) -> np.ndarray:
+        return self.columns["times"]
+
+    def __len__(self) -> int:
+        return len(self.columns["times"])
+
+    def _operation(self, file_id: int, operation_type: int, size: int, time: float, operation_num: int) -> dict:
+        return {
+            "file_id": self.file_names[file_id] if file_id >= 0 else None,
+            "size": size,
+            "operation_type": self.operation_type_names[operation_type] if operation_type >= 0 else None,
+            "time": time,
+            "operation_num": operation_num,
+        }
+
+    def __getitem__(self, index: int) -> dict:
+        return self._operation(*(self.columns[name][index].item() for name in COLUMNS))
+
+    def __iter__(self) -> Iterator[dict]:
+        for start in range(0, len(self), ITERATION_CHUNK):
+            chunk = [self.columns[name][start:start + ITERATION_CHUNK].tolist() for name in COLUMNS]
+            for row in zip(*chunk):
+                yield self._operation(*row)
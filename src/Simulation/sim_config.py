@@ -7,4 +7,10 @@ SIM_CONFIG = {
     "beta": 1,  
     "gamma": 1, 
     "delta": 1,  
+    "metrics_window_ops": None,  # Sample windowed metrics every N operations (None to disable)
+    "metrics_window_ms": None,  # Sample windowed metrics every N ms of simulated time (None to disable)
+    "max_workers": None,  # Worker processes running the algorithms in parallel (None: one per CPU)
+    "checkpoint_interval_ops": None,  # Save a checkpoint every N operations (None to disable)
+    "engine": "sequential",  # "sequential": run operations in trace order, "event": replay in trace time order with completion times
+    "batch_reads": False,  # Sequential engine without windowed metrics: run consecutive reads with one read_many() call
 }
\ No newline at end of file
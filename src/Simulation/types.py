@@ -1,6 +1,17 @@
+from dataclasses import dataclass, field
 from enum import Enum
 
 class DataOperation(Enum):
     READ = "read"
     WRITE = "write"
     DELETE = "delete"
+
+@dataclass
+class SimulationResult:
+    """Results of the run of one algorithm, returned by worker processes to the parent."""
+    algorithm: str
+    metrics: dict  # Row of the results CSV, see PrintResulter.log_system_metrics()
+    report: str  # Text logged to the results log by the run
+    duration: float = 0  # Wall-clock time of the run in seconds
+    tiers_info: list = field(default_factory=list)  # Lines of the tiers information JSONL, see PrintResulter.get_tiers_info_records()
+
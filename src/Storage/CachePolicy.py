@@ -0,0 +1,409 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+class CachePolicy:
+    name = ""
+
+    def __init__(self, capacity: float):
+        """
+        Eviction policy of a cache of `capacity` KB holding entries of different sizes.
+
+        access() and admit() are O(1) per call, plus O(1) per entry evicted (amortized for
+        the policies that give entries a second chance).
+
+        Args:
+            capacity (float): Size of the cache in KB.
+        """
+        if capacity < 0:
+            raise ValueError(f"CachePolicy: capacity must be non-negative, got {capacity}.")
+        self.capacity = capacity
+        self.used = 0  # KB of the cached entries
+
+    def __contains__(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def access(self, key: str) -> bool:
+        """Look up an entry, a hit counts as an access for the eviction order. Returns True on a hit."""
+        raise NotImplementedError
+
+    def admit(self, key: str, size: float) -> List[str]:
+        """
+        Insert an entry after a miss, evicting entries until it fits. An entry larger than the cache is not admitted.
+
+        Returns:
+            List[str]: The keys of the evicted entries.
+        """
+        raise NotImplementedError
+
+    def remove(self, key: str) -> Optional[float]:
+        """Remove an entry (invalidation), returns its size or None if it is not cached."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+class LruCachePolicy(CachePolicy):
+    """Evict the least recently used entry."""
+    name = "lru"
+
+    def __init__(self, capacity: float):
+        super().__init__(capacity)
+        self._entries: "OrderedDict[str, float]" = OrderedDict()  # key -> size, least recently used first
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def access(self, key: str) -> bool:
+        if key not in self._entries:
+            return False
+        self._entries.move_to_end(key)
+        return True
+
+    def admit(self, key: str, size: float) -> List[str]:
+        if size > self.capacity or key in self._entries:
+            return []
+        evicted = []
+        while self.used + size > self.capacity:
+            victim, victim_size = self._entries.popitem(last=False)
+            self.used -= victim_size
+            evicted.append(victim)
+        self._entries[key] = size
+        self.used += size
+        return evicted
+
+    def remove(self, key: str) -> Optional[float]:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self.used -= size
+        return size
+
+    def clear(self):
+        self._entries.clear()
+        self.used = 0
+
+class _FrequencyNode:
+    """Entries with the same access count, in a list ordered by count (see LfuCachePolicy)."""
+    __slots__ = ("frequency", "keys", "prev", "next")
+
+    def __init__(self, frequency: int):
+        self.frequency = frequency
+        self.keys: "OrderedDict[str, None]" = OrderedDict()  # least recently used first
+        self.prev: "_FrequencyNode" = self
+        self.next: "_FrequencyNode" = self
+
+class LfuCachePolicy(CachePolicy):
+    """
+    Evict the least frequently used entry, the least recently used one among equals. The access
+    counts are kept in a doubly linked list of frequencies so that every operation is O(1).
+    """
+    name = "lfu"
+
+    def __init__(self, capacity: float):
+        super().__init__(capacity)
+        self._head = _FrequencyNode(0)  # Sentinel, head.next has the lowest frequency
+        self._entries: Dict[str, tuple] = {}  # key -> (size, frequency node)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert_after(self, node: _FrequencyNode, frequency: int) -> _FrequencyNode:
+        new_node = _FrequencyNode(frequency)
+        new_node.prev, new_node.next = node, node.next
+        node.next.prev = new_node
+        node.next = new_node
+        return new_node
+
+    @staticmethod
+    def _unlink(node: _FrequencyNode):
+        node.prev.next = node.next
+        node.next.prev = node.prev
+
+    def access(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        size, node = entry
+        next_node = node.next
+        if next_node is self._head or next_node.frequency != node.frequency + 1:
+            next_node = self._insert_after(node, node.frequency + 1)
+        del node.keys[key]
+        next_node.keys[key] = None
+        if not node.keys:
+            self._unlink(node)
+        self._entries[key] = (size, next_node)
+        return True
+
+    def admit(self, key: str, size: float) -> List[str]:
+        if size > self.capacity or key in self._entries:
+            return []
+        evicted = []
+        while self.used + size > self.capacity:
+            node = self._head.next
+            victim, _ = node.keys.popitem(last=False)
+            if not node.keys:
+                self._unlink(node)
+            self.used -= self._entries.pop(victim)[0]
+            evicted.append(victim)
+        node = self._head.next
+        if node is self._head or node.frequency != 1:
+            node = self._insert_after(self._head, 1)
+        node.keys[key] = None
+        self._entries[key] = (size, node)
+        self.used += size
+        return evicted
+
+    def remove(self, key: str) -> Optional[float]:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        size, node = entry
+        del node.keys[key]
+        if not node.keys:
+            self._unlink(node)
+        self.used -= size
+        return size
+
+    def clear(self):
+        self._head = _FrequencyNode(0)
+        self._entries.clear()
+        self.used = 0
+
+class ArcCachePolicy(CachePolicy):
+    """
+    Adaptive Replacement Cache (Megiddo and Modha): the recently used entries (T1) and the
+    frequently used ones (T2) share the cache, the ghost lists of their evicted keys (B1, B2)
+    move the target size of T1 towards the list whose ghosts are hit. Sizes are in KB, a ghost
+    hit adapts the target by the size of the entry.
+    """
+    name = "arc"
+
+    def __init__(self, capacity: float):
+        super().__init__(capacity)
+        self.target_recent = 0.0  # Target size of T1 in KB
+        self._t1: "OrderedDict[str, float]" = OrderedDict()  # Least recently used first
+        self._t2: "OrderedDict[str, float]" = OrderedDict()
+        self._b1: "OrderedDict[str, float]" = OrderedDict()
+        self._b2: "OrderedDict[str, float]" = OrderedDict()
+        self._t1_size = self._b1_size = self._b2_size = 0.0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._t1 or key in self._t2
+
+    def __len__(self) -> int:
+        return len(self._t1) + len(self._t2)
+
+    def access(self, key: str) -> bool:
+        if key in self._t1:
+            size = self._t1.pop(key)
+            self._t1_size -= size
+            self._t2[key] = size
+            return True
+        if key in self._t2:
+            self._t2.move_to_end(key)
+            return True
+        return False
+
+    def admit(self, key: str, size: float) -> List[str]:
+        if size > self.capacity or key in self:
+            return []
+        if key in self._b1:
+            delta = max(self._b2_size / self._b1_size if self._b1_size else 1, 1) * size
+            self.target_recent = min(self.target_recent + delta, self.capacity)
+            self._b1_size -= self._b1.pop(key)
+            evicted = self._replace(size, False)
+            self._t2[key] = size
+        elif key in self._b2:
+            delta = max(self._b1_size / self._b2_size if self._b2_size else 1, 1) * size
+            self.target_recent = max(self.target_recent - delta, 0)
+            self._b2_size -= self._b2.pop(key)
+            evicted = self._replace(size, True)
+            self._t2[key] = size
+        else:
+            evicted = self._replace(size, False)
+            self._t1[key] = size
+            self._t1_size += size
+        self.used += size
+        self._trim_ghosts()
+        return evicted
+
+    def _replace(self, size: float, ghost_of_frequent: bool) -> List[str]:
+        """Evict entries to the ghost lists until `size` KB fit."""
+        evicted = []
+        while self.used + size > self.capacity:
+            if self._t1 and (
+                self._t1_size > self.target_recent
+                or (ghost_of_frequent and self._t1_size >= self.target_recent)
+                or not self._t2
+            ):
+                victim, victim_size = self._t1.popitem(last=False)
+                self._t1_size -= victim_size
+                self._b1[victim] = victim_size
+                self._b1_size += victim_size
+            else:
+                victim, victim_size = self._t2.popitem(last=False)
+                self._b2[victim] = victim_size
+                self._b2_size += victim_size
+            self.used -= victim_size
+            evicted.append(victim)
+        return evicted
+
+    def _trim_ghosts(self):
+        """Keep T1 + B1 within the capacity and all the lists within twice the capacity."""
+        while self._b1 and self._t1_size + self._b1_size > self.capacity:
+            self._b1_size -= self._b1.popitem(last=False)[1]
+        while self._b2 and self.used + self._b1_size + self._b2_size > 2 * self.capacity:
+            self._b2_size -= self._b2.popitem(last=False)[1]
+
+    def remove(self, key: str) -> Optional[float]:
+        if key in self._t1:
+            size = self._t1.pop(key)
+            self._t1_size -= size
+        elif key in self._t2:
+            size = self._t2.pop(key)
+        else:
+            # A ghost of stale data must not adapt the target
+            if key in self._b1:
+                self._b1_size -= self._b1.pop(key)
+            elif key in self._b2:
+                self._b2_size -= self._b2.pop(key)
+            return None
+        self.used -= size
+        return size
+
+    def clear(self):
+        for entries in (self._t1, self._t2, self._b1, self._b2):
+            entries.clear()
+        self._t1_size = self._b1_size = self._b2_size = 0.0
+        self.target_recent = 0.0
+        self.used = 0
+
+class S3FifoCachePolicy(CachePolicy):
+    """
+    S3-FIFO (Yang et al.): new entries go to a small FIFO queue, the ones accessed again while in it
+    move to the main FIFO queue, the others are evicted and their keys kept in a ghost FIFO queue.
+    An entry admitted again while its key is a ghost goes to the main queue directly. The main queue
+    reinserts the entries accessed since their last pass (2-bit access counters) instead of evicting them.
+
+    Args:
+        small_fraction (float): Fraction of the capacity of the small queue.
+    """
+    name = "s3fifo"
+
+    def __init__(self, capacity: float, small_fraction: float = 0.1):
+        super().__init__(capacity)
+        if not 0 < small_fraction < 1:
+            raise ValueError(f"CachePolicy: small_fraction must be in (0, 1), got {small_fraction}.")
+        self.small_capacity = capacity * small_fraction
+        self._small: "OrderedDict[str, float]" = OrderedDict()  # Oldest first
+        self._main: "OrderedDict[str, float]" = OrderedDict()
+        self._ghost: "OrderedDict[str, float]" = OrderedDict()
+        self._frequencies: Dict[str, int] = {}  # Accesses of the cached entries, capped at 3
+        self._small_size = 0.0
+        self._ghost_size = 0.0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._frequencies
+
+    def __len__(self) -> int:
+        return len(self._frequencies)
+
+    def access(self, key: str) -> bool:
+        frequency = self._frequencies.get(key)
+        if frequency is None:
+            return False
+        self._frequencies[key] = min(frequency + 1, 3)
+        return True
+
+    def admit(self, key: str, size: float) -> List[str]:
+        if size > self.capacity or key in self._frequencies:
+            return []
+        evicted = []
+        while self.used + size > self.capacity:
+            if self._small and (self._small_size > self.small_capacity or not self._main):
+                self._evict_small(evicted)
+            else:
+                self._evict_main(evicted)
+        if key in self._ghost:
+            self._ghost_size -= self._ghost.pop(key)
+            self._main[key] = size
+        else:
+            self._small[key] = size
+            self._small_size += size
+        self._frequencies[key] = 0
+        self.used += size
+        return evicted
+
+    def _evict_small(self, evicted: List[str]):
+        key, size = self._small.popitem(last=False)
+        self._small_size -= size
+        if self._frequencies[key] > 0:
+            # Accessed again while in the small queue, moves to the main queue with a fresh counter
+            self._frequencies[key] = 0
+            self._main[key] = size
+            return
+        del self._frequencies[key]
+        self.used -= size
+        evicted.append(key)
+        self._ghost[key] = size
+        self._ghost_size += size
+        while self._ghost_size > self.capacity - self.small_capacity:
+            self._ghost_size -= self._ghost.popitem(last=False)[1]
+
+    def _evict_main(self, evicted: List[str]):
+        # Each pass lowers the counter of the entry at the head, at most 3 reinsertions per entry
+        while True:
+            key, size = self._main.popitem(last=False)
+            frequency = self._frequencies[key]
+            if frequency == 0:
+                break
+            self._frequencies[key] = frequency - 1
+            self._main[key] = size
+        del self._frequencies[key]
+        self.used -= size
+        evicted.append(key)
+
+    def remove(self, key: str) -> Optional[float]:
+        if key not in self._frequencies:
+            if key in self._ghost:
+                self._ghost_size -= self._ghost.pop(key)
+            return None
+        del self._frequencies[key]
+        if key in self._small:
+            size = self._small.pop(key)
+            self._small_size -= size
+        else:
+            size = self._main.pop(key)
+        self.used -= size
+        return size
+
+    def clear(self):
+        for entries in (self._small, self._main, self._ghost, self._frequencies):
+            entries.clear()
+        self._small_size = self._ghost_size = 0.0
+        self.used = 0
+
+CACHE_POLICIES = {
+    policy.name: policy for policy in (LruCachePolicy, LfuCachePolicy, ArcCachePolicy, S3FifoCachePolicy)
+}
+
+def create_cache_policy(config: Union[str, dict], capacity: float) -> CachePolicy:
+    """
+    Create the eviction policy of a configuration: the name of a policy (see CACHE_POLICIES), or a
+    dict with its "name" and its parameters, e.g. {"name": "s3fifo", "small_fraction": 0.2}.
+    """
+    parameters = {}
+    if isinstance(config, dict):
+        parameters = {key: value for key, value in config.items() if key != "name"}
+        config = config["name"]
+    if config not in CACHE_POLICIES:
+        raise ValueError(f"CachePolicy: unknown eviction policy {config}, expected one of {list(CACHE_POLICIES)}.")
+    return CACHE_POLICIES[config](capacity, **parameters)
@@ -1,18 +1,45 @@
-from typing import Dict, List
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
 from ..StorageNode import StorageNode
-from ..storage_types import StorageNodeType, DataObject
+from ..storage_types import StorageNodeType, DataObject, RequestType, OperationOutcome
+from ..LatencyHistogram import LatencyHistogram
+from ..RandomStream import RandomStream, GLOBAL_RANDOM
+from ..RetryPolicy import RetryPolicy, RetryStats
+from ..RedundancyScheme import RedundancyScheme, RedundancyStats, create_redundancy_scheme
+from ..temperature import compute_temperatures
+from ..storage_config import READ_CACHE_CONFIG, WRITE_BACK_CONFIG
 from ..exceptions import (
     DataAlreadyExistsException,
     DataNotFoundException,
     InsufficientCapacityException,
-    StorageNodeUnavailableException,
-    StorageNodeFailureException,
+    RequestAbandonedException,
 )
 import random
 from utils.logger import logger
 from utils.Utility import format_data_size
 from .NodeManager import NodeManager
 from .CapacityManager import CapacityManager
+from .EstimatedSystemResponseTracker import EstimatedSystemResponseTracker
+from .ReplicaSelector import ReplicaSelector, create_replica_selector
+from .ReadCache import ReadCache
+from .WriteBackBuffer import WriteBackBuffer, BufferedWrite
+
+INITIAL_DATA_ROWS = 1024
+# Random draws of an operation on one replica without failed attempts (availability and failure of the
+# node and its medium, latency and throughput of the medium), used to size the random blocks of a batch
+DRAWS_PER_OPERATION = 6
+
+def quorum_latency(replica_latencies: List[float], quorum: int) -> float:
+    """
+    Client latency of a parallel fan-out acknowledged after `quorum` replicas,
+    i.e. the quorum-th smallest replica latency (the largest one if fewer replicas answered).
+    """
+    if not replica_latencies:
+        return 0
+    k = min(quorum, len(replica_latencies))
+    return sorted(replica_latencies)[k - 1]
 
 class DataManager:
     def __init__(self, node_manager: NodeManager, capacity_manager: CapacityManager, config: dict):
@@ -21,69 +48,370 @@ class DataManager:
         self.node_manager = node_manager
         self.capacity_manager = capacity_manager
         
-        self.data_to_nodes: Dict[str, List[str]] = {}  # data_id -> list of node_ids
+        # Redundancy of the data of every tier (see RedundancyScheme): the "replicas" of data stored on an
+        # erasure-coded tier are its fragments
+        self.redundancy: Dict[StorageNodeType, RedundancyScheme] = self._build_redundancy_schemes(config)
+        self.tier_schemes: List[RedundancyScheme] = [self.redundancy[node_type] for node_type in node_manager.tier_types]
+        self.redundancy_stats = RedundancyStats()
+
+        # Replica locations: one row per data object, holding the dense node indices of its
+        # replicas (see NodeManager.nodes_by_index) followed by a replica-count column.
+        self.max_replicas: int = max(scheme.num_pieces for scheme in self.tier_schemes)
+        self.replica_count_col: int = self.max_replicas
+        self.replica_locations = self._new_replica_locations(INITIAL_DATA_ROWS)
+        self.data_index: Dict[str, int] = {}  # data_id -> row in replica_locations
+        self.data_ids: List[str] = []  # row in replica_locations -> data_id
+
+        # Temperature inputs per row, kept in sync by refresh_data() for vectorized computations
+        self.data_total_accesses = np.zeros(INITIAL_DATA_ROWS, dtype=np.float64)
+        self.data_sizes = np.zeros(INITIAL_DATA_ROWS, dtype=np.float64)
+        self.data_hotness = np.zeros(INITIAL_DATA_ROWS, dtype=np.float64)
+
         self.data_objects: Dict[str, DataObject] = {}  # data_id -> DataObject
+        self.esr_tracker = EstimatedSystemResponseTracker()
         self.data_access_count: Dict[str, int] = {}
+
+        # Client-visible latency of the requests (after the write/read quorum), the time spent
+        # by the devices is accounted by the nodes. A write quorum of None waits for every replica (W = N).
+        self.write_quorum: Optional[int] = config["write_quorum"]
+        self.read_quorum: int = config["read_quorum"]
+        self._validate_quorums()
+        self.client_response_time_histograms: Dict[RequestType, LatencyHistogram] = {
+            request_type: LatencyHistogram() for request_type in RequestType
+        }
+
+        # Retries of the unavailable or failed replicas per request type, and what they did
+        self.retry_policies: Dict[RequestType, RetryPolicy] = self._build_retry_policies(config.get("retry_policy"))
+        self.retry_stats: Dict[RequestType, RetryStats] = {request_type: RetryStats() for request_type in RequestType}
+
+        # Replica every read attempt is sent to
+        self.replica_selector: ReplicaSelector = create_replica_selector(config.get("replica_selection"), node_manager)
+
+        # Cache of the MEDIUM and SLOW tiers data on the FAST tier, None when disabled
+        read_cache_config = {**READ_CACHE_CONFIG, **(config.get("read_cache") or {})}
+        self.read_cache: Optional[ReadCache] = ReadCache(node_manager, read_cache_config) if read_cache_config["enabled"] else None
+
+        # Buffer of the writes to the MEDIUM and SLOW tiers on the FAST tier, None when disabled
+        write_back_config = {**WRITE_BACK_CONFIG, **(config.get("write_back") or {})}
+        self.write_buffer: Optional[WriteBackBuffer] = (
+            WriteBackBuffer(node_manager, write_back_config, self._destage) if write_back_config["enabled"] else None
+        )
+        # Set while a buffered write is destaged, its client was acknowledged by the buffer
+        self._destaging = False
+        # Client time spent before the write path of the current request (a failed buffer write),
+        # added to the next client response time recorded
+        self._client_time_offset = 0.0
         
         self.__num_successful_write = 0
         self.__num_unsuccessful_write = 0
         self.__num_successful_read = 0
         self.__num_unsuccessful_read = 0
 
+    @staticmethod
+    def _build_retry_policies(config) -> Dict[RequestType, RetryPolicy]:
+        """Build the retry policy of every request type from a policy, its parameters or a dict of them per RequestType."""
+        if isinstance(config, dict) and any(isinstance(key, RequestType) for key in config):
+            return {request_type: RetryPolicy.from_config(config.get(request_type)) for request_type in RequestType}
+        policy = RetryPolicy.from_config(config)
+        return {request_type: policy for request_type in RequestType}
+
+    def _build_redundancy_schemes(self, config: dict) -> Dict[StorageNodeType, RedundancyScheme]:
+        """Build the redundancy scheme of every tier from a scheme, its parameters or a dict of them per StorageNodeType."""
+        redundancy = config.get("redundancy")
+        num_replicas = config["num_data_replica"]
+        if isinstance(redundancy, dict) and any(isinstance(key, StorageNodeType) for key in redundancy):
+            schemes = {node_type: create_redundancy_scheme(redundancy.get(node_type), num_replicas) for node_type in StorageNodeType}
+        else:
+            scheme = create_redundancy_scheme(redundancy, num_replicas)
+            schemes = {node_type: scheme for node_type in StorageNodeType}
+
+        for node_type, scheme in schemes.items():
+            # The pieces of data are on distinct nodes, replicas are only written to the nodes there are
+            num_nodes = len(self.node_manager.get_nodes(node_type))
+            if scheme.min_pieces > 1 and num_nodes < scheme.num_pieces:
+                raise ValueError(
+                    f"DataManager: {node_type.name} tier has {num_nodes} nodes, "
+                    f"{scheme.num_pieces} are needed to store the fragments of {scheme.label}."
+                )
+        return schemes
+
+    def _validate_quorums(self):
+        """Check 1 ≤ R ≤ N and 1 ≤ W ≤ N for every replicated tier, N being its number of replicas."""
+        for node_type, scheme in self.redundancy.items():
+            if scheme.min_pieces > 1:
+                # Erasure-coded tiers read k fragments and have their own write quorum
+                continue
+            num_replicas = scheme.num_pieces
+            if self.read_quorum is None or not 1 <= self.read_quorum <= num_replicas:
+                raise ValueError(
+                    f"DataManager: read_quorum must be between 1 and the {num_replicas} replicas "
+                    f"of the {node_type.name} tier, got {self.read_quorum}."
+                )
+            if self.write_quorum is not None and not 1 <= self.write_quorum <= num_replicas:
+                raise ValueError(
+                    f"DataManager: write_quorum must be between 1 and the {num_replicas} replicas "
+                    f"of the {node_type.name} tier, got {self.write_quorum}."
+                )
+
+    def _write_quorum(self, scheme: RedundancyScheme) -> int:
+        """Write quorum of the configuration for data stored with `scheme`, all of its pieces by default."""
+        return scheme.num_pieces if self.write_quorum is None else self.write_quorum
+
+    def _row_tier_code(self, locations: np.ndarray) -> int:
+        """
+        Tier code of the data of a row of the replica location matrix: the code of its first replica
+        on a node that was not deleted (deleted nodes have code -1), -1 if there is none.
+        """
+        node_tier_codes = self.node_manager.node_tier_codes
+        for node_index in locations[:locations[self.replica_count_col]]:
+            tier_code = node_tier_codes[node_index]
+            if tier_code >= 0:
+                return int(tier_code)
+        return -1
+
+    def _row_scheme(self, locations: np.ndarray) -> RedundancyScheme:
+        """Redundancy scheme of the data of a row of the replica location matrix, the row must have a replica on a node."""
+        tier_code = self._row_tier_code(locations)
+        if tier_code < 0:
+            raise DataNotFoundException("DataManager: the data has no replica on an existing node")
+        return self.tier_schemes[tier_code]
+
+    def get_required_capacity(self, size: float, node_type: StorageNodeType) -> float:
+        """KB of capacity data of `size` KB takes on nodes of the given type, with the redundancy of the type."""
+        return self.redundancy[node_type].required_capacity(size)
+
+    def get_stored_size(self, data_id: str) -> float:
+        """KB of the replicas or fragments of data stored on the nodes."""
+        locations = self.replica_locations[self.data_index[data_id]]
+        num_replicas = int(locations[self.replica_count_col])
+        if num_replicas == 0:
+            return 0.0
+        return float(self._row_scheme(locations).piece_size(self.data_objects[data_id].size) * num_replicas)
+
+    def _encode(self, scheme: RedundancyScheme, size: float) -> float:
+        """Time to compute the pieces of data of `size` KB to write."""
+        encode_time = scheme.encode_time(size)
+        if encode_time > 0:
+            self.redundancy_stats.encodes += 1
+            self.redundancy_stats.encode_time += encode_time
+        return encode_time
+
+    def _decode(self, scheme: RedundancyScheme, size: float) -> float:
+        """Time to rebuild data of `size` KB read from other pieces than its data pieces."""
+        decode_time = scheme.decode_time(size)
+        if decode_time > 0:
+            self.redundancy_stats.degraded_reads += 1
+            self.redundancy_stats.decode_time += decode_time
+        return decode_time
+
+    def _new_replica_locations(self, num_rows: int) -> np.ndarray:
+        locations = np.full((num_rows, self.max_replicas + 1), -1, dtype=np.int32)
+        locations[:, self.replica_count_col] = 0
+        return locations
+
+    def _get_or_create_row(self, data_id: str) -> int:
+        row = self.data_index.get(data_id)
+        if row is not None:
+            return row
+
+        row = len(self.data_ids)
+        if row == self.replica_locations.shape[0]:
+            # Double the matrix so that appending rows stays amortized O(1)
+            self.replica_locations = np.vstack(
+                (self.replica_locations, self._new_replica_locations(self.replica_locations.shape[0]))
+            )
+            self.data_total_accesses = np.concatenate((self.data_total_accesses, np.zeros(row)))
+            self.data_sizes = np.concatenate((self.data_sizes, np.zeros(row)))
+            self.data_hotness = np.concatenate((self.data_hotness, np.zeros(row)))
+        self.data_index[data_id] = row
+        self.data_ids.append(data_id)
+        return row
+
+    def _active_rows(self) -> np.ndarray:
+        """Return the used rows of the replica location matrix."""
+        return self.replica_locations[:len(self.data_ids)]
+
     def has_data(self, data_id: str) -> bool:
         return data_id in self.data_objects and not self.data_objects.get(data_id).is_file_deleted()
 
+    def refresh_data(self, data_id: str):
+        """
+        Propagate the current state of a data object (access counts, hotness, size and tier)
+        to the incrementally maintained aggregates. The DataManager calls it after every change
+        it makes, call it after changing a data object directly (e.g. its hotness level).
+        """
+        row = self.data_index.get(data_id)
+        data_object = self.data_objects.get(data_id)
+        if row is None or data_object is None:
+            return
+
+        self.data_total_accesses[row] = data_object.get_total_accesses()
+        self.data_sizes[row] = data_object.size
+        self.data_hotness[row] = data_object.hotness_level
+
+        node_type = None
+        if not data_object.is_file_deleted():
+            tier_code = self._row_tier_code(self.replica_locations[row])
+            if tier_code >= 0:
+                node_type = self.node_manager.tier_types[tier_code]
+        self.esr_tracker.update(row, data_object, node_type)
+
+    def get_replica_node_indices(self, data_id: str) -> np.ndarray:
+        """Return the dense node indices of the replicas of the given data."""
+        row = self.data_index.get(data_id)
+        if row is None:
+            return self.replica_locations[0, :0]
+        locations = self.replica_locations[row]
+        return locations[:locations[self.replica_count_col]]
+
+    def get_replica_nodes(self, data_id: str) -> List[StorageNode]:
+        """Return the storage nodes holding a replica of the given data."""
+        return [self.node_manager.get_node_by_index(index) for index in self.get_replica_node_indices(data_id)]
+
+    def get_data_tier(self, data_id: str) -> StorageNodeType:
+        """Return the storage node type the replicas of the given data are stored on."""
+        row = self.data_index.get(data_id)
+        if row is None or self.replica_locations[row, self.replica_count_col] == 0:
+            raise DataNotFoundException(f"DataManager: data {data_id} has no replicas")
+        return self.node_manager.get_node_by_index(self.replica_locations[row, 0]).type
+
     def write_to_node(self, node_type: StorageNodeType, data: DataObject, timestamp: int) -> float:
-        if self.has_data(data.id):
-            current_node_type = self.node_manager.get_node_by_id(self.data_to_nodes[data.id][0]).type
+        """
+        Write or overwrite data on nodes of the given type, moving it there if it is stored on another type.
+
+        Raises:
+            InsufficientCapacityException: If the node type does not have enough capacity.
+            RequestAbandonedException: If the retry policy gave up before the write quorum was acknowledged.
+
+        Returns:
+            float: Client response time (delete then write when the data moves to another node type).
+        """
+        outcome, response_time = self.try_write(node_type, data, timestamp, GLOBAL_RANDOM)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data.id, node_type, response_time)
+
+        logger.info(f"Data {data.id} has been written to {node_type.name} node with size {format_data_size(data.size)}.")
+        return response_time
+
+    def try_write(self, node_type: StorageNodeType, data: DataObject, timestamp: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Write data as write_to_node() does, with the random numbers taken from `stream` and the
+        errors returned as outcome codes. Unavailable or failed nodes are retried as the retry policy allows.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the client response time (0 unless successful,
+                the time the client waited when the retry policy gave up).
+        """
+        if self.read_cache is not None:
+            self.read_cache.invalidate(data.id)
+
+        buffer = self.write_buffer if not self._destaging else None
+        if buffer is not None:
+            if node_type == StorageNodeType.FAST:
+                # Written directly, an older buffered version must not be destaged over it
+                buffer.discard(data.id)
+            else:
+                outcome, buffer_time = buffer.try_write(data, node_type, timestamp, self.node_manager.clock.now, stream)
+                if outcome == OperationOutcome.SUCCESS:
+                    return outcome, self._record_client_response_time(RequestType.WRITE, buffer_time)
+                # Written through to its tier, after the time lost on the buffer
+                self._client_time_offset = buffer_time
+                try:
+                    return self._write(node_type, data, timestamp, stream)
+                finally:
+                    self._client_time_offset = 0.0
+        return self._write(node_type, data, timestamp, stream)
+
+    def _write(self, node_type: StorageNodeType, data: DataObject, timestamp: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        if self.has_data(data.id) and self.replica_locations[self.data_index[data.id], self.replica_count_col] > 0:
+            current_node_type = self.get_data_tier(data.id)
             if current_node_type != node_type:
-                total_response_time = self.delete_data(data.id, timestamp)
-                logger.info(f"Data {data.id} has been deleted from {current_node_type.name} node, to be written to {node_type.name} node")
-                total_response_time += self._write_new_data(node_type, data, timestamp)
-                return total_response_time
+                outcome, delete_response_time = self.try_delete(data.id, timestamp, stream)
+                if outcome != OperationOutcome.SUCCESS:
+                    return outcome, delete_response_time
+                outcome, write_response_time = self._write_new_data(node_type, data, timestamp, stream)
+                return outcome, delete_response_time + write_response_time
             else:
-                return self._overwrite_existing_data(node_type, data, timestamp)
+                return self._overwrite_existing_data(node_type, data, timestamp, stream)
         else:
-            return self._write_new_data(node_type, data, timestamp)
+            return self._write_new_data(node_type, data, timestamp, stream)
 
-    def _overwrite_existing_data(self, node_type: StorageNodeType, data_object: DataObject, timestamp: int) -> float:
+    def _overwrite_existing_data(self, node_type: StorageNodeType, data_object: DataObject, timestamp: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
         old_data = self.data_objects[data_object.id]
         old_data.increment_write_access(timestamp)
+        self.refresh_data(data_object.id)
 
-        size_diff = data_object.size - old_data.size
-        num_replica = self.config["num_data_replica"]
-
-        required_capacity = max(0, size_diff * num_replica)
+        scheme = self.redundancy[node_type]
+        required_capacity = max(0, scheme.required_capacity(data_object.size) - scheme.required_capacity(old_data.size))
 
         # Should not happen due to the check we did before storing the data, but let's be safe
         if required_capacity > 0 and not self.capacity_manager.has_sufficient_capacity(node_type, required_capacity):
             self.__num_unsuccessful_write += 1
-            raise InsufficientCapacityException(
-                f"Cannot overwrite data {data_object.id} in {node_type.name} node. Additional required: {format_data_size(required_capacity)}, "
-                f"Available: {format_data_size(self.capacity_manager.get_available_capacity(node_type))}"
-            )
+            return OperationOutcome.INSUFFICIENT_CAPACITY, 0
+
+        locations = self.replica_locations[self.data_index[data_object.id]]
+        num_replicas = int(locations[self.replica_count_col])
+        remaining = num_replicas
+        piece = scheme.make_piece(data_object)
+        encode_time = self._encode(scheme, data_object.size)
+        policy = self.retry_policies[RequestType.WRITE]
+        stats = self.retry_stats[RequestType.WRITE]
+        # Replicas are overwritten in parallel, a failed attempt delays the replica it retries.
+        # Replicas acknowledged after the client stopped waiting are overwritten but not acknowledged.
+        replica_latencies = []
+        attempts_time = 0
+        failed_attempts = 0
+        last_failure = None
+        give_up_time = 0
+        num_overwritten = 0
+
+        # Replicas still to be overwritten are kept at the front of the row,
+        # a replica overwritten or given up is swapped behind them.
+        while remaining:
+            position = random.randrange(remaining)
+            node: StorageNode = self.node_manager.nodes_by_index[locations[position]]
+            outcome, node_response_time = node.try_write(piece, stream, overwrite=True, retry_policy=policy)
+            if outcome == OperationOutcome.SUCCESS:
+                num_overwritten += 1
+                cutoff = policy.cutoff(attempts_time, node_response_time)
+                if cutoff is None:
+                    replica_latencies.append(attempts_time + node_response_time)
+                else:
+                    stats.timeouts += 1
+                    last_failure = OperationOutcome.TIMEOUT
+                    give_up_time = max(give_up_time, cutoff)
+            elif outcome == OperationOutcome.UNAVAILABLE or outcome == OperationOutcome.FAILURE:
+                attempts_time += node.get_error_response_time() + node_response_time
+                failed_attempts += 1
+                delay = self._retry_delay(policy, stats, failed_attempts, attempts_time, stream)
+                if delay is not None:
+                    attempts_time += delay
+                    continue
+                # The replica keeps its previous version
+                last_failure = outcome
+                give_up_time = max(give_up_time, attempts_time)
+            else:
+                return outcome, 0
+            attempts_time = 0
+            failed_attempts = 0
+            remaining -= 1
+            locations[position], locations[remaining] = locations[remaining], locations[position]
 
-        data_node_ids = [node_id for node_id in self.data_to_nodes[data_object.id]]
-        total_response_time = 0
+        if num_overwritten:
+            old_data.size = data_object.size
+            self.refresh_data(data_object.id)
 
-        while data_node_ids:
-            node_id = random.choice(data_node_ids)
-            node: StorageNode = self.node_manager.get_node_by_id(node_id)
-            try:
-                total_response_time += node.write_data(data=data_object, overwrite=True)
-                data_node_ids.remove(node_id)
-                logger.info(f"Overwritten data {data_object.id} on node {node.name}")
-            except (StorageNodeUnavailableException, StorageNodeFailureException) as e:
-                logger.error(f"DataManager: node {node.name} failed to overwrite file {data_object.id}: {str(e)}")
-                total_response_time += node.get_error_response_time()
+        write_quorum = scheme.pieces_to_acknowledge(self._write_quorum(scheme), num_replicas)
+        if len(replica_latencies) < write_quorum:
+            self.__num_unsuccessful_write += 1
+            return last_failure, self._record_abandoned(RequestType.WRITE, encode_time + max(replica_latencies + [give_up_time]))
 
         self.__num_successful_write += 1
-        old_data.size = data_object.size
-        
-        logger.info(f"Data {data_object.id} has been overwritten with new size {format_data_size(data_object.size)}.")
-        return total_response_time
+        return OperationOutcome.SUCCESS, self._record_client_response_time(
+            RequestType.WRITE, encode_time + quorum_latency(replica_latencies, write_quorum)
+        )
 
-    def _write_new_data(self, node_type: StorageNodeType, data_object: DataObject, timestamp: int) -> float:
+    def _write_new_data(self, node_type: StorageNodeType, data_object: DataObject, timestamp: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
         # if the data already exists, but was marked as deleted, 
         # we increment the write access and mark it as not deleted
         if data_object.id in self.data_objects:
@@ -92,40 +420,71 @@ class DataManager:
         else:
             data_object.increment_write_access(timestamp)
 
-        num_replica = self.config["num_data_replica"]
-        required_capacity = num_replica * data_object.size
+        scheme = self.redundancy[node_type]
+        num_replica = scheme.num_pieces
+        required_capacity = scheme.required_capacity(data_object.size)
 
         # Should not happen due to the check we did before storing the data, but let's be safe
         if not self.capacity_manager.has_sufficient_capacity(node_type, required_capacity):
             self.__num_unsuccessful_write += 1
-            raise InsufficientCapacityException(
-                f"Insufficient capacity in {node_type.name} node for file {data_object.id}. Required: {format_data_size(required_capacity)}, "
-                f"Available: {format_data_size(self.capacity_manager.get_available_capacity(node_type))}"
-            )
-
-        logger.info(
-            f"Writing data {data_object.id} to {node_type.name} node. Required capacity: {format_data_size(required_capacity)}, "
-            f"Available capacity: {format_data_size(self.capacity_manager.get_available_capacity(node_type))}"
-        )
+            return OperationOutcome.INSUFFICIENT_CAPACITY, 0
 
         self.data_access_count[data_object.id] = 1
-        suitable_nodes = [node for node in self.node_manager.get_nodes(node_type) if node.get_node_available_space() >= data_object.size]
+        piece = scheme.make_piece(data_object)
+        suitable_nodes = [node for node in self.node_manager.get_nodes(node_type) if node.get_node_available_space() >= piece.size]
+        if len(suitable_nodes) < scheme.min_pieces:
+            # Too few nodes with space to hold the fragments needed to rebuild the data
+            self.__num_unsuccessful_write += 1
+            return OperationOutcome.INSUFFICIENT_CAPACITY, 0
+        encode_time = self._encode(scheme, data_object.size)
 
-        data_written_to_node_ids = []
-        total_nodes_response_time = 0
+        # The row must be created first, it may grow the matrix
+        row = self._get_or_create_row(data_object.id)
+        locations = self.replica_locations[row]
+        num_written = 0
+        num_targeted = min(num_replica, len(suitable_nodes))
+        policy = self.retry_policies[RequestType.WRITE]
+        stats = self.retry_stats[RequestType.WRITE]
+        # Replicas are written in parallel, a failed attempt delays the replica it retries.
+        # Replicas acknowledged after the client stopped waiting are written but not acknowledged.
+        replica_latencies = []
+        attempts_time = 0
+        failed_attempts = 0
+        last_failure = None
+        give_up_time = 0
         while suitable_nodes and num_replica > 0:
             suitable_node = random.choice(suitable_nodes)
-            try:
-                total_nodes_response_time += suitable_node.write_data(data=data_object)
-                data_written_to_node_ids.append(suitable_node.id)
-                num_replica -= 1
+            outcome, node_response_time = suitable_node.try_write(piece, stream, retry_policy=policy)
+            if outcome == OperationOutcome.SUCCESS:
+                cutoff = policy.cutoff(attempts_time, node_response_time)
+                if cutoff is None:
+                    replica_latencies.append(attempts_time + node_response_time)
+                else:
+                    stats.timeouts += 1
+                    last_failure = OperationOutcome.TIMEOUT
+                    give_up_time = max(give_up_time, cutoff)
+                locations[num_written] = self.node_manager.node_index[suitable_node.id]
+                num_written += 1
                 suitable_nodes.remove(suitable_node)
-                logger.info(f"Data {data_object.id} written to node {suitable_node.name}")
-            except (StorageNodeUnavailableException, StorageNodeFailureException) as e:
-                logger.error(f"DataManager: node {suitable_node.name} error writing new data: {str(e)}")
-                total_nodes_response_time += suitable_node.get_error_response_time()
+            elif outcome == OperationOutcome.UNAVAILABLE or outcome == OperationOutcome.FAILURE:
+                attempts_time += suitable_node.get_error_response_time() + node_response_time
+                failed_attempts += 1
+                delay = self._retry_delay(policy, stats, failed_attempts, attempts_time, stream)
+                if delay is not None:
+                    attempts_time += delay
+                    continue
+                # The replica is not written
+                last_failure = outcome
+                give_up_time = max(give_up_time, attempts_time)
+            else:
+                return outcome, 0
+            attempts_time = 0
+            failed_attempts = 0
+            num_replica -= 1
 
-        self.__num_successful_write += 1
+        if num_written == 0 and last_failure is not None:
+            self.__num_unsuccessful_write += 1
+            return last_failure, self._record_abandoned(RequestType.WRITE, encode_time + give_up_time)
 
         # this is new data that has not been written before, so we add it to the data_objects
         if not data_object.id in self.data_objects:
@@ -133,63 +492,544 @@ class DataManager:
         else:
             # if it already exists, we just update the size
             self.data_objects[data_object.id].size = data_object.size
-        self.data_to_nodes[data_object.id] = data_written_to_node_ids
+        locations[self.replica_count_col] = num_written
         
         data_object.mark_written()
-        logger.info(f"Data {data_object.id} has been written with {len(data_written_to_node_ids)} replicas.")
+        self.refresh_data(data_object.id)
+
+        # The replicas written are kept even when too few of them were acknowledged
+        write_quorum = scheme.pieces_to_acknowledge(self._write_quorum(scheme), num_targeted)
+        if len(replica_latencies) < write_quorum:
+            self.__num_unsuccessful_write += 1
+            return last_failure, self._record_abandoned(RequestType.WRITE, encode_time + max(replica_latencies + [give_up_time]))
+
+        self.__num_successful_write += 1
+        client_response_time = quorum_latency(replica_latencies, write_quorum) if replica_latencies else attempts_time
+        return OperationOutcome.SUCCESS, self._record_client_response_time(RequestType.WRITE, encode_time + client_response_time)
+
+    def migrate(self, data_id: str, node_type: StorageNodeType) -> Optional[float]:
+        """
+        Move all the replicas of data to nodes of another type in the background, see MigrationEngine.
+
+        Each replica goes to a different node of the type, the nodes with the most available space
+        first. The replicas are transferred in parallel: read from the source node, sent over the
+        slower network of the two nodes after the inter-node latency of the source, and written on
+        the target node. Data moved to a type with another redundancy scheme is re-encoded instead,
+        see _migrate_reencoded(). Migrations draw no random numbers, are not subject to availability
+        and do not count as client requests.
+
+        Returns:
+            float: The time the migration took, None if the type does not have enough nodes with space for it.
+        """
+        row = self.data_index[data_id]
+        locations = self.replica_locations[row]
+        num_replicas = int(locations[self.replica_count_col])
+        if num_replicas == 0:
+            return None
+        source_scheme = self._row_scheme(locations)
+        target_scheme = self.redundancy[node_type]
+        if source_scheme != target_scheme:
+            migration_time = self._migrate_reencoded(data_id, node_type, locations, source_scheme, target_scheme)
+            if migration_time is None:
+                return None
+        else:
+            size = source_scheme.piece_size(self.data_objects[data_id].size)
+            targets = self._migration_targets(node_type, size, num_replicas)
+            if len(targets) < num_replicas:
+                return None
+
+            migration_time = 0
+            for replica, target in enumerate(targets):
+                source: StorageNode = self.node_manager.nodes_by_index[locations[replica]]
+                replica_object, read_time = source.migrate_out(data_id)
+                transfer_time = source.inter_node_latency + size / min(source.network_speed, target.network_speed)
+                write_time = target.migrate_in(replica_object)
+                migration_time = max(migration_time, read_time + transfer_time + write_time)
+                locations[replica] = self.node_manager.node_index[target.id]
+
+        if self.read_cache is not None and node_type == StorageNodeType.FAST:
+            self.read_cache.invalidate(data_id)
+        self.refresh_data(data_id)
+        logger.info(f"DataManager: Migrated data {data_id} to {node_type.name} nodes in {migration_time:.3f} ms.")
+        return migration_time
+
+    def _migration_targets(self, node_type: StorageNodeType, size: float, num_pieces: int) -> List[StorageNode]:
+        """Nodes of the type receiving the pieces of a migration, the nodes with the most available space first."""
+        return sorted(
+            (node for node in self.node_manager.get_nodes(node_type) if node.get_node_available_space() >= size),
+            key=lambda node: node.get_node_available_space(),
+            reverse=True,
+        )[:num_pieces]
+
+    def _migrate_reencoded(
+        self,
+        data_id: str,
+        node_type: StorageNodeType,
+        locations: np.ndarray,
+        source_scheme: RedundancyScheme,
+        target_scheme: RedundancyScheme,
+    ) -> Optional[float]:
+        """
+        Move data to nodes of a type with another redundancy scheme, see migrate(). The target node with
+        the most available space gathers the pieces that rebuild the data in parallel (a replica, or the
+        data fragments), encodes the pieces of the target scheme and sends them to the other target nodes
+        in parallel. All the source pieces are removed.
+
+        Returns:
+            float: The time the migration took, None if the type does not have enough nodes with space for it.
+        """
+        data_object = self.data_objects[data_id]
+        num_pieces = int(locations[self.replica_count_col])
+        piece = target_scheme.make_piece(data_object)
+        targets = self._migration_targets(node_type, piece.size, target_scheme.num_pieces)
+        if len(targets) < target_scheme.num_pieces or num_pieces < source_scheme.min_pieces:
+            return None
+
+        coordinator = targets[0]
+        gather_time = 0
+        for position in range(num_pieces):
+            source: StorageNode = self.node_manager.nodes_by_index[locations[position]]
+            source_piece, read_time = source.migrate_out(data_id)
+            if position < source_scheme.min_pieces:
+                transfer_time = source.inter_node_latency + source_piece.size / min(source.network_speed, coordinator.network_speed)
+                gather_time = max(gather_time, read_time + transfer_time)
 
-        return total_nodes_response_time
+        encode_time = self._encode(target_scheme, data_object.size)
+        scatter_time = 0
+        for position, target in enumerate(targets):
+            transfer_time = 0
+            if target is not coordinator:
+                transfer_time = coordinator.inter_node_latency + piece.size / min(coordinator.network_speed, target.network_speed)
+            scatter_time = max(scatter_time, transfer_time + target.migrate_in(piece))
+            locations[position] = self.node_manager.node_index[target.id]
+        locations[len(targets):self.replica_count_col] = -1
+        locations[self.replica_count_col] = len(targets)
+        return gather_time + encode_time + scatter_time
 
     def read_data(self, data_id: str, timestamp: int) -> float:
+        """
+        Read data from `read_quorum` of its replicas.
+
+        Raises:
+            DataNotFoundException: If the data is not stored.
+            RequestAbandonedException: If the retry policy gave up before the read quorum was reached.
+
+        Returns:
+            float: Client response time.
+        """
+        outcome, response_time = self.try_read(data_id, timestamp, GLOBAL_RANDOM)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data_id, response_time=response_time)
+
+        logger.info(f"Data {data_id} has been read.")
+        return response_time
+
+    def try_read(self, data_id: str, timestamp: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Read data as read_data() does, with the random numbers taken from `stream` and the
+        errors returned as outcome codes. Unavailable or failed nodes are retried as the retry policy allows.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the client response time (0 unless successful,
+                the time the client waited when the retry policy gave up).
+        """
+        if self.write_buffer is not None and data_id in self.write_buffer:
+            return self._read_buffered(data_id, timestamp, stream)
         if not self.has_data(data_id):
             self.__num_unsuccessful_read += 1
-            raise DataNotFoundException(f"Data {data_id} is not found for reading")
+            return OperationOutcome.NOT_FOUND, 0
 
-        self.data_objects[data_id].increment_read_access(timestamp)
+        locations = self.replica_locations[self.data_index[data_id]]
+        num_replicas = int(locations[self.replica_count_col])
+        tier_code = self._row_tier_code(locations)
+        if tier_code < 0:
+            # Unexpected state, the data is not on any node
+            self.__num_unsuccessful_read += 1
+            return OperationOutcome.NOT_FOUND, 0
 
-        node_ids = self.data_to_nodes.get(data_id)
+        self.data_objects[data_id].increment_read_access(timestamp)
         self.data_access_count[data_id] += 1
+        self.refresh_data(data_id)
 
-        total_nodes_response_time = 0
-        while True:
-            node_id = random.choice(node_ids)
-            node: StorageNode = self.node_manager.storage_nodes.get(node_id)
-            try:
-                total_nodes_response_time += node.read_data(data_id)
-                logger.info(f"Data {data_id} read from node {node.name}")
+        # Data not on the FAST tier (tier code 0) is read from the cache first, the time of an unavailable cache
+        # node delays the read of the replicas
+        cache = self.read_cache if tier_code != 0 else None
+        cache_time = 0
+        if cache is not None:
+            outcome, cache_time = cache.try_read(data_id, self.data_objects[data_id].size, stream)
+            if outcome == OperationOutcome.SUCCESS:
                 self.__num_successful_read += 1
-                return total_nodes_response_time
-            except (StorageNodeUnavailableException, StorageNodeFailureException) as e:
-                logger.error(f"Node {node.name} error reading data: {str(e)}")
-                total_nodes_response_time += node.get_error_response_time()
+                return OperationOutcome.SUCCESS, self._record_client_response_time(RequestType.READ, cache_time)
+
+        scheme = self.tier_schemes[tier_code]
+        # Replicas on deleted nodes cannot be read
+        candidates = locations[:num_replicas]
+        candidates = candidates[self.node_manager.node_tier_codes[candidates] >= 0].tolist()
+        num_replicas = len(candidates)
+        if num_replicas < scheme.min_pieces:
+            # Too few fragments were written to rebuild the data
+            self.redundancy_stats.unreadable += 1
+            self.__num_unsuccessful_read += 1
+            return OperationOutcome.FAILURE, 0
+
+        # R replicas (k fragments of erasure-coded data) are read in parallel, a failed attempt delays
+        # the replica it retries. Replicas already read are swapped behind the candidates. A read the
+        # client stopped waiting for is a failed attempt, the node still served it. Fragments read in
+        # place of failed ones make the read degraded, the data is decoded from them.
+        read_quorum = scheme.pieces_to_read(self.read_quorum, num_replicas)
+        remaining = num_replicas
+        policy = self.retry_policies[RequestType.READ]
+        stats = self.retry_stats[RequestType.READ]
+        selector = self.replica_selector
+        start_time = self.node_manager.clock.now
+        replica_latencies = []
+        attempts_time = 0
+        failed_attempts = 0
+        degraded = False
+        while len(replica_latencies) < read_quorum:
+            position = selector.select(candidates, remaining, start_time + attempts_time)
+            node_index = candidates[position]
+            node: StorageNode = self.node_manager.nodes_by_index[node_index]
+            outcome, node_response_time = node.try_read(data_id, stream, policy)
+            if outcome == OperationOutcome.SUCCESS:
+                selector.on_read(node_index, start_time + attempts_time, node_response_time)
+                if remaining > 1:
+                    hedged_position, node_response_time = self._hedge_read(
+                        data_id, candidates, remaining, position, node_response_time, start_time + attempts_time, stream, policy
+                    )
+                    degraded |= hedged_position != position
+                    position = hedged_position
+                cutoff = policy.cutoff(attempts_time, node_response_time)
+                if cutoff is None:
+                    replica_latencies.append(attempts_time + node_response_time)
+                    attempts_time = 0
+                    failed_attempts = 0
+                    remaining -= 1
+                    candidates[position], candidates[remaining] = candidates[remaining], candidates[position]
+                    continue
+                stats.timeouts += 1
+                outcome = OperationOutcome.TIMEOUT
+                attempts_time = cutoff
+            elif outcome == OperationOutcome.UNAVAILABLE or outcome == OperationOutcome.FAILURE:
+                attempts_time += node.get_error_response_time() + node_response_time
+            else:
+                return outcome, 0
+
+            failed_attempts += 1
+            degraded = True
+            delay = self._retry_delay(policy, stats, failed_attempts, attempts_time, stream)
+            if delay is None:
+                # The read fails as soon as a replica of its quorum is given up
+                self.__num_unsuccessful_read += 1
+                return outcome, self._record_abandoned(RequestType.READ, cache_time + attempts_time)
+            attempts_time += delay
+
+        decode_time = self._decode(scheme, self.data_objects[data_id].size) if degraded else 0
+        if cache is not None:
+            cache.fill(data_id, self.data_objects[data_id].size)
+        self.__num_successful_read += 1
+        return OperationOutcome.SUCCESS, self._record_client_response_time(
+            RequestType.READ, cache_time + max(replica_latencies) + decode_time
+        )
+
+    def _read_buffered(self, data_id: str, timestamp: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """Read data whose last write is still in the write-back buffer, from the buffer."""
+        if self.has_data(data_id):
+            self.data_objects[data_id].increment_read_access(timestamp)
+            self.data_access_count[data_id] += 1
+            self.refresh_data(data_id)
+        else:
+            self.write_buffer.get(data_id).data.increment_read_access(timestamp)
+
+        outcome, response_time = self.write_buffer.try_read(data_id, stream)
+        if outcome != OperationOutcome.SUCCESS:
+            self.__num_unsuccessful_read += 1
+            return outcome, response_time
+        self.__num_successful_read += 1
+        return OperationOutcome.SUCCESS, self._record_client_response_time(RequestType.READ, response_time)
+
+    def _destage(self, write: BufferedWrite, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """Write a buffered write to its tier in the background, see WriteBackBuffer."""
+        self._destaging = True
+        try:
+            return self.try_write(write.node_type, write.data, write.timestamp, stream)
+        finally:
+            self._destaging = False
+
+    def destage(self, now: float) -> bool:
+        """Destage the buffered writes completed by the simulated time `now`, returns True if there were any."""
+        return self.write_buffer is not None and self.write_buffer.advance(now, GLOBAL_RANDOM)
+
+    def next_destage_time(self) -> float:
+        """Simulated time (ms) of the next destage completion, inf without buffered writes."""
+        return self.write_buffer.next_destage_time() if self.write_buffer is not None else math.inf
+
+    def _hedge_read(
+        self,
+        data_id: str,
+        candidates: List[int],
+        remaining: int,
+        position: int,
+        response_time: float,
+        start_time: float,
+        stream: RandomStream,
+        policy: RetryPolicy,
+    ) -> Tuple[int, float]:
+        """
+        Read a second replica when the read of candidates[position] is slower than the hedge delay
+        of the replica selector, and keep the first one to finish.
+
+        Returns:
+            tuple[int, float]: The position of the replica that answered first and its response time since `start_time`.
+        """
+        selector = self.replica_selector
+        hedge_delay = selector.hedge_delay(candidates[position])
+        if hedge_delay is None or response_time <= hedge_delay:
+            return position, response_time
+
+        # Any other candidate, uniformly
+        hedge_position = random.randrange(remaining - 1)
+        if hedge_position >= position:
+            hedge_position += 1
+        hedge_index = candidates[hedge_position]
+        outcome, hedge_response_time = self.node_manager.nodes_by_index[hedge_index].try_read(data_id, stream, policy)
+        selector.stats.hedged_reads += 1
+        if outcome != OperationOutcome.SUCCESS:
+            return position, response_time
+
+        selector.on_read(hedge_index, start_time + hedge_delay, hedge_response_time)
+        selector.stats.hedge_device_time += hedge_response_time
+        if hedge_delay + hedge_response_time >= response_time:
+            return position, response_time
+        selector.stats.hedge_wins += 1
+        selector.stats.hedge_time_saved += response_time - (hedge_delay + hedge_response_time)
+        return hedge_position, hedge_delay + hedge_response_time
 
     def delete_data(self, data_id: str, timestamp: int) -> float:
-        if not self.has_data(data_id):
-            raise DataNotFoundException(f"DataManager: data {data_id} is not found for deletion")
+        """
+        Delete all the replicas of data.
+
+        Raises:
+            DataNotFoundException: If the data is not stored.
+            RequestAbandonedException: If the retry policy gave up before every replica was deleted.
+
+        Returns:
+            float: Client response time.
+        """
+        outcome, response_time = self.try_delete(data_id, timestamp, GLOBAL_RANDOM)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data_id, response_time=response_time)
+
+        logger.info(f"Data {data_id} has been deleted.")
+        return response_time
+
+    def try_delete(self, data_id: str, timestamp: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Delete data as delete_data() does, with the random numbers taken from `stream` and the
+        errors returned as outcome codes. Unavailable or failed nodes are retried as the retry policy allows.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the client response time (0 unless successful,
+                the time the client waited when the retry policy gave up).
+        """
+        # A buffered write is dropped, data never destaged is deleted once its buffered write is
+        discard_time = self.write_buffer.discard(data_id) if self.write_buffer is not None and not self._destaging else None
+        if not self.has_data(data_id) or self.replica_locations[self.data_index[data_id], self.replica_count_col] == 0:
+            if discard_time is not None:
+                return OperationOutcome.SUCCESS, self._record_client_response_time(RequestType.DELETE, discard_time)
+            return OperationOutcome.NOT_FOUND, 0
 
-        node_ids = self.data_to_nodes.pop(data_id)
-        if not node_ids:
-            raise DataNotFoundException(f"Data {data_id} is not found in any node for deletion, unexpected state")
+        locations = self.replica_locations[self.data_index[data_id]]
+        if self.read_cache is not None:
+            self.read_cache.invalidate(data_id)
         
-        total_nodes_response_time = 0
-        while node_ids:
-            node_id = random.choice(node_ids)
-            node: StorageNode = self.node_manager.storage_nodes.get(node_id)
-            try:
-                total_nodes_response_time += node.delete_data(data_id)
-                logger.info(f"Data {data_id} deleted from node {node.name}")
-                node_ids.remove(node_id)
-            except (StorageNodeUnavailableException, StorageNodeFailureException) as e:
-                logger.error(f"Node {node.name} error deleting data: {str(e)}")
-                total_nodes_response_time += node.get_error_response_time()
+        # Replicas are deleted in parallel and all of them must be deleted, a failed attempt delays
+        # the replica it retries. The replica-count column always covers the replicas not deleted yet,
+        # the first `pending` of them are still to be deleted: a deleted replica is swapped behind
+        # the count and a replica given up behind the pending ones.
+        policy = self.retry_policies[RequestType.DELETE]
+        stats = self.retry_stats[RequestType.DELETE]
+        pending = int(locations[self.replica_count_col])
+        replica_latencies = []
+        attempts_time = 0
+        failed_attempts = 0
+        last_failure = None
+        give_up_time = 0
+        while pending:
+            position = random.randrange(pending)
+            node: StorageNode = self.node_manager.nodes_by_index[locations[position]]
+            outcome, node_response_time = node.try_delete(data_id, stream, policy)
+            if outcome == OperationOutcome.SUCCESS:
+                cutoff = policy.cutoff(attempts_time, node_response_time)
+                if cutoff is None:
+                    replica_latencies.append(attempts_time + node_response_time)
+                else:
+                    stats.timeouts += 1
+                    last_failure = OperationOutcome.TIMEOUT
+                    give_up_time = max(give_up_time, cutoff)
+                remaining = int(locations[self.replica_count_col])
+                locations[position], locations[pending - 1] = locations[pending - 1], locations[position]
+                locations[pending - 1], locations[remaining - 1] = locations[remaining - 1], locations[pending - 1]
+                locations[self.replica_count_col] = remaining - 1
+            elif outcome == OperationOutcome.UNAVAILABLE or outcome == OperationOutcome.FAILURE:
+                attempts_time += node.get_error_response_time() + node_response_time
+                failed_attempts += 1
+                delay = self._retry_delay(policy, stats, failed_attempts, attempts_time, stream)
+                if delay is not None:
+                    attempts_time += delay
+                    continue
+                # The replica stays stored
+                last_failure = outcome
+                give_up_time = max(give_up_time, attempts_time)
+                locations[position], locations[pending - 1] = locations[pending - 1], locations[position]
+            else:
+                return outcome, 0
+            attempts_time = 0
+            failed_attempts = 0
+            pending -= 1
 
         data_object = self.data_objects[data_id]
-        data_object.increment_delete_access(timestamp)
-        # self.data_objects.pop(data_id)
-        data_object.mark_deleted()
-        # self.data_access_count.pop(data_id)
+        if locations[self.replica_count_col] == 0:
+            data_object.increment_delete_access(timestamp)
+            data_object.mark_deleted()
+        self.refresh_data(data_id)
+
+        if last_failure is not None:
+            return last_failure, self._record_abandoned(RequestType.DELETE, max(replica_latencies + [give_up_time]))
+
+        return OperationOutcome.SUCCESS, self._record_client_response_time(RequestType.DELETE, max(replica_latencies))
+
+    def _retry_delay(
+        self, policy: RetryPolicy, stats: RetryStats, failed_attempts: int, attempts_time: float, stream: RandomStream
+    ) -> Optional[float]:
+        """Wait before retrying a replica after a failed attempt as the policy decides (see RetryPolicy.retry_delay), None to give it up."""
+        delay = policy.retry_delay(failed_attempts, attempts_time, stream)
+        if delay is None:
+            stats.abandoned_replicas += 1
+            return None
+        stats.retries += 1
+        stats.backoff_time += delay
+        return delay
+
+    def _record_abandoned(self, request_type: RequestType, response_time: float) -> float:
+        """Account a request the retry policy gave up, returns the time its client waited."""
+        if self._destaging:
+            return response_time
+        response_time += self._client_time_offset
+        self._client_time_offset = 0.0
+        stats = self.retry_stats[request_type]
+        stats.abandoned_requests += 1
+        stats.abandoned_time += response_time
+        return response_time
+
+    def _raise_for_outcome(self, outcome: OperationOutcome, data_id: str, node_type: StorageNodeType = None, response_time: float = 0):
+        """Raise the exception of the public API matching an unsuccessful outcome."""
+        if outcome in (OperationOutcome.UNAVAILABLE, OperationOutcome.FAILURE, OperationOutcome.TIMEOUT):
+            raise RequestAbandonedException(
+                f"DataManager: request on data {data_id} abandoned by the retry policy ({outcome.name}) after {response_time:.3f} ms",
+                response_time,
+            )
+        if outcome == OperationOutcome.NOT_FOUND:
+            raise DataNotFoundException(f"DataManager: data {data_id} is not found")
+        if outcome == OperationOutcome.ALREADY_EXISTS:
+            raise DataAlreadyExistsException(f"DataManager: data {data_id} already exists")
+        if outcome == OperationOutcome.INSUFFICIENT_CAPACITY:
+            raise InsufficientCapacityException(
+                f"Insufficient capacity in {node_type.name} node for file {data_id}. "
+                f"Available: {format_data_size(self.capacity_manager.get_available_capacity(node_type))}"
+            )
+        raise RuntimeError(f"DataManager: unexpected outcome {outcome.name} for data {data_id}")
+
+    def read_many(
+        self, data_ids: Sequence[str], timestamps: Sequence[int], times: Optional[Sequence[float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read a batch of data with the same effects and results as calling read_data() on each of them in order.
 
-        return total_nodes_response_time
+        The random numbers are pre-drawn in blocks (see RandomStream) and the errors are returned
+        as outcome codes instead of exceptions.
+
+        Args:
+            data_ids (Sequence[str]): IDs of the data to read.
+            timestamps (Sequence[int]): Operation number of each read.
+            times (Sequence[float]): Optional simulated time of each read in ms, the clock is advanced to it before the read.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Client response time of each read (see try_read()) and its OperationOutcome code.
+        """
+        num_operations = len(data_ids)
+        response_times = np.zeros(num_operations, dtype=np.float64)
+        outcomes = np.zeros(num_operations, dtype=np.int8)
+        clock = self.node_manager.clock
+
+        max_read_quorum = max(scheme.pieces_to_read(self.read_quorum, scheme.num_pieces) for scheme in self.tier_schemes)
+        with RandomStream(DRAWS_PER_OPERATION * max_read_quorum * num_operations) as stream:
+            for i in range(num_operations):
+                if times is not None:
+                    clock.advance(times[i])
+                outcomes[i], response_times[i] = self.try_read(data_ids[i], timestamps[i], stream)
+
+        return response_times, outcomes
+
+    def delete_many(
+        self, data_ids: Sequence[str], timestamps: Sequence[int], times: Optional[Sequence[float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Delete a batch of data with the same effects and results as calling delete_data() on each of them in order,
+        see read_many().
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Client response time of each delete (see try_delete()) and its OperationOutcome code.
+        """
+        num_operations = len(data_ids)
+        response_times = np.zeros(num_operations, dtype=np.float64)
+        outcomes = np.zeros(num_operations, dtype=np.int8)
+        clock = self.node_manager.clock
+
+        with RandomStream(DRAWS_PER_OPERATION * self.max_replicas * num_operations) as stream:
+            for i in range(num_operations):
+                if times is not None:
+                    clock.advance(times[i])
+                outcomes[i], response_times[i] = self.try_delete(data_ids[i], timestamps[i], stream)
+
+        return response_times, outcomes
+
+    def write_many(
+        self,
+        node_types: Sequence[StorageNodeType],
+        data_objects: Sequence[DataObject],
+        timestamps: Sequence[int],
+        times: Optional[Sequence[float]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Write a batch of data, each one to the node type at the same position, with the same effects
+        and results as calling write_to_node() on each of them in order, see read_many().
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Client response time of each write (see try_write()) and its OperationOutcome code.
+        """
+        num_operations = len(data_objects)
+        response_times = np.zeros(num_operations, dtype=np.float64)
+        outcomes = np.zeros(num_operations, dtype=np.int8)
+        clock = self.node_manager.clock
+
+        with RandomStream(DRAWS_PER_OPERATION * self.max_replicas * num_operations) as stream:
+            for i in range(num_operations):
+                if times is not None:
+                    clock.advance(times[i])
+                outcomes[i], response_times[i] = self.try_write(node_types[i], data_objects[i], timestamps[i], stream)
+
+        return response_times, outcomes
+
+
+    def _record_client_response_time(self, request_type: RequestType, response_time: float) -> float:
+        if self._destaging:
+            # Background write of a buffered write, its client was acknowledged by the buffer
+            return response_time
+        response_time += self._client_time_offset
+        self._client_time_offset = 0.0
+        self.client_response_time_histograms[request_type].record(response_time)
+        return response_time
 
     def get_num_files(self) -> int:
         return len(self.data_objects)
@@ -207,12 +1047,53 @@ class DataManager:
         return self.__num_unsuccessful_read
 
     def get_num_replicas(self) -> int:
-        return sum(len(nodes) for nodes in self.data_to_nodes.values())
+        return int(self._active_rows()[:, self.replica_count_col].sum())
 
     def get_file_num_replicas(self, file_id: str) -> int:
-        if file_id not in self.data_to_nodes:
+        if not self.has_data(file_id):
             raise ValueError(f"Data {file_id} not found for getting number of replicas")
-        return len(self.data_to_nodes[file_id])
+        return int(self.replica_locations[self.data_index[file_id], self.replica_count_col])
+
+    def get_rows_tier_codes(self) -> np.ndarray:
+        """
+        Get the tier code (see NodeManager.node_tier_codes) of every row of the replica
+        location matrix, -1 for rows without replicas on existing nodes.
+        """
+        rows = self._active_rows()
+        replicas = rows[:, :self.max_replicas]
+        # Code of the first replica on a node that was not deleted (see _row_tier_code())
+        stored = np.arange(self.max_replicas) < rows[:, self.replica_count_col, None]
+        tier_codes = np.where(stored, self.node_manager.node_tier_codes[replicas], -1)
+        first = np.argmax(tier_codes >= 0, axis=1)
+        return tier_codes[np.arange(len(rows)), first]
+
+    def get_rows_piece_sizes(self) -> np.ndarray:
+        """
+        Get the KB of one replica or fragment of every row of the replica location matrix,
+        the data size for rows without replicas.
+        """
+        tier_codes = self.get_rows_tier_codes()
+        sizes = self.data_sizes[:len(self.data_ids)].copy()
+        for code, scheme in enumerate(self.tier_schemes):
+            rows = tier_codes == code
+            sizes[rows] = scheme.piece_size(sizes[rows])
+        return sizes
+
+    def get_temperatures(self) -> np.ndarray:
+        """Get the temperature of every row of the replica location matrix, computed in one vectorized pass."""
+        num_rows = len(self.data_ids)
+        return compute_temperatures(
+            self.data_total_accesses[:num_rows], self.data_sizes[:num_rows], self.data_hotness[:num_rows]
+        )
+
+    def get_tier_replica_counts(self) -> Dict[StorageNodeType, int]:
+        """Get the number of replicas stored on each storage node type."""
+        rows = self._active_rows()
+        replicas = rows[:, :self.max_replicas]
+        tier_codes = self.node_manager.node_tier_codes[replicas[replicas >= 0]]
+        # Replicas on deleted nodes have no tier anymore
+        counts = np.bincount(tier_codes[tier_codes >= 0], minlength=len(self.node_manager.tier_types))
+        return {node_type: int(counts[code]) for code, node_type in enumerate(self.node_manager.tier_types)}
     
     def generate_data(self, data_id: str, size: int) -> DataObject:
         """
@@ -232,9 +1113,24 @@ class DataManager:
         """
         Reset the data manager by clearing all data objects and access counts.
         """
-        self.data_to_nodes.clear()
+        self.replica_locations = self._new_replica_locations(INITIAL_DATA_ROWS)
+        self.data_total_accesses = np.zeros(INITIAL_DATA_ROWS, dtype=np.float64)
+        self.data_sizes = np.zeros(INITIAL_DATA_ROWS, dtype=np.float64)
+        self.data_hotness = np.zeros(INITIAL_DATA_ROWS, dtype=np.float64)
+        self.data_index.clear()
+        self.data_ids.clear()
         self.data_objects.clear()
         self.data_access_count.clear()
+        self.esr_tracker.reset()
+        for histogram in self.client_response_time_histograms.values():
+            histogram.reset()
+        self.retry_stats = {request_type: RetryStats() for request_type in RequestType}
+        self.redundancy_stats = RedundancyStats()
+        self.replica_selector.reset()
+        if self.read_cache is not None:
+            self.read_cache.reset()
+        if self.write_buffer is not None:
+            self.write_buffer.reset()
         self.__num_successful_write = 0
         self.__num_unsuccessful_write = 0
         
@@ -254,11 +1150,8 @@ class DataManager:
             List[DataObject]: A list of data objects stored in the specified node type.
         """
 
-        data_objects = []
-        for data_id, node_ids in self.data_to_nodes.items():
-            if any(self.node_manager.get_node_by_id(node_id).type == node_type for node_id in node_ids):
-                data_objects.append(self.data_objects[data_id])
-        return data_objects
+        rows = np.flatnonzero(self.get_rows_tier_codes() == self.node_manager.get_tier_code(node_type))
+        return [self.data_objects[self.data_ids[row]] for row in rows]
     
     def get_all_tiers_data_objects(self) -> Dict[StorageNodeType, DataObject]:
         """
@@ -267,7 +1160,18 @@ class DataManager:
         Returns:
             Dict[StorageNodeType, List[DataObject]]: A dictionary mapping each storage node type to a list of data objects.
         """
-        tier_data_objects = {}
-        for node_type in StorageNodeType:
-            tier_data_objects[node_type] = self.get_tier_data(node_type)
-        return tier_data_objects
+        return {
+            node_type: [self.data_objects[self.data_ids[row]] for row in rows]
+            for node_type, rows in self.get_all_tiers_rows().items()
+        }
+
+    def get_all_tiers_rows(self) -> Dict[StorageNodeType, np.ndarray]:
+        """
+        Get the rows of the data objects stored in each tier, to index the per-row arrays
+        (e.g. get_temperatures(), data_sizes).
+        """
+        tier_codes = self.get_rows_tier_codes()
+        return {
+            node_type: np.flatnonzero(tier_codes == self.node_manager.get_tier_code(node_type))
+            for node_type in StorageNodeType
+        }
@@ -0,0 +1,85 @@
+import math
+from typing import Dict, List, Optional
+
+from ..storage_types import StorageNodeType, DataObject
+from ..storage_config import ESR_TIER_WEIGHTS
+
+class EstimatedSystemResponseTracker:
+    def __init__(self, tier_weights: Dict[StorageNodeType, float] = ESR_TIER_WEIGHTS):
+        """
+        Maintain the Estimated System Response (ESR) incrementally.
+
+        Every data object contributes nr_est × res_est to the sum of the tier it is stored on,
+        where nr_est = 10 × temp and res_est = size / 10000. The contribution of an object is
+        recomputed whenever its temperature inputs or its tier change, and the difference is
+        applied to the tier sums, so reading the ESR is O(number of tiers). The rounding errors
+        these differences accumulate are dropped by recomputing the sums exactly (see rebuild())
+        once there have been as many updates as tracked objects, which is O(1) amortized per update.
+
+        Attributes:
+            tier_sums (Dict[StorageNodeType, float]): Σ(nr_est × res_est) per tier.
+        """
+        self.tier_weights = tier_weights
+        self.tier_sums: Dict[StorageNodeType, float] = {node_type: 0.0 for node_type in StorageNodeType}
+
+        # Indexed by the data row of the DataManager
+        self._contributions: List[float] = []
+        self._tiers: List[Optional[StorageNodeType]] = []
+        self._updates_since_rebuild = 0
+
+    @staticmethod
+    def contribution(data_object: DataObject) -> float:
+        """Return nr_est × res_est for the given data object."""
+        nr_est = 10 * data_object.get_temperature()
+        res_est = data_object.size / 10000
+        return nr_est * res_est
+
+    def update(self, row: int, data_object: DataObject, node_type: Optional[StorageNodeType]):
+        """
+        Update the contribution of a data object.
+
+        Args:
+            row (int): The row of the data object in the DataManager.
+            data_object (DataObject): The data object, its temperature and size are read.
+            node_type (Optional[StorageNodeType]): The tier the object is stored on, None if it is not stored.
+        """
+        while row >= len(self._contributions):
+            self._contributions.append(0.0)
+            self._tiers.append(None)
+
+        old_tier = self._tiers[row]
+        if old_tier is not None:
+            self.tier_sums[old_tier] -= self._contributions[row]
+
+        if node_type is None:
+            self._contributions[row] = 0.0
+        else:
+            value = self.contribution(data_object)
+            self.tier_sums[node_type] += value
+            self._contributions[row] = value
+        self._tiers[row] = node_type
+
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= len(self._contributions):
+            self.rebuild()
+
+    def get_value(self) -> float:
+        """Return the current ESR."""
+        return sum(self.tier_weights.get(node_type, 1) * tier_sum for node_type, tier_sum in self.tier_sums.items())
+
+    def rebuild(self):
+        """Recompute the tier sums from the stored contributions, dropping accumulated rounding errors."""
+        values: Dict[StorageNodeType, List[float]] = {node_type: [] for node_type in StorageNodeType}
+        for value, tier in zip(self._contributions, self._tiers):
+            if tier is not None:
+                values[tier].append(value)
+        for node_type, tier_values in values.items():
+            self.tier_sums[node_type] = math.fsum(tier_values)
+        self._updates_since_rebuild = 0
+
+    def reset(self):
+        for node_type in StorageNodeType:
+            self.tier_sums[node_type] = 0.0
+        self._contributions.clear()
+        self._tiers.clear()
+        self._updates_since_rebuild = 0
@@ -1,24 +1,61 @@
 from ..storage_types import StorageNodeType, DataObject
-from ..storage_config import HIERARCHICAL_STORAGE_CONFIG
+from ..storage_config import HIERARCHICAL_STORAGE_CONFIG, MIGRATION_CONFIG
 from .NodeManager import NodeManager
 from .CapacityManager import CapacityManager
 from .DataManager import DataManager
+from .MigrationEngine import MigrationEngine
 from utils.logger import logger
 from utils.Utility import format_data_size
 from ..MetricsCalculator import MetricsCalculator
+from ..SimulationClock import SimulationClock
 
 class HierarchicalStorageSystem:
-    def __init__(self):
-        self.config = HIERARCHICAL_STORAGE_CONFIG
-        self.node_manager = NodeManager(self.config)
+    def __init__(self, config: dict = None, node_config: dict = None, medium_config: dict = None):
+        """
+        Args:
+            config (dict): Topology and replication, HIERARCHICAL_STORAGE_CONFIG by default.
+            node_config (dict): Parameters per StorageNodeType, STORAGE_NODE_CONFIG by default.
+            medium_config (dict): Parameters per StorageMediumType, STORAGE_MEDIUM_CONFIG by default.
+        """
+        self.config = config if config is not None else HIERARCHICAL_STORAGE_CONFIG
+        self.clock = SimulationClock()
+        self.node_manager = NodeManager(self.config, self.clock, node_config, medium_config)
         self.capacity_manager = CapacityManager(self.node_manager)
-        self.data_manager = DataManager(self.node_manager, self.capacity_manager, HIERARCHICAL_STORAGE_CONFIG)
-        
+        self.data_manager = DataManager(self.node_manager, self.capacity_manager, self.config)
+        self.migration_engine = MigrationEngine(
+            self.data_manager, self.capacity_manager, {**MIGRATION_CONFIG, **(self.config.get("migration") or {})}
+        )
+
         self.metrics_calculator = None
 
+        # Incremented on every change of the storage state, used to invalidate cached metrics
+        self.version = 0
+
     def initialize_metrics_calculator(self, metrics_calculator: MetricsCalculator):
         self.metrics_calculator = metrics_calculator
 
+    def mark_changed(self):
+        """Signal a change of the storage state (data, counters or nodes)."""
+        self.version += 1
+
+    def advance_time(self, now: float):
+        """Advance the simulated time (ms), the storage cost of the stored data grows with it."""
+        if self.clock.advance(now):
+            self.mark_changed()
+
+    def tick(self, now: float):
+        """Advance the simulated time (ms) and run the background work due by then (destages, tier migrations)."""
+        self.advance_time(now)
+        if self.data_manager.destage(now):
+            self.mark_changed()
+        if self.migration_engine.tick(now):
+            self.mark_changed()
+
+    @property
+    def next_tick_time(self) -> float:
+        """Simulated time (ms) of the next background work, tick() does nothing but advance the time before it."""
+        return min(self.migration_engine.next_round_time, self.data_manager.next_destage_time())
+
     # Node-related methods
     def get_nodes(self, node_type: StorageNodeType):
         return self.node_manager.get_nodes(node_type)
@@ -28,14 +65,20 @@ class HierarchicalStorageSystem:
 
     def add_node(self, node_type: StorageNodeType, node):
         self.node_manager.add_node(node_type, node)
+        self.mark_changed()
 
     def delete_node(self, node_id: str):
         self.node_manager.delete_node(node_id)
+        self.mark_changed()
 
     # Capacity-related methods
     def get_available_capacity(self, node_type: StorageNodeType):
         return self.capacity_manager.get_available_capacity(node_type)
 
+    def get_required_capacity(self, data_size: int, node_type: StorageNodeType) -> float:
+        """Capacity data of `data_size` KB takes on a node type with its redundancy scheme (replicas or fragments)."""
+        return self.data_manager.get_required_capacity(data_size, node_type)
+
     def has_sufficient_capacity(self, node_type: StorageNodeType, data_size: int):
         return self.capacity_manager.has_sufficient_capacity(node_type, data_size)
 
@@ -56,13 +99,40 @@ class HierarchicalStorageSystem:
         return self.data_manager.has_data(data_id)
 
     def write_to_node(self, node_type: StorageNodeType, data, timestamp: int):
-        return self.data_manager.write_to_node(node_type, data, timestamp)
+        try:
+            return self.data_manager.write_to_node(node_type, data, timestamp)
+        finally:
+            self.mark_changed()
 
     def read_data(self, data_id: str, timestamp: int):
-        return self.data_manager.read_data(data_id, timestamp)
+        try:
+            return self.data_manager.read_data(data_id, timestamp)
+        finally:
+            self.mark_changed()
 
     def delete_data(self, data_id: str, timestamp: int):
-        return self.data_manager.delete_data(data_id, timestamp)
+        try:
+            return self.data_manager.delete_data(data_id, timestamp)
+        finally:
+            self.mark_changed()
+
+    def read_many(self, data_ids, timestamps, times=None):
+        try:
+            return self.data_manager.read_many(data_ids, timestamps, times)
+        finally:
+            self.mark_changed()
+
+    def write_many(self, node_types, data_objects, timestamps, times=None):
+        try:
+            return self.data_manager.write_many(node_types, data_objects, timestamps, times)
+        finally:
+            self.mark_changed()
+
+    def delete_many(self, data_ids, timestamps, times=None):
+        try:
+            return self.data_manager.delete_many(data_ids, timestamps, times)
+        finally:
+            self.mark_changed()
 
     def get_num_files(self):
         return self.data_manager.get_num_files()
@@ -72,6 +142,7 @@ class HierarchicalStorageSystem:
     
     def increment_num_unsuccessful_write(self):
         self.data_manager.increment_num_unsuccessful_write()
+        self.mark_changed()
 
     def get_num_unsuccessful_write(self):
         return self.data_manager.get_num_unsuccessful_write()
@@ -87,6 +158,9 @@ class HierarchicalStorageSystem:
 
     def get_file_num_replicas(self, file_id: str):
         return self.data_manager.get_file_num_replicas(file_id)
+
+    def get_tier_replica_counts(self):
+        return self.data_manager.get_tier_replica_counts()
     
     def print_system_architecture(self):
         logger.info("System Architecture:")
@@ -165,12 +239,10 @@ class HierarchicalStorageSystem:
         return self.metrics_calculator.optimization_function()
     
     def calculate_total_cost_by_node(self, node_type: StorageNodeType) -> float:
-        total_cost = 0
-
-        for node in self.get_nodes(node_type):
-            total_cost += node.total_cost
+        if self.metrics_calculator is not None:
+            return self.metrics_calculator.get_snapshot().tier_costs[node_type]
 
-        return total_cost
+        return sum(node.total_cost for node in self.get_nodes(node_type))
     
     def get_node_types(self) -> list[StorageNodeType]:
         node_types = [StorageNodeType.FAST, StorageNodeType.MEDIUM, StorageNodeType.SLOW]
@@ -179,7 +251,10 @@ class HierarchicalStorageSystem:
     
     def reset(self):
         self.data_manager.reset()
+        self.migration_engine.reset()
+        self.clock.reset()
         self.node_manager.reset()
+        self.mark_changed()
 
     def generate_data(self, data_id: str, size: int) -> DataObject:
         return self.data_manager.generate_data(data_id, size)
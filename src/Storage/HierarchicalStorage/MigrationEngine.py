@@ -0,0 +1,200 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ..storage_types import StorageNodeType
+from utils.logger import logger
+from .CapacityManager import CapacityManager
+from .DataManager import DataManager
+
+@dataclass
+class MigrationStats:
+    """What the migration engine did, sizes in KB of stored data (replicas or fragments) and times in ms."""
+    rounds: int = 0
+    promotions: int = 0  # Hot files moved one tier up
+    demotions: int = 0  # Cold files moved one tier down
+    pressure_demotions: int = 0  # Coldest files moved down to bring a tier back under its low watermark
+    migrated_kb: float = 0  # Stored data moved
+    migration_time: float = 0  # Background time of the migrations
+    deferred: int = 0  # Candidates left to later rounds by the bandwidth/IOPS budget
+    blocked: int = 0  # Candidates not moved because the target tier is full (watermark or node space)
+    cooled: int = 0  # Hotness decays applied to files not accessed during a round
+
+class MigrationEngine:
+    def __init__(self, data_manager: DataManager, capacity_manager: CapacityManager, config: dict):
+        """
+        Move data between tiers in the background according to its temperature (DataObject.get_temperature()).
+
+        Every `interval` ms of simulated time, tick() runs a migration round:
+          1. files not accessed since the previous round cool down by `hotness_decay`;
+          2. the coldest files of a tier above its high watermark are demoted one tier, until the
+             tier is back under its low watermark;
+          3. files at most `demote_temperature` are demoted one tier, the coldest first;
+          4. files at least `promote_temperature` are promoted one tier, the hottest first.
+        A file is only moved to a tier that stays under its high watermark. A round gets a budget of
+        `bandwidth` KB/ms and `iops` replicas per second for the time since the previous round, and
+        moves files while its budget is positive: the last file may overdraw it, the debt is taken
+        from the next rounds (so files larger than a round budget still move), unused budget is lost.
+        The remaining candidates wait for the next rounds.
+
+        Migrations are charged to the nodes (read and write costs, network speed, medium active time),
+        their time is background time that does not delay the client requests (see DataManager.migrate()).
+
+        Args:
+            config (dict): Parameters of the engine, see MIGRATION_CONFIG.
+        """
+        self.data_manager = data_manager
+        self.capacity_manager = capacity_manager
+        self.tier_types = data_manager.node_manager.tier_types
+
+        self.enabled = config["enabled"]
+        self.interval = config["interval"]
+        self.promote_temperature = config["promote_temperature"]
+        self.demote_temperature = config["demote_temperature"]
+        self.hotness_decay = config["hotness_decay"]
+        self.high_watermarks = config["high_watermark"]
+        self.low_watermarks = config["low_watermark"]
+        self.bandwidth = config["bandwidth"]  # KB/ms, None for no limit
+        self.iops = config["iops"]  # Replicas per second, None for no limit
+        if self.promote_temperature <= self.demote_temperature:
+            raise ValueError("MigrationEngine: promote_temperature must be above demote_temperature.")
+
+        self.stats = MigrationStats()
+        self.last_round_time: Optional[float] = None
+        # Simulated time of the next round, the first tick only starts the clock of the engine
+        self.next_round_time = 0.0 if self.enabled else math.inf
+        self._accesses_at_last_round = np.zeros(0)
+        self._budget_kb = 0.0  # Negative when the previous rounds overdrew their budget
+        self._budget_replicas = 0.0
+
+    def tick(self, now: float) -> bool:
+        """
+        Run a migration round if one is due at the simulated time `now` (ms).
+
+        Returns:
+            bool: True if the storage state changed.
+        """
+        if now < self.next_round_time:
+            return False
+        if self.last_round_time is None:
+            self.last_round_time = now
+            self.next_round_time = now + self.interval
+            self._accesses_at_last_round = self.data_manager.data_total_accesses[:len(self.data_manager.data_ids)].copy()
+            return False
+
+        elapsed = now - self.last_round_time
+        self.last_round_time = now
+        self.next_round_time = now + self.interval
+        return self.run_round(elapsed)
+
+    def run_round(self, elapsed: float) -> bool:
+        """Run one migration round with the budget of `elapsed` ms, returns True if the storage state changed."""
+        self.stats.rounds += 1
+        self._budget_kb = min(self._budget_kb, 0) + (self.bandwidth * elapsed if self.bandwidth is not None else math.inf)
+        self._budget_replicas = min(self._budget_replicas, 0) + (self.iops * elapsed / 1000 if self.iops is not None else math.inf)
+        self._budget_exhausted = False
+        self._changed = self._cool_idle_files()
+
+        data_manager = self.data_manager
+        num_rows = len(data_manager.data_ids)
+        temperatures = data_manager.get_temperatures()
+        accesses = data_manager.data_total_accesses[:num_rows]
+        tier_codes = data_manager.get_rows_tier_codes()
+        # Coldest first: lowest temperature, then fewest accesses
+        coldest_first = np.lexsort((accesses, temperatures))
+        moved = np.zeros(num_rows, dtype=bool)
+        slowest_code = len(self.tier_types) - 1
+
+        for code, node_type in enumerate(self.tier_types[:slowest_code]):
+            if self._utilization(node_type) <= self.high_watermarks[node_type]:
+                continue
+            for row in coldest_first[tier_codes[coldest_first] == code]:
+                if self._budget_exhausted or self._utilization(node_type) <= self.low_watermarks[node_type]:
+                    break
+                if self._move(row, code + 1, moved):
+                    self.stats.pressure_demotions += 1
+
+        cold = coldest_first[(temperatures[coldest_first] <= self.demote_temperature) & (tier_codes[coldest_first] >= 0)]
+        for row in cold[tier_codes[cold] < slowest_code]:
+            if self._budget_exhausted:
+                break
+            if not moved[row] and self._move(row, tier_codes[row] + 1, moved):
+                self.stats.demotions += 1
+
+        hottest_first = coldest_first[::-1]
+        hot = hottest_first[temperatures[hottest_first] >= self.promote_temperature]
+        for row in hot[tier_codes[hot] > 0]:
+            if self._budget_exhausted:
+                break
+            if not moved[row] and self._move(row, tier_codes[row] - 1, moved):
+                self.stats.promotions += 1
+
+        if self._budget_exhausted:
+            logger.info(f"MigrationEngine: Round {self.stats.rounds} stopped by the migration budget.")
+        return self._changed
+
+    def _cool_idle_files(self) -> bool:
+        """Decay the hotness level of the files not accessed since the previous round."""
+        data_manager = self.data_manager
+        num_rows = len(data_manager.data_ids)
+        accesses = data_manager.data_total_accesses[:num_rows]
+        previous = self._accesses_at_last_round
+        # Files created since the previous round have been accessed
+        idle = np.zeros(num_rows, dtype=bool)
+        idle[:len(previous)] = accesses[:len(previous)] == previous
+        idle &= data_manager.data_hotness[:num_rows] > 0
+        self._accesses_at_last_round = accesses.copy()
+        if self.hotness_decay <= 0:
+            return False
+
+        rows = np.flatnonzero(idle)
+        for row in rows:
+            data_id = data_manager.data_ids[row]
+            data_object = data_manager.data_objects[data_id]
+            data_object.hotness_level = max(0.0, data_object.hotness_level - self.hotness_decay)
+            data_manager.refresh_data(data_id)
+        self.stats.cooled += len(rows)
+        return len(rows) > 0
+
+    def _utilization(self, node_type: StorageNodeType, extra_kb: float = 0) -> float:
+        capacity = self.capacity_manager.get_nodes_capacity(node_type)
+        return (self.capacity_manager.get_used_storage_size(node_type) + extra_kb) / capacity if capacity else math.inf
+
+    def _move(self, row: int, target_code: int, moved: np.ndarray) -> bool:
+        """Migrate the data of a row to the tier of the given code within the budget and the watermarks."""
+        data_manager = self.data_manager
+        data_id = data_manager.data_ids[row]
+        num_replicas = data_manager.get_file_num_replicas(data_id)
+        migration_kb = data_manager.get_stored_size(data_id)
+        if self._budget_kb <= 0 or self._budget_replicas <= 0:
+            self.stats.deferred += 1
+            self._budget_exhausted = True
+            return False
+
+        target_type = self.tier_types[target_code]
+        target_kb = data_manager.get_required_capacity(float(data_manager.data_sizes[row]), target_type)
+        if self._utilization(target_type, target_kb) > self.high_watermarks[target_type]:
+            self.stats.blocked += 1
+            return False
+        migration_time = data_manager.migrate(data_id, target_type)
+        if migration_time is None:
+            self.stats.blocked += 1
+            return False
+
+        self._budget_kb -= migration_kb
+        self._budget_replicas -= num_replicas
+        self.stats.migrated_kb += migration_kb
+        self.stats.migration_time += migration_time
+        moved[row] = True
+        self._changed = True
+        return True
+
+    def reset(self):
+        self.stats = MigrationStats()
+        self.last_round_time = None
+        self.next_round_time = 0.0 if self.enabled else math.inf
+        self._accesses_at_last_round = np.zeros(0)
+        self._budget_kb = 0.0
+        self._budget_replicas = 0.0
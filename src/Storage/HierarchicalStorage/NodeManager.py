@@ -1,12 +1,21 @@
 from typing import List, Dict
+import numpy as np
+
 from ..StorageNode import StorageNode
 from ..storage_types import StorageNodeType, StorageMediumType
-from ..storage_config import HIERARCHICAL_STORAGE_CONFIG
+from ..storage_config import HIERARCHICAL_STORAGE_CONFIG, STORAGE_NODE_CONFIG, STORAGE_MEDIUM_CONFIG, SERVICE_QUEUE_CONFIG
 from ..StorageMedium import StorageMedium
+from ..SimulationClock import SimulationClock
 
 class NodeManager:
-    def __init__(self, config):
+    def __init__(self, config, clock: SimulationClock = None, node_config: dict = None, medium_config: dict = None):
         self.config = config
+        self.clock = clock if clock is not None else SimulationClock()
+        # Parameters per node type and per medium type, the module configs by default
+        self.node_config = node_config if node_config is not None else STORAGE_NODE_CONFIG
+        self.medium_config = medium_config if medium_config is not None else STORAGE_MEDIUM_CONFIG
+        # Service queues in front of the nodes and media created by the manager
+        self.service_queues = {**SERVICE_QUEUE_CONFIG, **(config.get("service_queue") or {})}["enabled"]
         self.fast_nodes = self._init_nodes(StorageNodeType.FAST, StorageMediumType.NVMe, self.config["num_fast_nodes"])
         self.medium_nodes = self._init_nodes(StorageNodeType.MEDIUM, StorageMediumType.SSD, self.config["num_medium_nodes"])
         self.slow_nodes = self._init_nodes(StorageNodeType.SLOW, StorageMediumType.HDD, self.config["num_slow_nodes"])
@@ -15,16 +24,69 @@ class NodeManager:
         all_nodes = self.fast_nodes + self.medium_nodes + self.slow_nodes
         self.storage_nodes: Dict[str, StorageNode] = {node.id: node for node in all_nodes}
 
+        # Dense node numbering used by the replica location matrix in the DataManager.
+        # Indices are never reused, a deleted node leaves a None slot behind.
+        self.nodes_by_index: List[StorageNode] = []
+        self.node_index: Dict[str, int] = {}
+        self.node_tier_codes = np.empty(0, dtype=np.int8)  # node index -> index in tier_types (-1 if deleted)
+        for node in all_nodes:
+            self._register_node(node)
+
     def _init_nodes(self, node_type: StorageNodeType, medium_type: StorageMediumType, count: int) -> List[StorageNode]:
         return [
             StorageNode(
                 name=f"{node_type.name.lower()}_node_{i}",
                 node_type=node_type,
-                storage_mediums=[StorageMedium(name=f"{node_type.name.lower()}_medium_{i}", type=medium_type)]
+                storage_mediums=[
+                    StorageMedium(
+                        name=f"{node_type.name.lower()}_medium_{i}",
+                        type=medium_type,
+                        config=self.medium_config[medium_type],
+                        service_queue=self.service_queues,
+                    )
+                ],
+                clock=self.clock,
+                config=self.node_config[node_type],
+                service_queue=self.service_queues,
             )
             for i in range(count)
         ]
         
+    def _register_node(self, node: StorageNode) -> int:
+        index = len(self.nodes_by_index)
+        self.nodes_by_index.append(node)
+        self.node_index[node.id] = index
+        self.node_tier_codes = np.append(self.node_tier_codes, np.int8(self.tier_types.index(node.type)))
+        return index
+
+    def get_node_index(self, node_id: str) -> int:
+        index = self.node_index.get(node_id)
+        if index is None:
+            raise ValueError(f"Invalid node id: {node_id}")
+        return index
+
+    def get_node_by_index(self, index: int) -> StorageNode:
+        node = self.nodes_by_index[index]
+        if node is None:
+            raise ValueError(f"Invalid node index: {index}")
+        return node
+
+    def get_expected_read_time_coefficients(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the expected read time coefficients (see StorageNode.get_expected_read_time_coefficients)
+        of every node, indexed by the dense node index. Deleted nodes have zero coefficients.
+        """
+        fixed = np.zeros(len(self.nodes_by_index))
+        per_kb = np.zeros(len(self.nodes_by_index))
+        for index, node in enumerate(self.nodes_by_index):
+            if node is not None:
+                fixed[index], per_kb[index] = node.get_expected_read_time_coefficients()
+        return fixed, per_kb
+
+    def get_tier_code(self, node_type: StorageNodeType) -> int:
+        """Return the integer code used for the node type in node_tier_codes."""
+        return self.tier_types.index(node_type)
+
     def get_node_by_id(self, node_id: str) -> StorageNode:
         node = self.storage_nodes.get(node_id)
         if not node:
@@ -45,8 +107,10 @@ class NodeManager:
         return list(self.storage_nodes.values())
 
     def add_node(self, node_type: StorageNodeType, node: StorageNode):
+        node.attach_clock(self.clock)
         self.get_nodes(node_type).append(node)
         self.storage_nodes[node.id] = node
+        self._register_node(node)
 
     def delete_node(self, node_id: str):
         node = self.storage_nodes.pop(node_id, None)
@@ -55,6 +119,10 @@ class NodeManager:
         nodes = self.get_nodes(node.type)
         nodes[:] = [n for n in nodes if n.id != node_id]
 
+        index = self.node_index.pop(node_id)
+        self.nodes_by_index[index] = None
+        self.node_tier_codes[index] = -1
+
     def cost(self, node_type: StorageNodeType) -> float:
         """
         Calculate the cost of storing data on the specified node type.
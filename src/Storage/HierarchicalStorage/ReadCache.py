@@ -0,0 +1,130 @@
+import zlib
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from ..CachePolicy import CachePolicy, create_cache_policy
+from ..RandomStream import RandomStream
+from ..StorageMedium import StorageMedium
+from ..StorageNode import StorageNode
+from ..storage_types import StorageNodeType, OperationOutcome
+from utils.logger import logger
+from utils.Utility import format_data_size
+from .NodeManager import NodeManager
+
+@dataclass
+class ReadCacheStats:
+    """What the read cache did, sizes in KB and times in ms."""
+    hits: int = 0  # Reads served from the cache
+    misses: int = 0  # Reads of data not in the cache
+    fallbacks: int = 0  # Reads of cached data whose cache node or medium was unavailable or failed
+    hit_kb: float = 0
+    miss_kb: float = 0  # Includes the fallbacks
+    fills: int = 0  # Copies written to the cache after a miss
+    fill_kb: float = 0
+    fill_time: float = 0  # Background time of the fills
+    evictions: int = 0
+    invalidations: int = 0  # Copies dropped because the data was written, deleted or migrated to the FAST tier
+
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses + self.fallbacks
+        return self.hits / lookups if lookups else 0.0
+
+    def byte_hit_ratio(self) -> float:
+        total_kb = self.hit_kb + self.miss_kb
+        return self.hit_kb / total_kb if total_kb else 0.0
+
+class ReadCache:
+    def __init__(self, node_manager: NodeManager, config: dict):
+        """
+        Cache of the data stored on the MEDIUM and SLOW tiers, in a slice of the FAST tier capacity.
+
+        Every medium of the FAST nodes reserves `capacity_fraction` of its capacity for the cache,
+        the reserved slice is no longer available to the stored data. The cache is sharded by data
+        ID over the media, each shard evicts with its own `policy`. A read of data not stored on the
+        FAST tier is served by the shard holding a copy, at the latency of its medium, or reads the
+        replicas and copies the data to the shard in the background. The copies are dropped when
+        the data is written, deleted or migrated to the FAST tier.
+
+        Args:
+            config (dict): Parameters of the cache, see READ_CACHE_CONFIG.
+        """
+        self.policy_config = config["policy"]
+        self.capacity_fraction = config["capacity_fraction"]
+        if not 0 < self.capacity_fraction < 1:
+            raise ValueError(f"ReadCache: capacity_fraction must be in (0, 1), got {self.capacity_fraction}.")
+
+        # Shards in a fixed order, the FAST nodes at the creation of the cache
+        self.shards: List[Tuple[StorageNode, StorageMedium, CachePolicy]] = []
+        for node in node_manager.get_nodes(StorageNodeType.FAST):
+            for medium in node.storage_media:
+                medium.reserve_cache(medium.capacity * self.capacity_fraction)
+                self.shards.append((node, medium, create_cache_policy(self.policy_config, medium.cache_capacity)))
+        if not self.shards:
+            raise ValueError("ReadCache: the FAST tier has no storage media to hold the cache.")
+        self.name = self.shards[0][2].name
+        self.stats = ReadCacheStats()
+
+    def _shard(self, data_id: str) -> Tuple[StorageNode, StorageMedium, CachePolicy]:
+        # Stable across runs, unlike hash() of a str
+        return self.shards[zlib.crc32(data_id.encode()) % len(self.shards)]
+
+    def try_read(self, data_id: str, size: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to serve a read from the cache.
+
+        Returns:
+            tuple[OperationOutcome, float]: SUCCESS and the response time on a hit, NOT_FOUND and 0 on
+                a miss, the outcome of the cache node and the time it took when it was unavailable or failed.
+        """
+        node, medium, policy = self._shard(data_id)
+        if not policy.access(data_id):
+            self.stats.misses += 1
+            self.stats.miss_kb += size
+            return OperationOutcome.NOT_FOUND, 0
+
+        outcome, response_time = node.try_read_cached(medium, size, stream)
+        if outcome != OperationOutcome.SUCCESS:
+            self.stats.fallbacks += 1
+            self.stats.miss_kb += size
+            return outcome, node.get_error_response_time() + response_time
+        node.num_cache_reads += 1
+        self.stats.hits += 1
+        self.stats.hit_kb += size
+        return OperationOutcome.SUCCESS, response_time
+
+    def fill(self, data_id: str, size: int):
+        """Copy data read from its replicas to the cache, evicting the copies chosen by the policy."""
+        node, medium, policy = self._shard(data_id)
+        if data_id in policy or size > policy.capacity:
+            return
+        used = policy.used
+        evicted = policy.admit(data_id, size)
+        if evicted:
+            node.evict_cache(medium, used + size - policy.used)
+            self.stats.evictions += len(evicted)
+            logger.debug(f"ReadCache: Evicted {len(evicted)} copies from {medium.name} for {data_id}.")
+        self.stats.fill_time += node.fill_cache(medium, size)
+        self.stats.fills += 1
+        self.stats.fill_kb += size
+
+    def invalidate(self, data_id: str):
+        """Drop the cached copy of data, if any."""
+        node, medium, policy = self._shard(data_id)
+        size = policy.remove(data_id)
+        if size is not None:
+            node.evict_cache(medium, size)
+            self.stats.invalidations += 1
+
+    def get_capacity(self) -> float:
+        """KB reserved for the cache on the FAST tier."""
+        return sum(medium.cache_capacity for _, medium, _ in self.shards)
+
+    def get_used_capacity(self) -> float:
+        """KB of cached copies."""
+        return sum(policy.used for _, _, policy in self.shards)
+
+    def reset(self):
+        for _, _, policy in self.shards:
+            policy.clear()
+        self.stats = ReadCacheStats()
+        logger.info(f"ReadCache: {self.name} cache reset, {format_data_size(self.get_capacity())} reserved on the FAST tier.")
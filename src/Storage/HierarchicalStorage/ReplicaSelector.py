@@ -0,0 +1,212 @@
+import random
+from dataclasses import dataclass
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Union
+
+from ..LatencyHistogram import LatencyHistogram
+from .NodeManager import NodeManager
+
+@dataclass
+class ReplicaSelectionStats:
+    """What the replica selection of the reads did, times in ms."""
+    hedged_reads: int = 0  # Second reads sent after the hedge delay (extra device load)
+    hedge_wins: int = 0  # Second reads that finished first
+    hedge_device_time: float = 0  # Device time of the second reads
+    hedge_time_saved: float = 0  # Client time saved by the winning second reads
+
+class ReplicaSelector:
+    name = "uniform"
+
+    def __init__(self, node_manager: NodeManager):
+        """
+        Choose the replica every read attempt is sent to, uniformly at random.
+
+        The DataManager calls select() before every read attempt and on_read() after every successful
+        node read, subclasses use them to route reads by load or latency history. The reads are the
+        only requests routed, the state follows the reads only.
+        """
+        self.node_manager = node_manager
+        self.stats = ReplicaSelectionStats()
+
+    def select(self, candidates: List[int], remaining: int, now: float) -> int:
+        """
+        Choose the replica to read.
+
+        Args:
+            candidates (List[int]): Dense node indices of the replicas, the first `remaining` ones can be read.
+            remaining (int): Number of candidates.
+            now (float): Simulated time of the attempt in ms.
+
+        Returns:
+            int: The position of the chosen replica in `candidates`.
+        """
+        return random.randrange(remaining)
+
+    def on_read(self, node_index: int, start_time: float, response_time: float):
+        """Record a successful read of a node started at `start_time` that took `response_time` ms."""
+        pass
+
+    def hedge_delay(self, node_index: int) -> Optional[float]:
+        """Time in ms after which a read of the node is hedged on another replica, None to never hedge."""
+        return None
+
+    def reset(self):
+        self.stats = ReplicaSelectionStats()
+
+class LoadAwareReplicaSelector(ReplicaSelector):
+    def __init__(self, node_manager: NodeManager, ewma_alpha: float = 0.3):
+        """
+        Base of the selectors using the outstanding reads and the latency history of the nodes.
+
+        A read is outstanding on a node from its start until its completion, in simulated time.
+        The latency history is an exponentially weighted moving average (EWMA) of the node response
+        times, a node not read yet has an EWMA of 0 so that it is tried first.
+
+        Args:
+            ewma_alpha (float): Weight of the last response time in the EWMA, in (0, 1].
+        """
+        super().__init__(node_manager)
+        if not 0 < ewma_alpha <= 1:
+            raise ValueError(f"ReplicaSelector: ewma_alpha must be in (0, 1], got {ewma_alpha}.")
+        self.ewma_alpha = ewma_alpha
+        self._completions: Dict[int, List[float]] = {}  # node index -> heap of completion times
+        self._ewma: Dict[int, float] = {}  # node index -> EWMA of the response times
+
+    def outstanding(self, node_index: int, now: float) -> int:
+        """Number of reads of the node started before `now` and not completed at `now`."""
+        completions = self._completions.get(node_index)
+        if not completions:
+            return 0
+        while completions and completions[0] <= now:
+            heappop(completions)
+        return len(completions)
+
+    def ewma(self, node_index: int) -> float:
+        return self._ewma.get(node_index, 0.0)
+
+    def on_read(self, node_index: int, start_time: float, response_time: float):
+        heappush(self._completions.setdefault(node_index, []), start_time + response_time)
+        previous = self._ewma.get(node_index)
+        if previous is None:
+            self._ewma[node_index] = response_time
+        else:
+            self._ewma[node_index] = previous + self.ewma_alpha * (response_time - previous)
+
+    def _select_min(self, candidates: List[int], positions, key) -> int:
+        """Position with the smallest key, ties broken at random."""
+        best = None
+        best_positions = []
+        for position in positions:
+            value = key(candidates[position])
+            if best is None or value < best:
+                best = value
+                best_positions = [position]
+            elif value == best:
+                best_positions.append(position)
+        return best_positions[0] if len(best_positions) == 1 else random.choice(best_positions)
+
+    def reset(self):
+        super().reset()
+        self._completions.clear()
+        self._ewma.clear()
+
+class LeastOutstandingReplicaSelector(LoadAwareReplicaSelector):
+    """Read the replica with the fewest outstanding reads."""
+    name = "least_outstanding"
+
+    def select(self, candidates: List[int], remaining: int, now: float) -> int:
+        return self._select_min(candidates, range(remaining), lambda node_index: self.outstanding(node_index, now))
+
+class EwmaReplicaSelector(LoadAwareReplicaSelector):
+    """
+    Read the replica with the lowest expected latency, EWMA × (outstanding reads + 1). Weighting
+    the history by the current load keeps all the reads from herding onto the fastest node.
+    """
+    name = "ewma"
+
+    def select(self, candidates: List[int], remaining: int, now: float) -> int:
+        return self._select_min(
+            candidates, range(remaining), lambda node_index: self.ewma(node_index) * (self.outstanding(node_index, now) + 1)
+        )
+
+class PowerOfTwoReplicaSelector(LoadAwareReplicaSelector):
+    """
+    Sample two replicas at random and read the one with fewer outstanding reads, then with the lower EWMA.
+    Only two nodes are inspected per read, whatever the number of replicas.
+    """
+    name = "power_of_two"
+
+    def select(self, candidates: List[int], remaining: int, now: float) -> int:
+        if remaining <= 2:
+            positions = range(remaining)
+        else:
+            positions = random.sample(range(remaining), 2)
+        return self._select_min(
+            candidates, positions, lambda node_index: (self.outstanding(node_index, now), self.ewma(node_index))
+        )
+
+class HedgedReplicaSelector(ReplicaSelector):
+    name = "hedged"
+
+    def __init__(self, node_manager: NodeManager, hedge_percentile: float = 95, min_samples: int = 100, refresh_interval: int = 100):
+        """
+        Read a replica chosen uniformly at random and, when it has not answered after the
+        `hedge_percentile` of the read response times of its tier, read a second replica and take
+        the first to finish. The slower read is not cancelled, its device time is extra load.
+
+        Args:
+            hedge_percentile (float): Percentile of the response times used as the hedge delay.
+            min_samples (int): Reads of a tier needed before its reads are hedged.
+            refresh_interval (int): Reads of a tier between two updates of its hedge delay.
+        """
+        super().__init__(node_manager)
+        if not 0 < hedge_percentile < 100:
+            raise ValueError(f"ReplicaSelector: hedge_percentile must be in (0, 100), got {hedge_percentile}.")
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.refresh_interval = max(int(refresh_interval), 1)
+        self._tier_histograms: Dict[int, LatencyHistogram] = {}  # tier code -> read response times
+        self._tier_delays: Dict[int, float] = {}  # tier code -> hedge delay
+
+    def on_read(self, node_index: int, start_time: float, response_time: float):
+        tier_code = int(self.node_manager.node_tier_codes[node_index])
+        histogram = self._tier_histograms.get(tier_code)
+        if histogram is None:
+            histogram = self._tier_histograms[tier_code] = LatencyHistogram()
+        histogram.record(response_time)
+        if histogram.total_count >= self.min_samples and histogram.total_count % self.refresh_interval == 0:
+            self._tier_delays[tier_code] = histogram.get_value_at_percentile(self.hedge_percentile)
+
+    def hedge_delay(self, node_index: int) -> Optional[float]:
+        return self._tier_delays.get(int(self.node_manager.node_tier_codes[node_index]))
+
+    def reset(self):
+        super().reset()
+        self._tier_histograms.clear()
+        self._tier_delays.clear()
+
+REPLICA_SELECTORS = {
+    selector.name: selector
+    for selector in (
+        ReplicaSelector,
+        LeastOutstandingReplicaSelector,
+        EwmaReplicaSelector,
+        PowerOfTwoReplicaSelector,
+        HedgedReplicaSelector,
+    )
+}
+
+def create_replica_selector(config: Union[str, dict, None], node_manager: NodeManager) -> ReplicaSelector:
+    """
+    Create the replica selector of a configuration: the name of a strategy (see REPLICA_SELECTORS),
+    or a dict with its "name" and its parameters, e.g. {"name": "hedged", "hedge_percentile": 99}.
+    """
+    if config is None:
+        return ReplicaSelector(node_manager)
+    parameters = {}
+    if isinstance(config, dict):
+        parameters = {key: value for key, value in config.items() if key != "name"}
+        config = config["name"]
+    if config not in REPLICA_SELECTORS:
+        raise ValueError(f"ReplicaSelector: unknown replica selection {config}, expected one of {list(REPLICA_SELECTORS)}.")
+    return REPLICA_SELECTORS[config](node_manager, **parameters)
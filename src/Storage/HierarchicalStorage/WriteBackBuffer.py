@@ -0,0 +1,277 @@
+import math
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from ..RandomStream import RandomStream
+from ..StorageMedium import StorageMedium
+from ..StorageNode import StorageNode
+from ..storage_types import DataObject, StorageNodeType, OperationOutcome
+from utils.logger import logger
+from utils.Utility import format_data_size
+from .NodeManager import NodeManager
+
+@dataclass
+class BufferedWrite:
+    """A write acknowledged by the write-back buffer and not destaged to its tier yet."""
+    data: DataObject
+    node_type: StorageNodeType  # Tier chosen for the data
+    timestamp: int
+
+@dataclass
+class WriteBackStats:
+    """What the write-back buffer did, sizes in KB and times in ms."""
+    buffered_writes: int = 0  # Writes acknowledged once in the buffer
+    buffered_kb: float = 0
+    buffered_time: float = 0  # Client time of the buffered writes, stalls included
+    write_throughs: int = 0  # Writes sent to their tier directly (larger than a buffer shard or buffer node unavailable)
+    coalesced: int = 0  # Buffered writes superseded by an overwrite before their destage
+    coalesced_kb: float = 0  # Destage traffic saved by the coalescing
+    discarded: int = 0  # Buffered writes dropped by a delete or a write to the FAST tier before their destage
+    stalls: int = 0  # Writes that waited for the destage to free space
+    stall_time: float = 0
+    destages: int = 0
+    destaged_kb: float = 0
+    destage_time: float = 0  # Background time of the destages (buffer read and tier write)
+    destage_failures: int = 0  # Destages whose tier write failed, the data is lost
+    reads: int = 0  # Reads served from the buffer
+    max_occupancy: float = 0  # Peak KB in the buffer
+
+class _BufferShard:
+    """The write-back buffer slice of one FAST medium, destaged in FIFO order."""
+
+    def __init__(self, node: StorageNode, medium: StorageMedium, bandwidth: float):
+        self.node = node
+        self.medium = medium
+        self.capacity = medium.buffer_capacity
+        self.bandwidth = bandwidth  # KB/ms
+        self.used = 0.0
+        self.writes: "OrderedDict[str, BufferedWrite]" = OrderedDict()  # Oldest first
+        self.drain_time: Optional[float] = None  # Simulated time the destage progress is computed up to
+        self.head_progress = 0.0  # KB of the oldest write destaged so far
+        self.occupancy_kb_ms = 0.0  # Used KB integrated over time
+
+    def next_completion_time(self) -> float:
+        if not self.writes:
+            return math.inf
+        head = next(iter(self.writes.values()))
+        return self.drain_time + (head.data.size - self.head_progress) / self.bandwidth
+
+    def time_when_free(self, size: float) -> float:
+        """Simulated time at which the destage has freed `size` KB more, `size` is at most the used KB."""
+        # Same arithmetic as advance() so that advancing to this time completes the writes exactly
+        time = self.drain_time
+        freed = 0.0
+        progress = self.head_progress
+        for write in self.writes.values():
+            time = time + (write.data.size - progress) / self.bandwidth
+            progress = 0.0
+            freed += write.data.size
+            if freed >= size:
+                break
+        return time
+
+    def advance(self, now: float) -> List[BufferedWrite]:
+        """Progress the destage up to `now`, returns the writes whose destage completed, oldest first."""
+        if self.drain_time is None:
+            self.drain_time = now
+        time = self.drain_time
+        completed = []
+        while self.writes and time < now:
+            head = next(iter(self.writes.values()))
+            completion_time = time + (head.data.size - self.head_progress) / self.bandwidth
+            if completion_time > now:
+                self.head_progress += (now - time) * self.bandwidth
+                break
+            self.occupancy_kb_ms += self.used * (completion_time - time)
+            time = completion_time
+            self.writes.popitem(last=False)
+            self.head_progress = 0.0
+            self.used -= head.data.size
+            completed.append(head)
+        if now > time:
+            self.occupancy_kb_ms += self.used * (now - time)
+        self.drain_time = max(self.drain_time, now)
+        return completed
+
+    def remove(self, data_id: str) -> Optional[BufferedWrite]:
+        if next(iter(self.writes), None) == data_id:
+            self.head_progress = 0.0
+        write = self.writes.pop(data_id, None)
+        if write is not None:
+            self.used -= write.data.size
+        return write
+
+class WriteBackBuffer:
+    def __init__(self, node_manager: NodeManager, config: dict, destage: Callable[[BufferedWrite, RandomStream], Tuple[OperationOutcome, float]]):
+        """
+        Buffer on the FAST tier acknowledging the writes to the slower tiers before they reach them.
+
+        Every medium of the FAST nodes reserves `capacity_fraction` of its capacity for the buffer,
+        the writes are sharded by data ID over the media. A write lands in its shard and is
+        acknowledged, then the shard destages its writes in FIFO order at `bandwidth` KB/ms (split
+        evenly between the shards) by writing them to the tier chosen for them with `destage`.
+        An overwrite of data still in the buffer replaces the buffered write, which is then
+        destaged once. A write stalls until the destage frees enough space in a full shard.
+
+        Args:
+            config (dict): Parameters of the buffer, see WRITE_BACK_CONFIG.
+            destage (Callable): Writes a buffered write to its tier in the background with the random numbers
+                of a stream, returns the outcome and the time it took.
+        """
+        self.capacity_fraction = config["capacity_fraction"]
+        bandwidth = config["bandwidth"]
+        if not 0 < self.capacity_fraction < 1:
+            raise ValueError(f"WriteBackBuffer: capacity_fraction must be in (0, 1), got {self.capacity_fraction}.")
+        if bandwidth is not None and bandwidth <= 0:
+            raise ValueError(f"WriteBackBuffer: bandwidth must be positive, got {bandwidth}.")
+        self.bandwidth = bandwidth if bandwidth is not None else math.inf
+        self.destage = destage
+
+        media = [(node, medium) for node in node_manager.get_nodes(StorageNodeType.FAST) for medium in node.storage_media]
+        if not media:
+            raise ValueError("WriteBackBuffer: the FAST tier has no storage media to hold the buffer.")
+        # Shards in a fixed order, the FAST nodes at the creation of the buffer
+        self.shards: List[_BufferShard] = []
+        for node, medium in media:
+            medium.reserve_buffer(medium.capacity * self.capacity_fraction)
+            self.shards.append(_BufferShard(node, medium, self.bandwidth / len(media)))
+        self.start_time: Optional[float] = None
+        self.stats = WriteBackStats()
+
+    def _shard(self, data_id: str) -> _BufferShard:
+        # Stable across runs, unlike hash() of a str
+        return self.shards[zlib.crc32(data_id.encode()) % len(self.shards)]
+
+    def __contains__(self, data_id: str) -> bool:
+        return data_id in self._shard(data_id).writes
+
+    def get(self, data_id: str) -> Optional[BufferedWrite]:
+        return self._shard(data_id).writes.get(data_id)
+
+    def next_destage_time(self) -> float:
+        """Simulated time (ms) at which the next destage completes, inf if the buffer is empty."""
+        return min(shard.next_completion_time() for shard in self.shards)
+
+    def advance(self, now: float, stream: RandomStream) -> bool:
+        """Destage the writes completed by `now`, returns True if there were any."""
+        destaged = False
+        for shard in self.shards:
+            destaged |= self._advance(shard, now, stream)
+        return destaged
+
+    def _advance(self, shard: _BufferShard, now: float, stream: RandomStream) -> bool:
+        if self.start_time is None:
+            self.start_time = now
+        completed = shard.advance(now)
+        for write in completed:
+            read_time = shard.node.destage_buffer(shard.medium, write.data.size)
+            outcome, write_time = self.destage(write, stream)
+            self.stats.destages += 1
+            self.stats.destaged_kb += write.data.size
+            self.stats.destage_time += read_time + write_time
+            if outcome != OperationOutcome.SUCCESS:
+                self.stats.destage_failures += 1
+                logger.info(f"WriteBackBuffer: Destage of {write.data.id} to {write.node_type.name} failed ({outcome.name}).")
+        return len(completed) > 0
+
+    def try_write(self, data: DataObject, node_type: StorageNodeType, timestamp: int, now: float, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to write data to the buffer at the simulated time `now`.
+
+        Returns:
+            tuple[OperationOutcome, float]: SUCCESS and the client response time (stall included) when the
+                write is buffered, INSUFFICIENT_CAPACITY and 0 when the data is larger than its shard, the
+                outcome of the buffer node and the time it took when it was unavailable or failed.
+        """
+        shard = self._shard(data.id)
+        if data.size > shard.capacity:
+            self.stats.write_throughs += 1
+            return OperationOutcome.INSUFFICIENT_CAPACITY, 0
+
+        self._advance(shard, now, stream)
+        superseded = shard.remove(data.id)
+        if superseded is not None:
+            shard.node.release_buffer(shard.medium, superseded.data.size)
+            self.stats.coalesced += 1
+            self.stats.coalesced_kb += superseded.data.size
+
+        stall_time = 0.0
+        if shard.used + data.size > shard.capacity:
+            free_time = shard.time_when_free(shard.used + data.size - shard.capacity)
+            stall_time = free_time - now
+            self._advance(shard, free_time, stream)
+            self.stats.stalls += 1
+            self.stats.stall_time += stall_time
+
+        outcome, response_time = shard.node.try_write_buffered(shard.medium, data.size, stream)
+        if outcome != OperationOutcome.SUCCESS:
+            self.stats.write_throughs += 1
+            return outcome, stall_time + shard.node.get_error_response_time() + response_time
+
+        shard.writes[data.id] = BufferedWrite(data, node_type, timestamp)
+        shard.used += data.size
+        self.stats.buffered_writes += 1
+        self.stats.buffered_kb += data.size
+        self.stats.buffered_time += stall_time + response_time
+        self.stats.max_occupancy = max(self.stats.max_occupancy, self.get_used_capacity())
+        return OperationOutcome.SUCCESS, stall_time + response_time
+
+    def try_read(self, data_id: str, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to read buffered data from the buffer.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time, the time the buffer node
+                took when it was unavailable or failed.
+        """
+        shard = self._shard(data_id)
+        outcome, response_time = shard.node.try_read_cached(shard.medium, shard.writes[data_id].data.size, stream)
+        if outcome != OperationOutcome.SUCCESS:
+            return outcome, shard.node.get_error_response_time() + response_time
+        self.stats.reads += 1
+        return OperationOutcome.SUCCESS, response_time
+
+    def discard(self, data_id: str) -> Optional[float]:
+        """Drop the buffered write of data, returns the time the buffer node took or None if data is not buffered."""
+        shard = self._shard(data_id)
+        write = shard.remove(data_id)
+        if write is None:
+            return None
+        shard.node.release_buffer(shard.medium, write.data.size)
+        self.stats.discarded += 1
+        return shard.node.process_time + shard.node.network_delete_latency
+
+    def get_capacity(self) -> float:
+        """KB reserved for the buffer on the FAST tier."""
+        return sum(shard.capacity for shard in self.shards)
+
+    def get_used_capacity(self) -> float:
+        """KB of buffered writes."""
+        return sum(shard.used for shard in self.shards)
+
+    def get_num_pending_writes(self) -> int:
+        return sum(len(shard.writes) for shard in self.shards)
+
+    def get_mean_occupancy(self, now: float) -> float:
+        """Time-weighted mean KB in the buffer from its first write to `now`."""
+        if self.start_time is None or now <= self.start_time:
+            return 0.0
+        occupancy_kb_ms = sum(
+            shard.occupancy_kb_ms + shard.used * max(now - shard.drain_time, 0)
+            for shard in self.shards
+            if shard.drain_time is not None
+        )
+        return occupancy_kb_ms / (now - self.start_time)
+
+    def reset(self):
+        for shard in self.shards:
+            shard.writes.clear()
+            shard.used = 0.0
+            shard.drain_time = None
+            shard.head_progress = 0.0
+            shard.occupancy_kb_ms = 0.0
+        self.start_time = None
+        self.stats = WriteBackStats()
+        logger.info(f"WriteBackBuffer: Buffer reset, {format_data_size(self.get_capacity())} reserved on the FAST tier.")
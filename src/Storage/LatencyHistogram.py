@@ -0,0 +1,152 @@
+import math
+import numpy as np
+from typing import Dict, Iterable
+
+# Percentiles reported by default
+DEFAULT_PERCENTILES = (50, 90, 99, 99.9)
+
+class LatencyHistogram:
+    def __init__(self, lowest: float = 0.001, highest: float = 3_600_000, relative_precision: float = 0.01):
+        """
+        HDR-style latency histogram with logarithmic buckets.
+
+        Every bucket covers a range [lowest × base^(i-1), lowest × base^i) with base = 1 + relative_precision,
+        so any recorded value is reported within the relative precision, memory is fixed and recording is O(1).
+        Histograms with the same layout can be merged, which allows combining them across nodes, tiers and
+        parallel workers without keeping the raw samples.
+
+        Args:
+            lowest (float): Lowest distinguishable value in milliseconds, smaller values go to the first bucket.
+            highest (float): Highest tracked value in milliseconds, larger values go to the last bucket.
+            relative_precision (float): Relative width of a bucket.
+        """
+        if lowest <= 0 or highest <= lowest or relative_precision <= 0:
+            raise ValueError("LatencyHistogram: lowest must be positive, highest > lowest and relative_precision > 0.")
+
+        self.lowest = lowest
+        self.highest = highest
+        self.relative_precision = relative_precision
+        self._inv_log_base = 1 / math.log1p(relative_precision)
+
+        num_buckets = int(math.ceil(math.log(highest / lowest) * self._inv_log_base)) + 2
+        self.counts = np.zeros(num_buckets, dtype=np.int64)
+        self.total_count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        """Record a single latency value in milliseconds."""
+        if value < self.lowest:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.lowest) * self._inv_log_base) + 1, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.total_count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _same_layout(self, other: "LatencyHistogram") -> bool:
+        return (
+            self.lowest == other.lowest
+            and self.highest == other.highest
+            and self.relative_precision == other.relative_precision
+        )
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add the samples of another histogram with the same layout to this one."""
+        if not self._same_layout(other):
+            raise ValueError("LatencyHistogram: cannot merge histograms with different layouts.")
+
+        self.counts += other.counts
+        self.total_count += other.total_count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @staticmethod
+    def merge_all(histograms: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        """Return a new histogram holding the samples of all the given histograms."""
+        merged = None
+        for histogram in histograms:
+            if merged is None:
+                merged = histogram.copy()
+            else:
+                merged.merge(histogram)
+        return merged if merged is not None else LatencyHistogram()
+
+    def difference(self, earlier: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        Return the samples recorded since an earlier copy of this histogram.
+
+        The exact minimum and maximum of the difference are unknown, they are taken
+        from the lowest and highest non-empty buckets.
+        """
+        if not self._same_layout(earlier):
+            raise ValueError("LatencyHistogram: cannot subtract histograms with different layouts.")
+
+        histogram = LatencyHistogram(self.lowest, self.highest, self.relative_precision)
+        histogram.counts = self.counts - earlier.counts
+        histogram.total_count = self.total_count - earlier.total_count
+        histogram.total = self.total - earlier.total
+        non_empty = np.flatnonzero(histogram.counts)
+        if len(non_empty):
+            histogram.min = max(self.min, histogram._bucket_value(non_empty[0]))
+            histogram.max = min(self.max, histogram._bucket_value(non_empty[-1]))
+        return histogram
+
+    def copy(self) -> "LatencyHistogram":
+        histogram = LatencyHistogram(self.lowest, self.highest, self.relative_precision)
+        return histogram.merge(self)
+
+    def _bucket_value(self, index: int) -> float:
+        """Representative (geometric middle) value of a bucket."""
+        if index == 0:
+            return self.lowest
+        base = 1 + self.relative_precision
+        return self.lowest * base ** (index - 0.5)
+
+    def get_value_at_percentile(self, percentile: float) -> float:
+        """
+        Get the latency below which the given percentage of the samples fall.
+
+        Args:
+            percentile (float): Percentile in [0, 100].
+
+        Returns:
+            float: The latency in milliseconds, 0 if the histogram is empty.
+        """
+        if self.total_count == 0:
+            return 0.0
+
+        rank = max(1, int(math.ceil(percentile / 100 * self.total_count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        # The exact extremes are known, keep the estimate within them
+        return min(max(self._bucket_value(index), self.min), self.max)
+
+    def get_mean(self) -> float:
+        return self.total / self.total_count if self.total_count else 0.0
+
+    def get_summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """
+        Get the count, mean, percentiles and maximum of the recorded latencies.
+
+        Returns:
+            Dict[str, float]: e.g. {"count": 10, "mean": 1.2, "p50": 1.0, "p99.9": 3.1, "max": 3.2}
+        """
+        summary = {"count": self.total_count, "mean": self.get_mean()}
+        for percentile in percentiles:
+            summary[f"p{percentile:g}"] = self.get_value_at_percentile(percentile)
+        summary["max"] = self.max if self.total_count else 0.0
+        return summary
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total_count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
@@ -1,152 +1,333 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import numpy as np
+
 import Storage.HierarchicalStorage as HierarchicalStorageSystem
 from utils.logger import logger
+from .storage_config import ESR_TIER_WEIGHTS
+from .storage_types import RequestType, StorageNodeType
+from .LatencyHistogram import LatencyHistogram
+from .RetryPolicy import RetryStats
+
+@dataclass
+class MetricsSnapshot:
+    """
+    System-wide metrics gathered in a single traversal of the storage nodes.
+
+    A snapshot is only valid for the storage system version it was computed for,
+    see MetricsCalculator.get_snapshot().
+    """
+    version: int
+    total_cost: float = 0
+    total_read_response_time: float = 0
+    total_write_response_time: float = 0
+    total_delete_response_time: float = 0
+    total_reads: int = 0
+    total_writes: int = 0
+    total_deletes: int = 0
+    total_unavailability: int = 0
+    total_capacity: int = 0
+    total_available_capacity: int = 0
+    num_successful_write: int = 0
+    num_unsuccessful_write: int = 0
+    num_successful_read: int = 0
+    num_unsuccessful_read: int = 0
+    total_storage_cost: float = 0
+    total_storage_gb_hours: float = 0
+    total_energy: float = 0  # joules
+    tier_costs: Dict[StorageNodeType, float] = field(default_factory=dict)
+    tier_storage_costs: Dict[StorageNodeType, float] = field(default_factory=dict)
+    tier_storage_gb_hours: Dict[StorageNodeType, float] = field(default_factory=dict)
+    tier_used_capacity: Dict[StorageNodeType, int] = field(default_factory=dict)
+    tier_available_capacity: Dict[StorageNodeType, int] = field(default_factory=dict)
+    tier_energy: Dict[StorageNodeType, float] = field(default_factory=dict)
+    # Service queues of the nodes, empty when queueing is disabled
+    tier_queue_wait_time: Dict[StorageNodeType, float] = field(default_factory=dict)
+    tier_max_queue_depth: Dict[StorageNodeType, int] = field(default_factory=dict)
+    tier_queue_utilization: Dict[StorageNodeType, float] = field(default_factory=dict)
+
+    @property
+    def total_response_time(self) -> float:
+        return self.total_read_response_time + self.total_write_response_time + self.total_delete_response_time
+
+    @property
+    def total_access(self) -> int:
+        return self.total_reads + self.total_writes + self.total_deletes
+
+    @property
+    def num_served_operations(self) -> int:
+        return self.num_successful_read + self.num_successful_write
 
 class MetricsCalculator:
 
-    def __init__(self, sys: HierarchicalStorageSystem):
+    def __init__(self, sys: HierarchicalStorageSystem, alpha: float = 1, beta: float = 1, gamma: float = 1, delta: float = 1):
         self.sys = sys
-        self.alpha = 1
-        self.beta = 1
-        self.gamma = 1
-        self.delta = 1
+        # Weights of the optimization function
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.delta = delta
+
+        self._snapshot: Optional[MetricsSnapshot] = None
+
+    def get_snapshot(self) -> MetricsSnapshot:
+        """
+        Get the metrics of the current storage state.
+
+        The snapshot is computed in one pass over the nodes and cached until the version
+        counter of the storage system changes, so it is cheap to query repeatedly
+        (e.g. from placement algorithms scoring every write).
+        """
+        version = self.sys.version
+        if self._snapshot is None or self._snapshot.version != version:
+            self._snapshot = self._compute_snapshot(version)
+        return self._snapshot
+
+    def _compute_snapshot(self, version: int) -> MetricsSnapshot:
+        snapshot = MetricsSnapshot(
+            version=version,
+            num_successful_write=self.sys.get_num_successful_write(),
+            num_unsuccessful_write=self.sys.get_num_unsuccessful_write(),
+            num_successful_read=self.sys.get_num_successful_read(),
+            num_unsuccessful_read=self.sys.get_num_unsuccessful_read(),
+        )
+
+        for node_type in self.sys.get_node_types():
+            tier_cost = 0
+            tier_storage_cost = 0
+            tier_storage_gb_hours = 0
+            tier_energy = 0
+            tier_queues = []
+            tier_used_capacity = 0
+            tier_available_capacity = 0
+
+            for node in self.sys.get_nodes(node_type):
+                snapshot.total_read_response_time += node.total_read_response_time
+                snapshot.total_write_response_time += node.total_write_response_time
+                snapshot.total_delete_response_time += node.total_delete_response_time
+                snapshot.total_reads += node.num_reads
+                snapshot.total_writes += node.num_writes
+                snapshot.total_deletes += node.num_deletes
+                snapshot.total_unavailability += node.num_unavailable
+                snapshot.total_capacity += node.get_total_capacity()
+
+                tier_storage_cost += node.get_storage_cost()
+                tier_storage_gb_hours += node.get_storage_gb_hours()
+                tier_cost += node.total_cost
+                tier_energy += node.get_energy()
+                if node.service_queue is not None:
+                    tier_queues.append(node.service_queue)
+                tier_used_capacity += node.get_used_capacity()
+                tier_available_capacity += node.get_node_available_space()
+
+            tier_cost += tier_storage_cost
+            snapshot.tier_costs[node_type] = tier_cost
+            snapshot.tier_storage_costs[node_type] = tier_storage_cost
+            snapshot.tier_storage_gb_hours[node_type] = tier_storage_gb_hours
+            snapshot.total_storage_cost += tier_storage_cost
+            snapshot.total_storage_gb_hours += tier_storage_gb_hours
+            snapshot.tier_used_capacity[node_type] = tier_used_capacity
+            snapshot.tier_available_capacity[node_type] = tier_available_capacity
+            snapshot.tier_energy[node_type] = tier_energy
+            if tier_queues:
+                snapshot.tier_queue_wait_time[node_type] = sum(queue.total_wait_time for queue in tier_queues)
+                snapshot.tier_max_queue_depth[node_type] = max(queue.max_queue_depth for queue in tier_queues)
+                snapshot.tier_queue_utilization[node_type] = sum(queue.get_utilization() for queue in tier_queues) / len(tier_queues)
+            snapshot.total_energy += tier_energy
+            snapshot.total_cost += tier_cost
+            snapshot.total_available_capacity += tier_available_capacity
+
+        return snapshot
     
     def calculate_total_available_capacity(self):
-        total_available_capacity = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_available_capacity += node.get_node_available_space()
-        
-        return total_available_capacity
+        return self.get_snapshot().total_available_capacity
 
     def calculate_total_read_response_time(self):
-        total_read_response_time = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_read_response_time += node.total_read_response_time
-        
-        return total_read_response_time
+        return self.get_snapshot().total_read_response_time
     
     def calculate_total_write_response_time(self):
-        total_write_response_time = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_write_response_time += node.total_write_response_time
-        
-        return total_write_response_time
+        return self.get_snapshot().total_write_response_time
     
     def calculate_total_delete_response_time(self):
-        total_delete_response_time = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_delete_response_time += node.total_delete_response_time
-        
-        return total_delete_response_time
+        return self.get_snapshot().total_delete_response_time
     
     def calculate_total_read(self):
-        total_read = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_read += node.num_reads
-        
-        return total_read
+        return self.get_snapshot().total_reads
     
     def calculate_total_write(self):
-        total_write = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_write += node.num_writes
-        
-        return total_write
+        return self.get_snapshot().total_writes
     
     def calculate_total_delete(self):
-        total_delete = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_delete += node.num_deletes
-        
-        return total_delete
+        return self.get_snapshot().total_deletes
     
-    def calculate_current_total_read_time(self):
+    def estimate_read_times(self) -> np.ndarray:
         """
-        Calculate the total response time of the system by trying to read all the files 
-        from all the nodes then summing up the time taken to read each file.
+        Estimate the expected time to read each file from its current placement.
+
+        A read goes to a uniformly chosen replica, so the expected time of a file is the mean of
+        fixed + per_kb × size over its replica nodes (see StorageNode.get_expected_read_time_coefficients).
+        An erasure-coded read gathers k fragments in parallel, its expected time is approximated by the
+        mean over the fragment nodes with the fragment size.
+        It is computed analytically and vectorized over all files, the storage state is not touched.
+
+        Returns:
+            np.ndarray: Expected read time in ms per row of the DataManager, 0 for files without replicas.
         """
-        total_read_response_time = 0
-
-        # Get all the data objects and their corresponding nodes
-        for data_id, nodes_ids in self.sys.data_manager.data_to_nodes.items():
-            # Read the data from all the nodes
-            for node_id in nodes_ids:
-                node = self.sys.node_manager.storage_nodes.get(node_id)
-                try:
-                    total_read_response_time += node.read_data(data_id)
-                except Exception as e:
-                    logger.error(f"MetricsCalculator: Error during read: {e}")
-        
-        return total_read_response_time
+        data_manager = self.sys.data_manager
+        fixed, per_kb = self.sys.node_manager.get_expected_read_time_coefficients()
+
+        rows = data_manager.replica_locations[:len(data_manager.data_ids)]
+        counts = rows[:, data_manager.replica_count_col]
+        locations = rows[:, :data_manager.max_replicas]
+        stored = np.arange(data_manager.max_replicas) < counts[:, None]
+        locations = np.where(stored, locations, 0)
+
+        divisor = np.maximum(counts, 1)
+        mean_fixed = np.where(stored, fixed[locations], 0).sum(axis=1) / divisor
+        mean_per_kb = np.where(stored, per_kb[locations], 0).sum(axis=1) / divisor
+        sizes = data_manager.get_rows_piece_sizes()
+
+        return np.where(counts > 0, mean_fixed + mean_per_kb * sizes, 0.0)
+
+    def estimate_tier_read_times(self) -> Dict[StorageNodeType, float]:
+        """Get the expected time to read every file once, totaled per tier."""
+        read_times = self.estimate_read_times()
+        return {
+            node_type: float(read_times[rows].sum())
+            for node_type, rows in self.sys.data_manager.get_all_tiers_rows().items()
+        }
+
+    def calculate_current_total_read_time(self) -> float:
+        """
+        Calculate the expected time to read every file of the system once from its current placement.
+
+        This is a side-effect-free estimate (see estimate_read_times), no data is read and no
+        counters, costs or availability statistics change.
+        """
+        return float(self.estimate_read_times().sum())
     
     def calculate_total_num_replicas(self):
-        total_replicas = 0
-
-        for file_id, nodes in self.sys.data_manager.data_to_nodes.items():
-            total_replicas += len(nodes)
-        
-        return total_replicas
+        return self.sys.data_manager.get_num_replicas()
     
     def calculate_total_num_unavailability(self):
-        total_unavailability = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_unavailability += node.num_unavailable
-        
-        return total_unavailability
+        return self.get_snapshot().total_unavailability
     
     def calculate_total_num_read_requests(self):
-        total_read_requests = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_read_requests += node.num_reads
-        
-        return total_read_requests
+        return self.get_snapshot().total_reads
     
     def calculate_total_num_write_requests(self) -> int:
-        total_write_requests = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_write_requests += node.num_writes
-        
-        return total_write_requests
+        return self.get_snapshot().total_writes
     
     def calculate_total_num_delete_requests(self) -> int:
-        total_delete_requests = 0
-
-        for node in self.sys.node_manager.storage_nodes.values():
-            total_delete_requests += node.num_deletes
-        
-        return total_delete_requests
+        return self.get_snapshot().total_deletes
     
+    def get_latency_histogram(self, request_type: RequestType, node_type: StorageNodeType = None) -> LatencyHistogram:
+        """
+        Get the device response time histogram of a request type (one sample per replica), merged
+        over the nodes of a tier or over all the nodes of the system if no node type is given.
+        """
+        nodes = self.sys.get_nodes(node_type) if node_type is not None else self.sys.get_all_nodes()
+        return LatencyHistogram.merge_all(node.response_time_histograms[request_type] for node in nodes)
+
+    def get_latency_summary(self, request_type: RequestType, node_type: StorageNodeType = None) -> dict:
+        """Get the count, mean, p50/p90/p99/p99.9 and max response time of a request type."""
+        return self.get_latency_histogram(request_type, node_type).get_summary()
+
+    def get_client_latency_histogram(self, request_type: RequestType) -> LatencyHistogram:
+        """Get the client-visible response time histogram of a request type, one sample per request after the quorum."""
+        return self.sys.data_manager.client_response_time_histograms[request_type]
+
+    def get_client_latency_summary(self, request_type: RequestType) -> dict:
+        """Get the count, mean, p50/p90/p99/p99.9 and max client-visible response time of a request type."""
+        return self.get_client_latency_histogram(request_type).get_summary()
+
+    def get_retry_stats(self, request_type: RequestType) -> RetryStats:
+        """Get what the retry policy of a request type did: retries, timeouts, backoff and abandoned requests."""
+        return self.sys.data_manager.retry_stats[request_type]
+
+    def get_replica_selection_stats(self):
+        """Get the name of the replica selection of the reads and what it did (hedged reads, extra device time)."""
+        selector = self.sys.data_manager.replica_selector
+        return selector.name, selector.stats
+
+    def get_read_cache_stats(self):
+        """Get what the read cache did (hits, misses, fills, evictions, see ReadCacheStats), None when it is disabled."""
+        cache = self.sys.data_manager.read_cache
+        return cache.stats if cache is not None else None
+
+    def get_read_cache_capacity(self) -> Dict[str, float]:
+        """Get the capacity of the read cache reserved on the FAST tier and the KB of cached copies (0 when disabled)."""
+        cache = self.sys.data_manager.read_cache
+        if cache is None:
+            return {"capacity": 0, "used_capacity": 0}
+        return {"capacity": cache.get_capacity(), "used_capacity": cache.get_used_capacity()}
+
+    def get_write_back_stats(self):
+        """Get what the write-back buffer did (buffered writes, stalls, destages, see WriteBackStats), None when it is disabled."""
+        buffer = self.sys.data_manager.write_buffer
+        return buffer.stats if buffer is not None else None
+
+    def get_write_back_occupancy(self) -> Dict[str, float]:
+        """Get the capacity of the write-back buffer reserved on the FAST tier and its occupancy in KB (0 when disabled)."""
+        buffer = self.sys.data_manager.write_buffer
+        if buffer is None:
+            return {"capacity": 0, "used_capacity": 0, "mean_occupancy": 0, "max_occupancy": 0, "pending_writes": 0}
+        return {
+            "capacity": buffer.get_capacity(),
+            "used_capacity": buffer.get_used_capacity(),
+            "mean_occupancy": buffer.get_mean_occupancy(self.sys.clock.now),
+            "max_occupancy": buffer.stats.max_occupancy,
+            "pending_writes": buffer.get_num_pending_writes(),
+        }
+
+    def get_redundancy_stats(self):
+        """Get what the erasure-coded tiers did (encodes, degraded reads, see RedundancyStats), None when every tier replicates."""
+        data_manager = self.sys.data_manager
+        if all(scheme.min_pieces == 1 for scheme in data_manager.tier_schemes):
+            return None
+        return data_manager.redundancy_stats
+
+    def get_redundancy_capacity(self) -> Dict[StorageNodeType, Dict[str, float]]:
+        """
+        Get per tier its redundancy scheme, the KB of data it stores, the KB of replicas or fragments
+        holding it and the KB that num_data_replica replicas would take instead.
+        """
+        data_manager = self.sys.data_manager
+        counts = data_manager.replica_locations[:len(data_manager.data_ids), data_manager.replica_count_col]
+        piece_sizes = data_manager.get_rows_piece_sizes()
+        num_replicas = self.sys.config["num_data_replica"]
+        capacity = {}
+        for node_type, tier_rows in data_manager.get_all_tiers_rows().items():
+            data_kb = float(data_manager.data_sizes[tier_rows].sum())
+            replicated_kb = data_kb * num_replicas
+            stored_kb = float((piece_sizes[tier_rows] * counts[tier_rows]).sum())
+            capacity[node_type] = {
+                "scheme": data_manager.redundancy[node_type].label,
+                "data_kb": data_kb,
+                "stored_kb": stored_kb,
+                "replicated_kb": replicated_kb,
+                "saved_kb": replicated_kb - stored_kb,
+            }
+        return capacity
+
+    def get_migration_stats(self):
+        """Get whether the tier migrations are enabled and what they did (promotions, demotions, data moved)."""
+        engine = self.sys.migration_engine
+        return engine.enabled, engine.stats
+
     def calculate_total_num_files(self) -> int:
         return len(self.sys.data_manager.data_objects)
     
     def calculate_metrics(self):
-        total_cost = self.calculate_total_cost()
+        snapshot = self.get_snapshot()
 
-        total_read_response_time = self.calculate_total_read_response_time()
-        total_write_response_time = self.calculate_total_write_response_time()
-        total_delete_response_time = self.calculate_total_delete_response_time()
-        total_response_time = total_read_response_time + total_write_response_time + total_delete_response_time
-        
-        total_read = self.calculate_total_read()
-        total_write = self.calculate_total_write()
-        total_delete = self.calculate_total_delete()
-        total_access = total_read + total_write + total_delete
-
-        total_unavailability = self.calculate_total_num_unavailability()
-
-        total_served_files = self.calculate_total_successful_write()
-        total_not_served_files = self.calculate_total_unsuccessful_write()
-
-        return total_cost, total_response_time, total_unavailability, total_served_files, total_not_served_files
+        return (
+            snapshot.total_cost,
+            snapshot.total_response_time,
+            snapshot.total_unavailability,
+            snapshot.num_successful_write,
+            snapshot.num_unsuccessful_write,
+        )
 
     def optimization_function(self) -> float:
         total_cost, total_response_time, total_unavailability, total_served_files, total_not_served_files = self.calculate_metrics()
@@ -166,27 +347,30 @@ class MetricsCalculator:
         return O
     
     def calculate_total_successful_write(self) -> int:
-        return self.sys.get_num_successful_write()
+        return self.get_snapshot().num_successful_write
     
     def calculate_total_unsuccessful_write(self) -> int:
-        return self.sys.get_num_unsuccessful_write()
+        return self.get_snapshot().num_unsuccessful_write
     
     def calculate_total_successful_read(self) -> int:
-        return self.sys.get_num_successful_read()
+        return self.get_snapshot().num_successful_read
     
     def calculate_total_unsuccessful_read(self) -> int:
-        return self.sys.get_num_unsuccessful_read()
+        return self.get_snapshot().num_unsuccessful_read
     
     def calculate_total_cost(self) -> float:
-
-        total_cost = 0
-
-        node_types = self.sys.get_node_types()
-
-        for node_type in node_types:
-            total_cost += self.sys.calculate_total_cost_by_node(node_type)
-
-        return total_cost
+        return self.get_snapshot().total_cost
+
+    def calculate_total_energy(self) -> float:
+        """Energy in joules used by all storage media over the simulated time."""
+        return self.get_snapshot().total_energy
+
+    def calculate_energy_per_operation(self) -> float:
+        """Energy in joules per served (successful read or write) operation, 0 if nothing was served."""
+        snapshot = self.get_snapshot()
+        if snapshot.num_served_operations == 0:
+            return 0
+        return snapshot.total_energy / snapshot.num_served_operations
     
     def get_tiers_capacities_info_with_data_objects(self) -> dict:
         """
@@ -195,27 +379,52 @@ class MetricsCalculator:
         :return: A dictionary with storage node types as keys and a tuple of available capacity and data objects as values.
         """
 
+        data_manager = self.sys.data_manager
         tiers_capacities_info = self.sys.node_manager.get_tiers_capacity_info()
-        data_objects = self.sys.data_manager.get_all_tiers_data_objects()
+        tiers_rows = data_manager.get_all_tiers_rows()
+        temperatures = data_manager.get_temperatures()
 
         for node_type, capacities in tiers_capacities_info.items():
             available_capacity = capacities["available_capacity"]
             used_capacity = capacities["used_capacity"]
             total_capacity = capacities["total_capacity"]
+            rows = tiers_rows.get(node_type, [])
+            data_objects = [data_manager.data_objects[data_manager.data_ids[row]] for row in rows]
 
             tiers_capacities_info[node_type] = {
                 "available_capacity": available_capacity,
                 "used_capacity": used_capacity,
                 "total_capacity": total_capacity,
-                "total_data_size": sum(x.size for x in data_objects.get(node_type, [])),
-                "data_objects": data_objects.get(node_type, [])
+                "total_data_size": sum(data_object.size for data_object in data_objects),
+                "data_objects": data_objects,
+                # Capacity of the replicas or fragments of each data object with the redundancy scheme of the tier
+                "replicas_sizes": [data_manager.get_required_capacity(data_object.size, node_type) for data_object in data_objects],
+                "temperatures": temperatures[rows].tolist(),
             }
 
         return tiers_capacities_info
     
     def calculate_estimated_system_response(self) -> float:
         """
-        Calculate the Estimated System Response (ESR) based on the provided formulas:
+        Get the Estimated System Response (ESR):
+
+        ESR = 10 × Σ(tier1) + 2 × Σ(tier2) + 1 × Σ(tier3)
+        where each tier sum = Σ(nr_est × res_est)
+
+        The tier sums are maintained incrementally by the DataManager, so this is an O(1) read
+        that can be sampled during the simulation. See calculate_estimated_system_response_batch
+        for the full recomputation.
+
+        Returns:
+            float: The estimated system response value
+        """
+        total_esr = self.sys.data_manager.esr_tracker.get_value()
+        logger.info(f"Total Estimated System Response (ESR): {total_esr:.4f}")
+        return total_esr
+
+    def calculate_estimated_system_response_batch(self) -> float:
+        """
+        Calculate the Estimated System Response (ESR) from scratch based on the provided formulas:
         
         ESR = 10 × Σ(tier1) + 2 × Σ(tier2) + 1 × Σ(tier3)
         where each tier sum = Σ(nr_est × res_est)
@@ -229,43 +438,28 @@ class MetricsCalculator:
         Returns:
             float: The estimated system response value
         """
-        from .storage_types import StorageNodeType
-        
-        # Get all data objects organized by tier
-        tiers_data = self.sys.data_manager.get_all_tiers_data_objects()
-        
-        # Tier weights as per the formula
-        tier_weights = {
-            StorageNodeType.FAST: 10,    # tier_1 (highest performance)
-            StorageNodeType.MEDIUM: 2,   # tier_2 (medium performance) 
-            StorageNodeType.SLOW: 1      # tier_3 (lowest performance)
-        }
+        data_manager = self.sys.data_manager
+
+        # Calculate estimated number of requests per file using the temperatures of all files
+        nr_est = 10 * data_manager.get_temperatures()
+        # Calculate estimated response time per file
+        # Size is in KB, so we divide by 10000 as per formula
+        res_est = data_manager.data_sizes[:len(nr_est)] / 10000
+        contributions = nr_est * res_est
         
         total_esr = 0.0
         
-        for node_type, data_objects in tiers_data.items():
-            tier_weight = tier_weights.get(node_type, 1)
-            tier_sum = 0.0
-            
-            for data_obj in data_objects:
-                # Calculate estimated number of requests per file
-                # Using the temperature from the data object
-                temp = data_obj.get_temperature()
-                nr_est = 10 * temp
-                
-                # Calculate estimated response time per file
-                # Size is in KB, so we divide by 10000 as per formula
-                res_est = data_obj.size / 10000
-                
-                # Add to tier sum: nr_est × res_est
-                tier_sum += nr_est * res_est
+        for node_type, rows in data_manager.get_all_tiers_rows().items():
+            tier_weight = ESR_TIER_WEIGHTS.get(node_type, 1)
+            # Tier sum: Σ(nr_est × res_est)
+            tier_sum = float(contributions[rows].sum())
             
             # Add weighted tier sum to total ESR
             total_esr += tier_weight * tier_sum
             
             logger.info(f"ESR calculation - {node_type.name} tier: "
-                       f"weight={tier_weight}, files={len(data_objects)}, "
+                       f"weight={tier_weight}, files={len(rows)}, "
                        f"tier_sum={tier_sum:.4f}, weighted_sum={tier_weight * tier_sum:.4f}")
         
         logger.info(f"Total Estimated System Response (ESR): {total_esr:.4f}")
-        return total_esr
\ No newline at end of file
+        return total_esr
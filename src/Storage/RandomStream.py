@@ -0,0 +1,88 @@
+import numpy as np
+from functools import lru_cache
+
+DEFAULT_BLOCK_SIZE = 4096
+
+@lru_cache(maxsize=None)
+def bernoulli_threshold(p: float) -> float:
+    """
+    Threshold t such that `uniform < t` is True exactly when
+    np.random.choice([True, False], p=[p, 1 - p]) returns True for the same uniform draw.
+    """
+    cdf = np.cumsum([p, 1 - p])
+    cdf /= cdf[-1]
+    return float(cdf[0])
+
+class RandomStream:
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Uniform draws of the global numpy generator, pre-drawn in blocks.
+
+        The draws come in the same order as separate np.random calls would return them, and
+        close() moves the global generator right after the draws actually used. Code drawing
+        from a stream therefore gives the same results as code calling np.random one number at
+        a time, as long as nothing else uses np.random before close(). To make a direct np.random
+        call in between, call close() first, the stream draws a new block on its next use.
+
+        Args:
+            block_size (int): Draws of the first block, e.g. the expected number of draws of a batch.
+                The following blocks double in size up to DEFAULT_BLOCK_SIZE.
+        """
+        self.block_size = max(int(block_size), 1)
+        self._state = None  # Generator state at the start of the current block
+        self._block = []
+        self._position = 0
+
+    def __enter__(self) -> "RandomStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def random(self) -> float:
+        """Next uniform draw in [0, 1), as np.random.random_sample()."""
+        if self._position == len(self._block):
+            self.close()
+            self._state = np.random.get_state()
+            self._block = np.random.random_sample(self.block_size).tolist()
+            self.block_size = max(min(2 * self.block_size, DEFAULT_BLOCK_SIZE), self.block_size)
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def uniform(self, low: float, high: float) -> float:
+        """Next uniform draw in [low, high), as np.random.uniform(low, high)."""
+        return low + (high - low) * self.random()
+
+    def index(self, n: int) -> int:
+        """Next uniform index in [0, n), from one uniform draw."""
+        return min(int(n * self.random()), n - 1)
+
+    def close(self):
+        """Give the unused draws of the current block back to the global generator."""
+        if self._state is not None and self._position < len(self._block):
+            np.random.set_state(self._state)
+            np.random.random_sample(self._position)
+        self._state = None
+        self._block = []
+        self._position = 0
+
+class GlobalRandom:
+    """Draws straight from the global numpy generator, the stream of the one-at-a-time operations."""
+
+    @staticmethod
+    def random() -> float:
+        return np.random.random_sample()
+
+    @staticmethod
+    def uniform(low: float, high: float) -> float:
+        return np.random.uniform(low, high)
+
+    @staticmethod
+    def index(n: int) -> int:
+        return min(int(n * np.random.random_sample()), n - 1)
+
+    def close(self):
+        pass
+
+GLOBAL_RANDOM = GlobalRandom()
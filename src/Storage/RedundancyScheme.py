@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from .storage_types import DataObject
+
+@dataclass
+class RedundancyStats:
+    """What the erasure-coded tiers cost on top of the replicated ones, times in ms."""
+    encodes: int = 0  # Writes (and re-encoding migrations) that computed parity fragments
+    encode_time: float = 0
+    degraded_reads: int = 0  # Reads that rebuilt data fragments from parity fragments
+    decode_time: float = 0
+    unreadable: int = 0  # Reads of data with fewer fragments stored than needed to rebuild it
+
+class RedundancyScheme:
+    """
+    How the data stored on a tier survives node losses: every data is stored as `num_pieces`
+    pieces of piece_size() KB on as many nodes of the tier, any `min_pieces` of them rebuild it.
+    """
+    name = ""
+
+    @property
+    def label(self) -> str:
+        raise NotImplementedError
+
+    @property
+    def num_pieces(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def min_pieces(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def overhead(self) -> float:
+        """Capacity used per KB of data."""
+        return self.num_pieces / self.min_pieces
+
+    def piece_size(self, size):
+        """KB of one piece of data of `size` KB, works on numpy arrays of sizes."""
+        raise NotImplementedError
+
+    def required_capacity(self, size):
+        """KB of tier capacity taken by data of `size` KB."""
+        return self.piece_size(size) * self.num_pieces
+
+    def make_piece(self, data: DataObject) -> DataObject:
+        """The object stored on every node holding a piece of data."""
+        raise NotImplementedError
+
+    def pieces_to_read(self, read_quorum: int, num_stored: int) -> int:
+        """Pieces a read gathers, given the read quorum of the configuration and the pieces stored."""
+        raise NotImplementedError
+
+    def pieces_to_acknowledge(self, write_quorum: int, num_targeted: int) -> int:
+        """Pieces acknowledged before a write is, given the write quorum of the configuration and the pieces written."""
+        raise NotImplementedError
+
+    def encode_time(self, size: float) -> float:
+        """Time in ms to compute the pieces of data of `size` KB before they are written."""
+        return 0
+
+    def decode_time(self, size: float) -> float:
+        """Time in ms to rebuild data of `size` KB from pieces other than its data pieces."""
+        return 0
+
+@dataclass(frozen=True)
+class ReplicationScheme(RedundancyScheme):
+    """`num_replicas` full copies of the data, reads and writes use the quorums of the configuration."""
+    name = "replication"
+    num_replicas: int = 3
+
+    def __post_init__(self):
+        if self.num_replicas < 1:
+            raise ValueError(f"ReplicationScheme: num_replicas must be at least 1, got {self.num_replicas}.")
+
+    @property
+    def label(self) -> str:
+        return f"{self.num_replicas}x replication"
+
+    @property
+    def num_pieces(self) -> int:
+        return self.num_replicas
+
+    @property
+    def min_pieces(self) -> int:
+        return 1
+
+    def piece_size(self, size):
+        return size
+
+    def make_piece(self, data: DataObject) -> DataObject:
+        # The replicas share the data object, as they always did
+        return data
+
+    def pieces_to_read(self, read_quorum: int, num_stored: int) -> int:
+        return min(read_quorum, num_stored)
+
+    def pieces_to_acknowledge(self, write_quorum: int, num_targeted: int) -> int:
+        return min(write_quorum, num_targeted)
+
+@dataclass(frozen=True)
+class ErasureCodingScheme(RedundancyScheme):
+    """
+    Systematic k+m erasure code (e.g. Reed-Solomon): the data is split in `k` data fragments of
+    ceil(size / k) KB and `m` parity fragments of the same size are computed from them, any k of the
+    k+m fragments rebuild the data. It takes (k+m)/k of the data size instead of num_replicas times
+    it, and survives the loss of m fragments.
+
+    A write encodes the parity fragments at `encode_throughput` KB/ms, then writes the k+m fragments
+    in parallel and is acknowledged after `write_quorum` of them (all of them by default, at least k).
+    A read gathers k fragments in parallel. It is degraded when a fragment read failed or was hedged,
+    another fragment takes its place and the data is decoded at `decode_throughput` KB/ms.
+
+    k and m have no defaults, the k+m fragments of data must fit the nodes of the tier.
+
+    Attributes:
+        k (int): Data fragments.
+        m (int): Parity fragments.
+        encode_throughput (float): KB/ms of data encoded.
+        decode_throughput (float): KB/ms of data decoded by a degraded read.
+        write_quorum (int): Fragments acknowledged before a write is, None for all of them.
+    """
+    name = "erasure"
+    k: int
+    m: int
+    encode_throughput: float = 1000
+    decode_throughput: float = 500
+    write_quorum: Optional[int] = None
+
+    def __post_init__(self):
+        if self.k < 1 or self.m < 0:
+            raise ValueError(f"ErasureCodingScheme: k must be at least 1 and m non-negative, got k={self.k} m={self.m}.")
+        if self.encode_throughput <= 0 or self.decode_throughput <= 0:
+            raise ValueError("ErasureCodingScheme: the encode and decode throughputs must be positive.")
+        quorum = self.write_quorum
+        if quorum is not None and not self.k <= quorum <= self.k + self.m:
+            raise ValueError(f"ErasureCodingScheme: write_quorum must be in [k, k+m], got {quorum}.")
+
+    @property
+    def label(self) -> str:
+        return f"{self.k}+{self.m} erasure coding"
+
+    @property
+    def num_pieces(self) -> int:
+        return self.k + self.m
+
+    @property
+    def min_pieces(self) -> int:
+        return self.k
+
+    def piece_size(self, size):
+        # Ceiling division, the last data fragment is padded
+        return -(-size // self.k)
+
+    def make_piece(self, data: DataObject) -> DataObject:
+        return DataObject(id=data.id, size=self.piece_size(data.size))
+
+    def pieces_to_read(self, read_quorum: int, num_stored: int) -> int:
+        return self.k
+
+    def pieces_to_acknowledge(self, write_quorum: int, num_targeted: int) -> int:
+        quorum = self.write_quorum if self.write_quorum is not None else self.num_pieces
+        # Fewer than k fragments do not rebuild the data
+        return max(min(quorum, num_targeted), self.k)
+
+    def encode_time(self, size: float) -> float:
+        return size / self.encode_throughput if self.m else 0
+
+    def decode_time(self, size: float) -> float:
+        return size / self.decode_throughput if self.m else 0
+
+REDUNDANCY_SCHEMES = {scheme.name: scheme for scheme in (ReplicationScheme, ErasureCodingScheme)}
+
+def create_redundancy_scheme(config: Union[RedundancyScheme, str, dict, None], num_replicas: int) -> RedundancyScheme:
+    """
+    Create the redundancy scheme of a configuration: a scheme, the name of a scheme (see REDUNDANCY_SCHEMES)
+    or a dict with its "name" and its parameters, e.g. {"name": "erasure", "k": 2, "m": 1}. None and
+    "replication" replicate `num_replicas` times.
+    """
+    if isinstance(config, RedundancyScheme):
+        return config
+    if config is None:
+        config = ReplicationScheme.name
+    parameters = {}
+    if isinstance(config, dict):
+        parameters = {key: value for key, value in config.items() if key != "name"}
+        config = config["name"]
+    if config not in REDUNDANCY_SCHEMES:
+        raise ValueError(f"RedundancyScheme: unknown scheme {config}, expected one of {list(REDUNDANCY_SCHEMES)}.")
+    if config == ReplicationScheme.name:
+        return ReplicationScheme(**{"num_replicas": num_replicas, **parameters})
+    if "k" not in parameters or "m" not in parameters:
+        raise ValueError(
+            f"RedundancyScheme: {config} needs its \"k\" and \"m\", e.g. {{\"name\": \"erasure\", \"k\": 2, \"m\": 1}} on 3 nodes."
+        )
+    return ErasureCodingScheme(**parameters)
@@ -0,0 +1,105 @@
+import math
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from .RandomStream import RandomStream
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How a client retries the failed attempts of a storage request.
+
+    An attempt fails when the node or medium is unavailable or fails, or when the client stops
+    waiting for it after `attempt_timeout`. After the n-th failed attempt of a replica, the client
+    waits min(backoff_base × backoff_multiplier^(n - 1), backoff_max) before the next attempt,
+    reduced by a random fraction of up to `jitter` of it. It gives up the replica after
+    `max_attempts` attempts, or when the next attempt would start after `deadline` ms from the
+    start of the request. The default policy retries forever without waiting.
+
+    Attributes:
+        max_attempts (int): Attempts per replica, None for no limit.
+        attempt_timeout (float): Time in ms the client waits for one attempt, None to wait for its end.
+        deadline (float): Time budget of a request in ms, None for no limit.
+        backoff_base (float): Wait in ms after the first failed attempt.
+        backoff_multiplier (float): Growth factor of the wait after each failed attempt.
+        backoff_max (float): Maximum wait in ms.
+        jitter (float): Maximum random fraction removed from the wait, in [0, 1] (1 for "full jitter").
+    """
+    max_attempts: Optional[int] = None
+    attempt_timeout: Optional[float] = None
+    deadline: Optional[float] = None
+    backoff_base: float = 0
+    backoff_multiplier: float = 2
+    backoff_max: float = math.inf
+    jitter: float = 0
+
+    def __post_init__(self):
+        if self.max_attempts is not None and self.max_attempts < 1:
+            raise ValueError(f"RetryPolicy: max_attempts must be at least 1, got {self.max_attempts}.")
+        if self.attempt_timeout is not None and self.attempt_timeout <= 0:
+            raise ValueError(f"RetryPolicy: attempt_timeout must be positive, got {self.attempt_timeout}.")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError(f"RetryPolicy: deadline must be positive, got {self.deadline}.")
+        if self.backoff_base < 0 or self.backoff_multiplier < 1 or self.backoff_max < 0:
+            raise ValueError("RetryPolicy: the backoff must be non-negative and non-decreasing.")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError(f"RetryPolicy: jitter must be in [0, 1], got {self.jitter}.")
+        if self.attempt_timeout is not None and self.max_attempts is None and self.deadline is None:
+            # An attempt slower than the timeout would be retried forever
+            raise ValueError("RetryPolicy: attempt_timeout requires max_attempts or deadline.")
+
+    @classmethod
+    def from_config(cls, config: Union["RetryPolicy", dict, None]) -> "RetryPolicy":
+        """Build a policy from its parameters, a policy is returned as is and None gives the default policy."""
+        if config is None:
+            return DEFAULT_RETRY_POLICY
+        if isinstance(config, RetryPolicy):
+            return config
+        return cls(**config)
+
+    def backoff(self, failed_attempts: int, stream: RandomStream) -> float:
+        """Wait in ms before the attempt following `failed_attempts` failed attempts, draws from `stream` only with jitter."""
+        if self.backoff_base <= 0:
+            return 0
+        delay = min(self.backoff_base * self.backoff_multiplier ** (failed_attempts - 1), self.backoff_max)
+        if self.jitter > 0:
+            delay *= 1 - self.jitter * stream.random()
+        return delay
+
+    def retry_delay(self, failed_attempts: int, elapsed: float, stream: RandomStream) -> Optional[float]:
+        """
+        Decide whether a replica is retried after `failed_attempts` failed attempts that took `elapsed` ms.
+
+        Returns:
+            float: The wait in ms before the next attempt, None to give up.
+        """
+        if self.max_attempts is not None and failed_attempts >= self.max_attempts:
+            return None
+        delay = self.backoff(failed_attempts, stream)
+        if self.deadline is not None and elapsed + delay >= self.deadline:
+            return None
+        return delay
+
+    def cutoff(self, elapsed: float, response_time: float) -> Optional[float]:
+        """
+        Time in ms since the start of the request at which the client stops waiting for an attempt
+        started at `elapsed` and taking `response_time`, None if the client waits for its end.
+        """
+        limit = math.inf
+        if self.attempt_timeout is not None:
+            limit = elapsed + self.attempt_timeout
+        if self.deadline is not None:
+            limit = min(limit, self.deadline)
+        return limit if elapsed + response_time > limit else None
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+@dataclass
+class RetryStats:
+    """What the retry policy of a request type did, times in ms of client time."""
+    retries: int = 0  # Attempts made after a failed attempt
+    timeouts: int = 0  # Attempts the client stopped waiting for (attempt timeout or deadline)
+    backoff_time: float = 0  # Total wait between attempts
+    abandoned_replicas: int = 0  # Replicas given up after max_attempts or at the deadline
+    abandoned_requests: int = 0  # Requests that failed because of the policy
+    abandoned_time: float = 0  # Total time the clients of the failed requests waited
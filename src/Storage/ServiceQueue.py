@@ -0,0 +1,102 @@
+from collections import deque
+from heapq import heapreplace
+
+class ServiceQueue:
+    def __init__(self, num_channels: int = 1):
+        """
+        FIFO queue in front of `num_channels` parallel servers, on the simulated time (ms).
+
+        A request starts on the first free channel, or waits in the queue until one frees up, so
+        its response time is the waiting time plus its service time.
+
+        Requests are served in the order they are admitted, which is their arrival order when
+        they arrive in non-decreasing time order. The medium queues of a node only approximate
+        that: a request reaches them after its node wait and process time, and retried attempts
+        arrive at the time of their operation. A request admitted after one that arrives later
+        is accepted and waits behind it, so its wait is overestimated by at most that overlap,
+        and the queue depth it sees leaves out the requests started before the latest arrival.
+        """
+        if num_channels < 1:
+            raise ValueError("ServiceQueue: num_channels must be at least 1.")
+
+        self.num_channels = num_channels
+        self._channel_free_at = [0.0] * num_channels  # min-heap of the time each channel becomes free
+        self._pending_starts = deque()  # start times of the queued requests, non decreasing
+
+        self.num_served = 0
+        self.total_wait_time = 0.0
+        self.busy_time = 0.0
+        self.total_queue_depth = 0  # Sum of the queue depth seen by every arrival
+        self.max_queue_depth = 0
+        self.first_arrival = None
+        self.last_completion = 0.0
+
+    def serve(self, arrival_time: float, service_time: float) -> float:
+        """
+        Admit a request and reserve a channel for it.
+
+        Args:
+            arrival_time (float): Time the request arrives at the queue in ms.
+            service_time (float): Time the request occupies a channel in ms.
+
+        Returns:
+            float: Waiting time of the request in the queue in ms.
+        """
+        if self.first_arrival is None:
+            self.first_arrival = arrival_time
+
+        pending_starts = self._pending_starts
+        while pending_starts and pending_starts[0] <= arrival_time:
+            pending_starts.popleft()
+        queue_depth = len(pending_starts)
+
+        start_time = max(arrival_time, self._channel_free_at[0])
+        completion_time = start_time + service_time
+        heapreplace(self._channel_free_at, completion_time)
+        if start_time > arrival_time:
+            pending_starts.append(start_time)
+
+        wait_time = start_time - arrival_time
+        self.num_served += 1
+        self.total_wait_time += wait_time
+        self.busy_time += service_time
+        self.total_queue_depth += queue_depth
+        if queue_depth > self.max_queue_depth:
+            self.max_queue_depth = queue_depth
+        if completion_time > self.last_completion:
+            self.last_completion = completion_time
+
+        return wait_time
+
+    def get_mean_wait_time(self) -> float:
+        return self.total_wait_time / self.num_served if self.num_served else 0
+
+    def get_mean_queue_depth(self) -> float:
+        """Mean number of queued requests seen by an arriving request."""
+        return self.total_queue_depth / self.num_served if self.num_served else 0
+
+    def get_utilization(self) -> float:
+        """Fraction of the channel time spent serving requests, from the first arrival to the last completion."""
+        if self.first_arrival is None or self.last_completion <= self.first_arrival:
+            return 0
+        return self.busy_time / (self.num_channels * (self.last_completion - self.first_arrival))
+
+    def get_summary(self) -> dict:
+        return {
+            "served": self.num_served,
+            "mean_wait": self.get_mean_wait_time(),
+            "mean_depth": self.get_mean_queue_depth(),
+            "max_depth": self.max_queue_depth,
+            "utilization": self.get_utilization(),
+        }
+
+    def reset(self):
+        self._channel_free_at = [0.0] * self.num_channels
+        self._pending_starts.clear()
+        self.num_served = 0
+        self.total_wait_time = 0.0
+        self.busy_time = 0.0
+        self.total_queue_depth = 0
+        self.max_queue_depth = 0
+        self.first_arrival = None
+        self.last_completion = 0.0
@@ -0,0 +1,37 @@
+class SimulationClock:
+    """
+    Simulated wall clock shared by the storage system and its nodes.
+
+    The time is in milliseconds and is driven by the `time` field of the access pattern,
+    it never moves backwards. The elapsed time is counted from the first time the clock is
+    advanced to, so absolute timestamps (e.g. epoch milliseconds) do not count as elapsed time.
+    """
+
+    def __init__(self, start_time: float = 0):
+        self.start_time = start_time
+        self.now = start_time
+        self.first_time = None  # First time the clock was advanced to
+
+    def advance(self, now: float) -> bool:
+        """
+        Move the clock forward to `now`.
+
+        Returns:
+            bool: True if the time changed.
+        """
+        if self.first_time is None:
+            self.first_time = max(now, self.start_time)
+        if now <= self.now:
+            return False
+        self.now = now
+        return True
+
+    def elapsed(self) -> float:
+        """Time in milliseconds since the first time the clock was advanced to, 0 before."""
+        if self.first_time is None:
+            return 0
+        return self.now - self.first_time
+
+    def reset(self):
+        self.now = self.start_time
+        self.first_time = None
@@ -1,6 +1,6 @@
 import numpy as np
 import uuid
-from typing import Dict
+from typing import Dict, Tuple
 
 from utils.Utility import format_data_size, generate_file_size
 from utils.logger import logger
@@ -12,13 +12,17 @@ from .exceptions import (
     DataNotFoundException,
     StorageMediumFailureException
 )
-from .storage_types import StorageMediumType
+from .storage_types import StorageMediumType, OperationOutcome
 from .storage_config import STORAGE_MEDIUM_CONFIG
+from .ServiceQueue import ServiceQueue
+from .RandomStream import RandomStream, GLOBAL_RANDOM, bernoulli_threshold
 from .storage_types import DataObject
 
 class StorageMedium:
-    def __init__(self, *, name: str, type: StorageMediumType, baseline_response_time=5):
-        config = STORAGE_MEDIUM_CONFIG[type]
+    def __init__(self, *, name: str, type: StorageMediumType, baseline_response_time=5, config: dict = None, service_queue: bool = False):
+        # config: parameters of the medium, STORAGE_MEDIUM_CONFIG[type] by default
+        # service_queue: queue the requests in front of the medium (see ServiceQueue), with the service_channels of its config
+        config = config if config is not None else STORAGE_MEDIUM_CONFIG[type]
 
         self.name = name
         self.storage_type = type
@@ -33,8 +37,15 @@ class StorageMedium:
         self.error_rate = config["error_rate"]
         self.capacity = config["capacity"] # Capacity in KB
         self.baseline_response_time = baseline_response_time
+        self.service_queue = ServiceQueue(config["service_channels"]) if service_queue else None
 
         self.used_capacity = 0  # Track used capacity (in KB)
+        # Slice of the capacity reserved for the read cache (see ReadCache), not part of `capacity`
+        self.cache_capacity = 0
+        self.cache_used = 0  # KB of cached copies in the slice
+        # Slice of the capacity reserved for the write-back buffer (see WriteBackBuffer), not part of `capacity`
+        self.buffer_capacity = 0
+        self.buffer_used = 0  # KB of buffered writes in the slice
         self.num_unavailable = 0  # Number of times the medium has been unavailable
         self.num_reads = 0  # Number of read operations
         self.num_writes = 0  # Number of write operations
@@ -42,22 +53,45 @@ class StorageMedium:
         self.total_read_response_time = 0  # Total read response time in milliseconds
         self.total_write_response_time = 0  # Total write response time in milliseconds
         self.total_delete_response_time = 0  # Total delete response time in milliseconds
+        self.active_time = 0  # Time spent serving requests in milliseconds, the rest of the simulated time is idle
 
         self.data_objects: Dict[str, DataObject] = {}  # Store data objects as {data_id: DataObject}
 
     def check_availability(self):
         """Simulate medium availability."""
-        is_available = np.random.choice([True, False], p=[self.availability, 1 - self.availability])
-        logger.info(f"StorageMedium: {self.name} storage availability: {is_available}")
-        if not is_available:
-            self.num_unavailable += 1
-            raise StorageMediumUnavailableException(f"{self.name} storage medium is currently unavailable.")
+        if not self._draw_available(GLOBAL_RANDOM):
+            self._raise_for_outcome(OperationOutcome.UNAVAILABLE)
 
     def simulate_failure(self):
         """Simulate a random failure based on the error rate."""
-        is_failure = np.random.choice([True, False], p=[self.error_rate, 1 - self.error_rate])
-        if is_failure:
+        if self._draw_failure(GLOBAL_RANDOM):
+            self._raise_for_outcome(OperationOutcome.FAILURE)
+
+    def _draw_available(self, stream: RandomStream) -> bool:
+        # Same draw as np.random.choice([True, False], p=[availability, 1 - availability])
+        if stream.random() < bernoulli_threshold(self.availability):
+            return True
+        self.num_unavailable += 1
+        return False
+
+    def _draw_failure(self, stream: RandomStream) -> bool:
+        return stream.random() < bernoulli_threshold(self.error_rate)
+
+    def _raise_for_outcome(self, outcome: OperationOutcome, data_id: str = None, data_size: int = 0):
+        """Raise the exception of the public API matching an unsuccessful outcome."""
+        if outcome == OperationOutcome.UNAVAILABLE:
+            raise StorageMediumUnavailableException(f"{self.name} storage medium is currently unavailable.")
+        if outcome == OperationOutcome.FAILURE:
             raise StorageMediumFailureException(f"A failure occurred on {self.storage_type} storage medium during the operation.")
+        if outcome == OperationOutcome.NOT_FOUND:
+            raise DataNotFoundException(f"Data with ID {data_id} not found on {self.storage_type}.")
+        if outcome == OperationOutcome.ALREADY_EXISTS:
+            raise DataAlreadyExistsException(f"StorageMedium: data with ID {data_id} already exists on {self.storage_type}.")
+        if outcome == OperationOutcome.INSUFFICIENT_CAPACITY:
+            raise InsufficientCapacityException(
+                f"StorageMedium: Insufficient capacity on {self.name} to write data {data_id}. "
+                f"Required: {format_data_size(data_size)}, Available: {format_data_size(self.get_available_space())}."
+            )
 
     def get_error_response_time(self):
         """Simulate response time of the storage medium."""
@@ -88,25 +122,47 @@ class StorageMedium:
             float: Time taken to write the data.
 
         Raises:
+            StorageMediumUnavailableException: If the medium is unavailable.
+            StorageMediumFailureException: If the medium fails during the operation.
             DataAlreadyExistsException: If data exists and overwrite is False.
             InsufficientCapacityException: If not enough space to write or overwrite.
         """
-        self.check_availability()
-        self.simulate_failure()
+        outcome, response_time = self.try_write(data, GLOBAL_RANDOM, overwrite=overwrite)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data.id, data.size)
+
+        logger.info(
+            f"StorageMedium: {'Overwritten' if overwrite else 'Written'} {format_data_size(data.size)} with ID {data.id} "
+            f"response time: {response_time:.2f} ms to {self.storage_type}. "
+            f"Used capacity: {format_data_size(self.used_capacity)}/{format_data_size(self.capacity)}. "
+            f"Available space: {format_data_size(self.get_available_space())}."
+        )
+
+        return response_time
+
+    def try_write(self, data: DataObject, stream: RandomStream, overwrite=False) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to write data as write_data() does, with the random numbers taken from `stream`
+        and the errors returned as outcome codes instead of raised.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
 
         old_data_size = 0
-        if data.id in self.data_objects:
+        old_data = self.data_objects.get(data.id)
+        if old_data is not None:
             if not overwrite:
-                raise DataAlreadyExistsException(f"StorageMedium: data with ID {data.id} already exists on {self.storage_type}.")
-            
-            old_data_size = self.data_objects[data.id].size
+                return OperationOutcome.ALREADY_EXISTS, 0
+            old_data_size = old_data.size
 
         size_diff = data.size - old_data_size
         if size_diff > 0 and self.get_available_space() < size_diff:
-            raise InsufficientCapacityException(
-                f"StorageMedium: Insufficient capacity on {self.name} to overwrite data {data.id}. "
-                f"Required additional: {format_data_size(size_diff)}, Available: {format_data_size(self.get_available_space())}."
-            )
+            return OperationOutcome.INSUFFICIENT_CAPACITY, 0
 
         self.num_writes += 1
 
@@ -117,19 +173,12 @@ class StorageMedium:
         self.data_objects[data.id] = data
 
         # Simulate response time
-        latency = np.random.uniform(self.write_latency[0], self.write_latency[1])
-        throughput = np.random.uniform(self.write_throughput[0], self.write_throughput[1])
+        latency = stream.uniform(self.write_latency[0], self.write_latency[1])
+        throughput = stream.uniform(self.write_throughput[0], self.write_throughput[1])
         response_time = latency + data.size / throughput
         self.total_write_response_time += response_time
-
-        logger.info(
-            f"StorageMedium: {'Overwritten' if overwrite else 'Written'} {format_data_size(data.size)} with ID {data.id} "
-            f"response time: {response_time:.2f} ms to {self.storage_type}. "
-            f"Used capacity: {format_data_size(self.used_capacity)}/{format_data_size(self.capacity)}. "
-            f"Available space: {format_data_size(self.get_available_space())}."
-        )
-
-        return response_time
+        self.active_time += response_time
+        return OperationOutcome.SUCCESS, response_time
 
     def read_data(self, data_id: str) -> float:
         """
@@ -138,30 +187,56 @@ class StorageMedium:
 
         :return: Time taken to read the data.
         """
+        outcome, response_time = self.try_read(data_id, GLOBAL_RANDOM)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data_id)
+
+        logger.info(f"StorageMedium: Read data with ID {data_id} from {self.storage_type} response time {response_time} milliseconds. Remaining capacity: {format_data_size(self.used_capacity)}/{format_data_size(self.capacity)}.")
+
+        return response_time
+
+    def try_read(self, data_id: str, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to read data as read_data() does, with the random numbers taken from `stream`
+        and the errors returned as outcome codes instead of raised.
 
-        self.check_availability()
-        self.simulate_failure()
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
 
         self.num_reads += 1
+        data_object = self.data_objects.get(data_id)
+        if data_object is None:
+            return OperationOutcome.NOT_FOUND, 0
+        return OperationOutcome.SUCCESS, self._read_time(data_object.size, stream)
 
-        if data_id not in self.data_objects:
-            raise DataNotFoundException(f"Data with ID {data_id} not found on {self.storage_type}.")
-        
-        dataObject: DataObject = self.data_objects[data_id]
+    def try_read_cached(self, size: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to read a cached copy of `size` KB from the read cache slice, as try_read() reads stored data.
 
-        logger.debug(f"StorageMedium: Reading data with ID {dataObject.id} from {self.storage_type}.")
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
 
-        data_size: int = dataObject.size
+        self.num_reads += 1
+        return OperationOutcome.SUCCESS, self._read_time(size, stream)
 
+    def _read_time(self, size: int, stream: RandomStream) -> float:
         # Read time based on the size of the data
         # response_time = latency + data_size / throughput (milliseconds)
-        latency = np.random.uniform(self.read_latency[0], self.read_latency[1])  # Simulate write time
-        throughput = np.random.uniform(self.read_throughput[0], self.read_throughput[1])  # Simulate throughput
-        response_time = latency + data_size / throughput
+        latency = stream.uniform(self.read_latency[0], self.read_latency[1])
+        throughput = stream.uniform(self.read_throughput[0], self.read_throughput[1])
+        response_time = latency + size / throughput
         self.total_read_response_time += response_time
-        
-        logger.info(f"StorageMedium: Read data with ID {data_id} ({format_data_size(data_size)}) from {self.storage_type} response time {response_time} milliseconds. Remaining capacity: {format_data_size(self.used_capacity)}/{format_data_size(self.capacity)}.")
-
+        self.active_time += response_time
         return response_time
 
     def get_data(self, data_id) -> DataObject:
@@ -178,34 +253,191 @@ class StorageMedium:
 
         :return: Time taken to delete the data.
         """
+        outcome, response_time = self.try_delete(data_id, GLOBAL_RANDOM)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data_id)
 
-        self.check_availability()
-        self.simulate_failure()
+        logger.info(f"StorageMedium: Deleted data with ID {data_id} from {self.storage_type} response time {response_time} milliseconds. Used capacity: {format_data_size(self.used_capacity)}/{format_data_size(self.capacity)}.")
 
-        self.num_deletes += 1
+        return response_time
 
-        if data_id not in self.data_objects:
-            raise DataNotFoundException(f"Data with ID {data_id} not found on {self.storage_type}.")
+    def try_delete(self, data_id: str, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to delete data as delete_data() does, with the random numbers taken from `stream`
+        and the errors returned as outcome codes instead of raised.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
 
-        dataObj: DataObject = self.data_objects.pop(data_id)
-        self.used_capacity -= dataObj.size
+        self.num_deletes += 1
+        data_object = self.data_objects.pop(data_id, None)
+        if data_object is None:
+            return OperationOutcome.NOT_FOUND, 0
+        self.used_capacity -= data_object.size
 
-        latency = np.random.uniform(self.delete_latency[0], self.delete_latency[1])  # Simulate deletion time
-        response_time = latency
+        response_time = stream.uniform(self.delete_latency[0], self.delete_latency[1])
         self.total_delete_response_time += response_time
+        self.active_time += response_time
+        return OperationOutcome.SUCCESS, response_time
 
-        logger.info(f"StorageMedium: Deleted data with ID {data_id} ({format_data_size(dataObj.size)}) from {self.storage_type} response time {response_time} milliseconds. Used capacity: {format_data_size(self.used_capacity)}/{format_data_size(self.capacity)}.")
+    def transfer_out(self, data_id: str) -> Tuple[DataObject, float]:
+        """
+        Remove data for a background migration, reading it at the mean latency and throughput of
+        the medium (no random numbers are drawn and the request counters are not changed).
 
+        Returns:
+            tuple[DataObject, float]: The data removed and the time taken to read it.
+        """
+        data_object = self.data_objects.pop(data_id)
+        self.used_capacity -= data_object.size
+        response_time = sum(self.read_latency) / 2 + data_object.size / (sum(self.read_throughput) / 2)
+        self.active_time += response_time
+        return data_object, response_time
+
+    def transfer_in(self, data: DataObject) -> float:
+        """
+        Store data for a background migration, written at the mean latency and throughput of the medium.
+
+        Returns:
+            float: Time taken to write the data.
+        """
+        self.data_objects[data.id] = data
+        self.used_capacity += data.size
+        response_time = sum(self.write_latency) / 2 + data.size / (sum(self.write_throughput) / 2)
+        self.active_time += response_time
         return response_time
 
+    def _reserve(self, size: float, purpose: str):
+        if size > self.get_available_space():
+            raise InsufficientCapacityException(
+                f"StorageMedium: cannot reserve {format_data_size(size)} of {self.name} for the {purpose}, "
+                f"{format_data_size(self.get_available_space())} available."
+            )
+        self.capacity -= size
+
+    def reserve_cache(self, size: float):
+        """Take `size` KB out of the capacity for the read cache slice."""
+        self._reserve(size, "read cache")
+        self.cache_capacity += size
+
+    def reserve_buffer(self, size: float):
+        """Take `size` KB out of the capacity for the write-back buffer slice."""
+        self._reserve(size, "write-back buffer")
+        self.buffer_capacity += size
+
+    def try_write_buffered(self, size: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to write `size` KB to the write-back buffer slice, as try_write() writes data.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
+
+        self.num_writes += 1
+        self.buffer_used += size
+        latency = stream.uniform(self.write_latency[0], self.write_latency[1])
+        throughput = stream.uniform(self.write_throughput[0], self.write_throughput[1])
+        response_time = latency + size / throughput
+        self.total_write_response_time += response_time
+        self.active_time += response_time
+        return OperationOutcome.SUCCESS, response_time
+
+    def release_buffer(self, size: int):
+        """Drop `size` KB of buffered writes, superseded or deleted before their destage."""
+        self.buffer_used -= size
+
+    def destage_buffer(self, size: int) -> float:
+        """
+        Read `size` KB of buffered writes for their destage and free them, at the mean read latency
+        and throughput of the medium (no random numbers are drawn).
+
+        Returns:
+            float: Time taken to read the data.
+        """
+        self.buffer_used -= size
+        response_time = sum(self.read_latency) / 2 + size / (sum(self.read_throughput) / 2)
+        self.active_time += response_time
+        return response_time
+
+    def fill_cache(self, size: int) -> float:
+        """
+        Write a cached copy of `size` KB to the read cache slice in the background, at the mean
+        write latency and throughput of the medium (no random numbers are drawn).
+
+        Returns:
+            float: Time taken to write the copy.
+        """
+        self.cache_used += size
+        response_time = sum(self.write_latency) / 2 + size / (sum(self.write_throughput) / 2)
+        self.active_time += response_time
+        return response_time
+
+    def evict_cache(self, size: int):
+        """Drop a cached copy of `size` KB from the read cache slice."""
+        self.cache_used -= size
+
+    def get_expected_read_time_coefficients(self) -> tuple[float, float]:
+        """
+        Get the expected read time of the medium as fixed + per_kb × size, without reading anything.
+
+        The fixed part is the mean read latency plus the expected number of unavailable/failed
+        attempts times the error response time, the per-KB part is E[1 / throughput] for a
+        throughput drawn uniformly from the read throughput range.
+
+        Returns:
+            tuple[float, float]: (fixed time in ms, time per KB in ms)
+        """
+        success_probability = self.availability * (1 - self.error_rate)
+        expected_failed_attempts = (1 - success_probability) / success_probability
+
+        fixed = (self.read_latency[0] + self.read_latency[1]) / 2 + expected_failed_attempts * self.get_error_response_time()
+
+        low, high = self.read_throughput
+        per_kb = np.log(high / low) / (high - low) if high > low else 1 / low
+
+        return fixed, per_kb
+
     def calculate_power_usage(self, *, active=True):
         """Calculate power usage based on activity state."""
         return self.power_consumption[0] if active else self.power_consumption[1]
 
+    def calculate_energy(self, span: float) -> float:
+        """
+        Calculate the energy used by the medium over a simulated time span.
+
+        The medium draws its active power while serving requests and its idle power for the
+        rest of the span.
+
+        Args:
+            span (float): Simulated time in milliseconds.
+
+        Returns:
+            float: Energy in joules.
+        """
+        idle_time = max(span - self.active_time, 0)
+        return (
+            self.active_time * self.calculate_power_usage(active=True)
+            + idle_time * self.calculate_power_usage(active=False)
+        ) / 1000
+
     def reset(self):
         """Reset the storage medium's used capacity and clear all stored data."""
         self.data_objects.clear()
         self.used_capacity = 0
+        self.cache_used = 0
+        self.buffer_used = 0
+        self.active_time = 0
+        if self.service_queue is not None:
+            self.service_queue.reset()
         logger.info(f"StorageMedium: {self.storage_type} storage reset. Capacity is now {format_data_size(self.capacity)}.")
 
 # Example Usage
@@ -1,21 +1,23 @@
-import numpy as np
 from typing import List
 from uuid import uuid4
-from typing import Dict
+from typing import Dict, Tuple
 import random
 
-from .storage_config import STORAGE_NODE_CONFIG
+from .storage_config import STORAGE_NODE_CONFIG, GB, MS_PER_HOUR, HOURS_PER_MONTH
 from .exceptions import (
   StorageNodeUnavailableException, 
-  StorageMediumUnavailableException,
   DataNotFoundException,
-  StorageMediumFailureException,
   DataAlreadyExistsException,
   StorageNodeFailureException,
   InsufficientCapacityException
 )
-from .storage_types import StorageNodeType, DataObject, StorageMediumType
+from .storage_types import StorageNodeType, DataObject, StorageMediumType, RequestType, OperationOutcome
 from .StorageMedium import StorageMedium
+from .LatencyHistogram import LatencyHistogram
+from .SimulationClock import SimulationClock
+from .ServiceQueue import ServiceQueue
+from .RandomStream import RandomStream, GLOBAL_RANDOM, bernoulli_threshold
+from .RetryPolicy import RetryPolicy, DEFAULT_RETRY_POLICY
 from utils.logger import logger
 from utils.Utility import format_data_size
 
@@ -24,6 +26,9 @@ class StorageNode:
                  node_type: StorageNodeType, 
                  storage_mediums: List[StorageMedium],
                  baseline_response_time=5, # baseline response time in milliseconds
+                 clock: SimulationClock = None,
+                 config: dict = None,
+                 service_queue: bool = False,
             ):
         """
         Initialize a storage node for a distributed storage system.
@@ -32,8 +37,12 @@ class StorageNode:
             name (str): Name of the storage node.
             node_type (StorageNodeType): Type of the storage node (FAST, MEDIUM, SLOW).
             storage_mediums (list[StorageMedium]): List of storage mediums attached to the node.
+            clock (SimulationClock): Simulated time used for the storage (GB-hours) cost, usually shared by the whole system.
+            config (dict): Parameters of the node, STORAGE_NODE_CONFIG[node_type] by default.
+            service_queue (bool): Queue the requests in front of the node (see ServiceQueue), with the
+                `service_channels` of its config. The storage mediums have their own queues.
         """
-        config = STORAGE_NODE_CONFIG[node_type]
+        config = config if config is not None else STORAGE_NODE_CONFIG[node_type]
 
         self.id = id if id else uuid4()
         self.name = name
@@ -41,6 +50,7 @@ class StorageNode:
         self._read_cost = config["read_cost"]
         self._write_cost = config["write_cost"]
         self._delete_cost = config["delete_cost"]
+        self._storage_cost_per_gb_month = config["storage_cost_per_gb_month"]
         self.process_time = config["process_time"]
         self.inter_node_latency = config["inter_node_latency"]
         self.network_speed = config["network_speed"]  # Network speed in Gbps
@@ -50,24 +60,105 @@ class StorageNode:
         self.network_read_latency = config["network_read_latency"]
         self.network_delete_latency = config["network_delete_latency"]
         self.base_response_time = baseline_response_time
+        # FIFO queue in front of the node (process and network time), None when queueing is disabled
+        self.service_queue = ServiceQueue(config["service_channels"]) if service_queue else None
         
         self.is_available = True
         self.num_unavailable = 0  # Number of times the node has been unavailable
         self.num_reads = 0  # Number of read operations
         self.num_writes = 0  # Number of write operations
         self.num_deletes = 0  # Number of delete operations
+        self.num_migrated_in = 0  # Number of replicas moved to the node by background migrations
+        self.num_migrated_out = 0  # Number of replicas moved away from the node by background migrations
+        self.num_cache_reads = 0  # Number of reads served from the read cache (included in num_reads)
         self.total_read_response_time = 0  # Total read latency
         self.total_write_response_time = 0  # Total write latency
         self.total_delete_response_time = 0  # Total delete latency
+        # Response time distribution per request type
+        self.response_time_histograms: Dict[RequestType, LatencyHistogram] = {
+            request_type: LatencyHistogram() for request_type in RequestType
+        }
 
         self.storage_media = storage_mediums
 
-        self.total_cost = 0
+        self.total_cost = 0  # Cost of the operations
+
+        # Used capacity integrated over the simulated time, updated on every capacity change
+        self.clock = clock if clock is not None else SimulationClock()
+        self.stored_kb_ms = 0.0
+        self._last_accrual_time = self.clock.now
+
+    def attach_clock(self, clock: SimulationClock):
+        """Switch the node to another clock, the storage time so far is kept."""
+        self.accrue_storage_time()
+        self.clock = clock
+        self._last_accrual_time = clock.now
+
+    def accrue_storage_time(self):
+        """Add used capacity × elapsed time since the last capacity change. Call it before the used capacity changes."""
+        now = self.clock.now
+        if now > self._last_accrual_time:
+            self.stored_kb_ms += (self.get_used_capacity() + self.get_cached_capacity()) * (now - self._last_accrual_time)
+        self._last_accrual_time = now
+
+    def get_storage_gb_hours(self) -> float:
+        """Return the GB-hours stored on the node up to the current simulated time."""
+        pending = (self.get_used_capacity() + self.get_cached_capacity()) * max(self.clock.now - self._last_accrual_time, 0)
+        return (self.stored_kb_ms + pending) / GB / MS_PER_HOUR
+
+    def get_storage_cost(self) -> float:
+        """Return the cost of the data kept on the node so far, from its $/GB-month rate."""
+        return self.get_storage_gb_hours() / HOURS_PER_MONTH * self._storage_cost_per_gb_month
+
+    def get_media_energy(self) -> Dict[str, float]:
+        """Return the energy in joules used by each storage medium of the node since the first operation (see SimulationClock.elapsed())."""
+        span = self.clock.elapsed()
+        return {medium.name: medium.calculate_energy(span) for medium in self.storage_media}
+
+    def get_energy(self) -> float:
+        """Return the energy in joules used by the storage media of the node since the first operation (see SimulationClock.elapsed())."""
+        span = self.clock.elapsed()
+        return sum(medium.calculate_energy(span) for medium in self.storage_media)
+
+    def _queueing_delay(self, node_service_time: float, served_media: List[tuple]) -> float:
+        """
+        Reserve the node and media service queues for a request arriving now.
+
+        The request first waits for a node channel, then, after the process time, for a
+        channel of each medium it is served by.
+
+        Args:
+            node_service_time (float): Time the request occupies the node (process and network time).
+            served_media (list[tuple[StorageMedium, float]]): Media serving the request with their service time.
+
+        Returns:
+            float: Total waiting time in ms, 0 if queueing is disabled.
+        """
+        if self.service_queue is None:
+            return 0
+
+        arrival_time = self.clock.now
+        node_wait_time = self.service_queue.serve(arrival_time, node_service_time)
+
+        medium_arrival_time = arrival_time + node_wait_time + self.process_time
+        medium_wait_time = 0
+        for medium, medium_service_time in served_media:
+            if medium.service_queue is not None:
+                medium_wait_time = max(medium_wait_time, medium.service_queue.serve(medium_arrival_time, medium_service_time))
+
+        return node_wait_time + medium_wait_time
 
     def get_used_capacity(self):
         """Return the used storage capacity of the node."""
         return sum(medium.used_capacity for medium in self.storage_media)
     
+    def get_cached_capacity(self):
+        """
+        Return the KB in the read cache and write-back buffer slices of the node, stored but not part
+        of the used capacity.
+        """
+        return sum(medium.cache_used + medium.buffer_used for medium in self.storage_media)
+
     def get_total_capacity(self):
         """Return the total storage capacity of the node."""
         return sum(medium.capacity for medium in self.storage_media)
@@ -84,18 +175,40 @@ class StorageNode:
     
     def check_availability(self):
         """Simulate node availability."""
-        is_available = np.random.choice([True, False], p=[self.availability, 1 - self.availability])
-        logger.info(f"StorageNode: Node {self.name} availability: {is_available}")
-        if not is_available:
-            self.num_unavailable += 1
-            raise StorageNodeUnavailableException(f"{self.type} storage node is currently unavailable.")
+        if not self._draw_available(GLOBAL_RANDOM):
+            self._raise_for_outcome(OperationOutcome.UNAVAILABLE)
         
     def simulate_failure(self):
         """Simulate a random failure based on the failure rate."""
-        is_failure = np.random.choice([True, False], p=[self.failure_rate, 1 - self.failure_rate])
-        if is_failure:
+        if self._draw_failure(GLOBAL_RANDOM):
+            self._raise_for_outcome(OperationOutcome.FAILURE)
+
+    def _draw_available(self, stream: RandomStream) -> bool:
+        # Same draw as np.random.choice([True, False], p=[availability, 1 - availability])
+        if stream.random() < bernoulli_threshold(self.availability):
+            return True
+        self.num_unavailable += 1
+        return False
+
+    def _draw_failure(self, stream: RandomStream) -> bool:
+        return stream.random() < bernoulli_threshold(self.failure_rate)
+
+    def _raise_for_outcome(self, outcome: OperationOutcome, data_id: str = None, data_size: int = 0):
+        """Raise the exception of the public API matching an unsuccessful outcome."""
+        if outcome == OperationOutcome.UNAVAILABLE:
+            raise StorageNodeUnavailableException(f"{self.type} storage node is currently unavailable.")
+        if outcome == OperationOutcome.FAILURE:
             raise StorageNodeFailureException(f"A failure occurred on {self.type} storage node during the operation.")
-        
+        if outcome == OperationOutcome.NOT_FOUND:
+            raise DataNotFoundException(f"Data with ID {data_id} not found on node {self.name}.")
+        if outcome == OperationOutcome.ALREADY_EXISTS:
+            raise DataAlreadyExistsException(f"StorageNode: data with ID {data_id} already exists on {self.name}.")
+        if outcome == OperationOutcome.INSUFFICIENT_CAPACITY:
+            raise InsufficientCapacityException(
+                f"StorageNode: Insufficient capacity on {self.name} to write data {data_id}. "
+                f"Required: {format_data_size(data_size)}, Available: {format_data_size(self.get_node_available_space())}."
+            )
+
     def write_data(self, data: DataObject, overwrite=False) -> float:
         """
         Simulate writing data to the storage node.
@@ -106,64 +219,130 @@ class StorageNode:
             overwrite (bool): If True, allows overwriting existing data.
 
         Raises:
-            StorageTierUnavailableException: If the node is unavailable.
-            ValueError: If the write request exceeds available capacity.
+            StorageNodeUnavailableException: If the node is unavailable.
+            StorageNodeFailureException: If the node fails during the operation.
             DataAlreadyExistsException: If data exists and overwrite is False.
             InsufficientCapacityException: If there is not enough space.
         """
-        self.check_availability()
-        self.simulate_failure()
+        outcome, response_time = self.try_write(data, GLOBAL_RANDOM, overwrite=overwrite)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data.id, data.size)
+
+        logger.info(f"StorageNode: Written{' (overwritten)' if overwrite else ''} data {data.id} to {self.name}.")
+        return response_time
+
+    def try_write(
+        self, data: DataObject, stream: RandomStream, overwrite=False, retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY
+    ) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to write data as write_data() does, with the random numbers taken from `stream`
+        and the errors returned as outcome codes instead of raised. An unavailable or failed
+        medium is retried on a medium with enough space, as long as `retry_policy` allows it.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful,
+                the time spent on the media when the retries are exhausted).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
+        self.accrue_storage_time()
 
         old_data_size = 0
-        if self.has_data(data.id):
+        old_data = self._find_data(data.id)
+        if old_data is not None:
             if not overwrite:
-                raise DataAlreadyExistsException(f"StorageNode: data with ID {data.id} already exists on {self.name}.")
-            
+                return OperationOutcome.ALREADY_EXISTS, 0
             # If overwriting, get the size of the existing data
-            old_data_size = self.get_data(data.id).size
+            old_data_size = old_data.size
 
         size_diff = data.size - old_data_size
         if size_diff > 0 and size_diff > self.get_node_available_space():
-            raise InsufficientCapacityException(
-                f"StorageNode: Insufficient capacity on {self.name} to overwrite data {data.id}. "
-                f"Additional required: {format_data_size(size_diff)}, Available: {format_data_size(self.get_node_available_space())}."
-            )
+            return OperationOutcome.INSUFFICIENT_CAPACITY, 0
 
         self.num_writes += 1
-        logger.info(f"StorageNode: Writing{' (overwriting)' if overwrite else ''} data {data.id} to {self.name}.")
 
         suitable_storage_mediums: list[StorageMedium] = [
             medium for medium in self.storage_media if medium.get_available_space() + (old_data_size if medium.has_data(data.id) else 0) >= data.size
         ]
 
         medium_response_time = 0
+        failed_attempts = 0
+        served_media = []
         while suitable_storage_mediums:
             medium = random.choice(suitable_storage_mediums)
-            try:
-                medium_response_time += medium.write_data(data, overwrite=overwrite)
-                logger.debug(
-                    f"StorageNode: Data {data.id} written to {medium.name} on {self.name}. "
-                    f"Used capacity: {format_data_size(self.get_used_capacity())}/{format_data_size(self.get_total_capacity())}. "
-                    f"Available space: {format_data_size(self.get_node_available_space())}."
-                )
+            outcome, medium_service_time = medium.try_write(data, stream, overwrite=overwrite)
+            if outcome == OperationOutcome.SUCCESS:
+                medium_response_time += medium_service_time
+                served_media.append((medium, medium_service_time))
                 break
-            except StorageMediumUnavailableException:
-                logger.error(f"StorageNode: Medium {medium.name} unavailable for writing data {data.id}.")
-                medium_response_time += medium.get_error_response_time()
-            except StorageMediumFailureException:
-                logger.error(f"StorageNode: Medium {medium.name} failed while writing data {data.id}.")
-                medium_response_time += medium.get_error_response_time()
-
+            if outcome != OperationOutcome.UNAVAILABLE and outcome != OperationOutcome.FAILURE:
+                return outcome, 0
+            medium_response_time += medium.get_error_response_time()
+            failed_attempts += 1
+            delay = retry_policy.retry_delay(failed_attempts, medium_response_time, stream)
+            if delay is None:
+                return OperationOutcome.FAILURE, self.process_time + medium_response_time
+            medium_response_time += delay
+
+        return OperationOutcome.SUCCESS, self._complete_write(data.size, served_media, medium_response_time)
+
+    def _complete_write(self, size: int, served_media: List[tuple], medium_response_time: float) -> float:
+        """Account a write of `size` KB served by `served_media` and return the node response time."""
         # Simulate network transfer time based on network speed
-        data_transfer_time = data.size / self.network_speed
+        data_transfer_time = size / self.network_speed
         network_time = self.network_write_latency + data_transfer_time
         response_time = self.process_time + network_time + medium_response_time
+        response_time += self._queueing_delay(self.process_time + network_time, served_media)
 
         self.total_write_response_time += response_time
+        self.response_time_histograms[RequestType.WRITE].record(response_time)
         self.total_cost += self._write_cost
 
         return response_time
 
+    def try_write_buffered(self, medium: StorageMedium, size: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to write `size` KB to the write-back buffer slice of a medium of the node (see
+        WriteBackBuffer), with the random numbers taken from `stream`. A single attempt is made,
+        the caller writes the data to its tier instead when it is not successful.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 if the node is unavailable
+                or failed, the time spent on the medium if the medium is).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
+        self.accrue_storage_time()
+
+        outcome, medium_service_time = medium.try_write_buffered(size, stream)
+        if outcome != OperationOutcome.SUCCESS:
+            return outcome, self.process_time + medium.get_error_response_time()
+
+        self.num_writes += 1
+        return OperationOutcome.SUCCESS, self._complete_write(size, [(medium, medium_service_time)], medium_service_time)
+
+    def release_buffer(self, medium: StorageMedium, size: int):
+        """Drop `size` KB of buffered writes from the write-back buffer slice of a medium of the node."""
+        self.accrue_storage_time()
+        medium.release_buffer(size)
+
+    def destage_buffer(self, medium: StorageMedium, size: int) -> float:
+        """
+        Read `size` KB of buffered writes from the write-back buffer slice of a medium of the node
+        for their destage in the background, charged as a read.
+
+        Returns:
+            float: The time the node took to read the data.
+        """
+        self.accrue_storage_time()
+        medium_time = medium.destage_buffer(size)
+        self.total_cost += self._read_cost
+        return self.process_time + medium_time
+
     def has_data(self, data_id: str) -> bool:
         """Check if the data with the given ID is stored in this node."""
         for medium in self.storage_media:
@@ -176,104 +355,228 @@ class StorageNode:
         Simulate reading a data from the storage node.
 
         Args:
-            simEnv: Simulation environment.
-            data (Data): Data object containing the data attributes (id, data_size).
+            data_id (str): ID of the data to read.
 
         Raises:
-            StorageTierUnavailableException: If the node is unavailable.
-            ValueError: If the read request exceeds stored capacity.
+            StorageNodeUnavailableException: If the node is unavailable.
+            StorageNodeFailureException: If the node fails during the operation.
+            DataNotFoundException: If the data is not stored on the node.
 
         Returns:
             float: Total time taken for the read operation.
         """
-        
-        self.check_availability()
-        self.simulate_failure()
+        outcome, response_time = self.try_read(data_id, GLOBAL_RANDOM)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data_id)
 
-        if not self.has_data(data_id):
-            raise DataNotFoundException(f"Data with ID {data_id} not found on node {self.name}.")
+        logger.debug(f"StorageNode: Read data {data_id} from {self.name}.")
+        return response_time
+
+    def try_read(self, data_id: str, stream: RandomStream, retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to read data as read_data() does, with the random numbers taken from `stream`
+        and the errors returned as outcome codes instead of raised. An unavailable or failed
+        medium is retried until the data is read, as long as `retry_policy` allows it.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful,
+                the time spent on the media when the retries are exhausted).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
+
+        # It should always be one medium as it is not allowed to store the same data's replicas on the same node
+        media_has_data = [medium for medium in self.storage_media if data_id in medium.data_objects]
+        if not media_has_data:
+            return OperationOutcome.NOT_FOUND, 0
 
         self.num_reads += 1
-        
-        medium_response_time = 0
 
-        media_has_data = [medium for medium in self.storage_media if medium.has_data(data_id)]
+        medium_response_time = 0
+        failed_attempts = 0
         while True:
-            # Select a random storage medium with the data, it should always be one
-            # as it is not allowed to store the same data's replicas on the same node
             medium: StorageMedium = random.choice(media_has_data)
-            if medium.has_data(data_id):
-                try: 
-                    medium_response_time += medium.read_data(data_id)
-                    break
-                except StorageMediumUnavailableException as e:
-                    logger.error(f"StorageNode: Error reading data {data_id} from medium: {medium.name} as it is not available.")
-                    medium_response_time += medium.get_error_response_time()
-                except StorageMediumFailureException as e:
-                    logger.error(f"StorageNode: Error reading data {data_id} from medium: {medium.name} due to failure.")
-                    medium_response_time += medium.get_error_response_time()
-
-        dataObject: DataObject = self.get_data(data_id)
-        logger.debug(f"StorageNode: Reading data {dataObject.id} from {self.name}.")
+            outcome, medium_service_time = medium.try_read(data_id, stream)
+            if outcome == OperationOutcome.SUCCESS:
+                medium_response_time += medium_service_time
+                break
+            medium_response_time += medium.get_error_response_time()
+            failed_attempts += 1
+            delay = retry_policy.retry_delay(failed_attempts, medium_response_time, stream)
+            if delay is None:
+                return OperationOutcome.FAILURE, self.process_time + medium_response_time
+            medium_response_time += delay
+
+        return OperationOutcome.SUCCESS, self._complete_read(
+            media_has_data[0].data_objects[data_id].size, medium, medium_service_time, medium_response_time
+        )
+
+    def _complete_read(self, size: int, medium: StorageMedium, medium_service_time: float, medium_response_time: float) -> float:
+        """Account a read of `size` KB served by `medium` and return the node response time."""
         # Simulate network transfer time based on network speed
-        data_transfer_time = dataObject.size / self.network_speed  # Time in milliseconds
+        data_transfer_time = size / self.network_speed  # Time in milliseconds
         network_time = self.network_read_latency + data_transfer_time
         # Node response time = process time + network time + medium response time
         response_time = self.process_time + network_time + medium_response_time
+        response_time += self._queueing_delay(self.process_time + network_time, [(medium, medium_service_time)])
         self.total_read_response_time += response_time
+        self.response_time_histograms[RequestType.READ].record(response_time)
 
         # the size of the data read is negligible
         self.total_cost += self._read_cost
 
         return response_time
+
+    def try_read_cached(self, medium: StorageMedium, size: int, stream: RandomStream) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to read a copy of `size` KB from the read cache or write-back buffer slice of a medium
+        of the node (see ReadCache and WriteBackBuffer), with the random numbers taken from `stream`.
+        A single attempt is made, the caller reads the replicas instead when it is not successful.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 if the node is unavailable
+                or failed, the time spent on the medium if the medium is).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
+
+        outcome, medium_service_time = medium.try_read_cached(size, stream)
+        if outcome != OperationOutcome.SUCCESS:
+            return outcome, self.process_time + medium.get_error_response_time()
+
+        self.num_reads += 1
+        return OperationOutcome.SUCCESS, self._complete_read(size, medium, medium_service_time, medium_service_time)
+
+    def fill_cache(self, medium: StorageMedium, size: int) -> float:
+        """
+        Write a cached copy of `size` KB to the read cache slice of a medium of the node in the
+        background, charged as a write.
+
+        Returns:
+            float: The time the node took to write the copy.
+        """
+        self.accrue_storage_time()
+        medium_time = medium.fill_cache(size)
+        self.total_cost += self._write_cost
+        return self.process_time + medium_time
+
+    def evict_cache(self, medium: StorageMedium, size: int):
+        """Drop a cached copy of `size` KB from the read cache slice of a medium of the node."""
+        self.accrue_storage_time()
+        medium.evict_cache(size)
     
-    def get_data(self, data_id: str) -> DataObject:
-        """Get the data object with the given ID."""
-            
+    def get_expected_read_time_coefficients(self) -> tuple[float, float]:
+        """
+        Get the expected time to read data from this node as fixed + per_kb × size, without reading anything.
+
+        It covers the retries on unavailable/failed nodes done by the DataManager, the process and
+        network time of the node and the average expected read time of its storage media.
+
+        Returns:
+            tuple[float, float]: (fixed time in ms, time per KB in ms)
+        """
+        success_probability = self.availability * (1 - self.failure_rate)
+        expected_failed_attempts = (1 - success_probability) / success_probability
+
+        media_coefficients = [medium.get_expected_read_time_coefficients() for medium in self.storage_media]
+        medium_fixed = sum(fixed for fixed, _ in media_coefficients) / len(media_coefficients)
+        medium_per_kb = sum(per_kb for _, per_kb in media_coefficients) / len(media_coefficients)
+
+        fixed = (
+            expected_failed_attempts * self.get_error_response_time()
+            + self.process_time
+            + self.network_read_latency
+            + medium_fixed
+        )
+        per_kb = 1 / self.network_speed + medium_per_kb
+
+        return fixed, per_kb
+
+    def _find_data(self, data_id: str) -> DataObject:
+        """Return the data object with the given ID, None if it is not stored on the node."""
         for medium in self.storage_media:
-            if medium.has_data(data_id):
-                return medium.get_data(data_id)
+            data_object = medium.data_objects.get(data_id)
+            if data_object is not None:
+                return data_object
+        return None
 
-        raise DataNotFoundException(f"Data with ID {data_id} not found on node {self.name}.")
+    def get_data(self, data_id: str) -> DataObject:
+        """Get the data object with the given ID."""
+        data_object = self._find_data(data_id)
+        if data_object is None:
+            raise DataNotFoundException(f"Data with ID {data_id} not found on node {self.name}.")
+        return data_object
 
     def delete_data(self, data_id: str) -> float:
         """
         Simulate deleting a data from the storage node.
 
         Args:
-            simEnv: Simulation environment.
-            data (Data): Data object containing the data attributes (id, data_size).
+            data_id (str): ID of the data to delete.
 
         Raises:
-            StorageTierUnavailableException: If the node is unavailable.
-            ValueError: If the data is not found on any medium.
+            StorageNodeUnavailableException: If the node is unavailable.
+            StorageNodeFailureException: If the node fails during the operation.
+            DataNotFoundException: If the data is not stored on the node.
 
         Returns:
             float: Total time taken for the delete operation.
         """
+        outcome, response_time = self.try_delete(data_id, GLOBAL_RANDOM)
+        if outcome != OperationOutcome.SUCCESS:
+            self._raise_for_outcome(outcome, data_id)
 
-        self.check_availability()
-        self.simulate_failure()
+        logger.debug(f"StorageNode: Deleted data {data_id} from {self.name}.")
+        return response_time
+
+    def try_delete(self, data_id: str, stream: RandomStream, retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY) -> Tuple[OperationOutcome, float]:
+        """
+        Attempt to delete data as delete_data() does, with the random numbers taken from `stream`
+        and the errors returned as outcome codes instead of raised. The data is deleted from
+        every medium holding it, an unavailable or failed medium is retried as long as
+        `retry_policy` allows it.
+
+        Returns:
+            tuple[OperationOutcome, float]: The outcome and the response time (0 unless successful,
+                the time spent on the media when the retries are exhausted).
+        """
+        if not self._draw_available(stream):
+            return OperationOutcome.UNAVAILABLE, 0
+        if self._draw_failure(stream):
+            return OperationOutcome.FAILURE, 0
 
-        if not self.has_data(data_id):
-            raise DataNotFoundException(f"StorageNode: data with ID {data_id} not found on node {self.name}.")
+        media_contain_data = [medium for medium in self.storage_media if data_id in medium.data_objects]
+        if not media_contain_data:
+            return OperationOutcome.NOT_FOUND, 0
 
         self.num_deletes += 1
+        self.accrue_storage_time()
 
         medium_response_time = 0
-
-        media_contain_data = [medium for medium in self.storage_media if medium.has_data(data_id)]
-        # Find and delete the data from all storage mediums
-        while len(media_contain_data) > 0:
-            # Select a random storage medium
-            medium_contains_data: StorageMedium = np.random.choice(media_contain_data)
-            try:
-                medium_response_time += medium_contains_data.delete_data(data_id)
+        failed_attempts = 0
+        served_media = []
+        while media_contain_data:
+            if len(media_contain_data) == 1:
+                # No draw for a single element, as np.random.choice
+                medium_contains_data = media_contain_data[0]
+            else:
+                medium_contains_data = media_contain_data[stream.index(len(media_contain_data))]
+            outcome, medium_service_time = medium_contains_data.try_delete(data_id, stream)
+            if outcome == OperationOutcome.SUCCESS:
+                medium_response_time += medium_service_time
+                served_media.append((medium_contains_data, medium_service_time))
                 media_contain_data.remove(medium_contains_data)
-            except StorageMediumUnavailableException as e:
-                logger.error(f"StorageNode: Error deleting data {data_id} from medium: {medium_contains_data.name} as it is not available.")
-            except StorageMediumFailureException as e:
-                logger.error(f"StorageNode: Error deleting data {data_id} from medium: {medium_contains_data.name} due to failure.")
+                continue
+            # A failed medium attempt only costs time once the retry policy waits between attempts
+            failed_attempts += 1
+            delay = retry_policy.retry_delay(failed_attempts, medium_response_time, stream)
+            if delay is None:
+                return OperationOutcome.FAILURE, self.process_time + medium_response_time
+            medium_response_time += delay
 
         # Simulate network transfer time based on network speed
         # in delete there is no data transfer
@@ -281,11 +584,43 @@ class StorageNode:
         network_time = self.network_delete_latency + data_transfer_time
         # Node response time = process time + network time + medium response time
         response_time = self.process_time + network_time + medium_response_time
+        response_time += self._queueing_delay(self.process_time + network_time, served_media)
         self.total_delete_response_time += response_time
+        self.response_time_histograms[RequestType.DELETE].record(response_time)
 
         self.total_cost += self._delete_cost
 
-        return response_time
+        return OperationOutcome.SUCCESS, response_time
+
+    def migrate_out(self, data_id: str) -> Tuple[DataObject, float]:
+        """
+        Remove a replica moved to another node by a background migration. The request is not subject
+        to availability, queues or request statistics, it is charged as a read.
+
+        Returns:
+            tuple[DataObject, float]: The replica removed and the time the node took to read it.
+        """
+        self.accrue_storage_time()
+        medium = next(medium for medium in self.storage_media if medium.has_data(data_id))
+        data_object, medium_time = medium.transfer_out(data_id)
+        self.num_migrated_out += 1
+        self.total_cost += self._read_cost
+        return data_object, self.process_time + medium_time
+
+    def migrate_in(self, data: DataObject) -> float:
+        """
+        Store a replica moved from another node by a background migration, on the medium with the
+        most available space. It is charged as a write.
+
+        Returns:
+            float: The time the node took to write the replica.
+        """
+        self.accrue_storage_time()
+        medium = max(self.storage_media, key=lambda medium: medium.get_available_space())
+        medium_time = medium.transfer_in(data)
+        self.num_migrated_in += 1
+        self.total_cost += self._write_cost
+        return self.process_time + medium_time
 
     def clear_storage(self):
         """
@@ -296,6 +631,7 @@ class StorageNode:
         """
         self.check_availability()
 
+        self.accrue_storage_time()
         for medium in self.storage_media:
             medium.used_capacity = 0
 
@@ -304,10 +640,19 @@ class StorageNode:
         self.num_reads = 0
         self.num_writes = 0
         self.num_deletes = 0
+        self.num_migrated_in = 0
+        self.num_migrated_out = 0
+        self.num_cache_reads = 0
         self.total_read_response_time = 0
         self.total_write_response_time = 0
         self.total_delete_response_time = 0
         self.total_cost = 0
+        self.stored_kb_ms = 0.0
+        self._last_accrual_time = self.clock.now
+        if self.service_queue is not None:
+            self.service_queue.reset()
+        for histogram in self.response_time_histograms.values():
+            histogram.reset()
         
         for medium in self.storage_media:
             medium.reset()
@@ -3,6 +3,13 @@ from .StorageNode import StorageNode
 from .StorageMedium import StorageMedium
 from .exceptions import StorageNodeUnavailableException
 from .MetricsCalculator import MetricsCalculator
-from .storage_types import StorageNodeType, DataObject, StorageMediumType
+from .LatencyHistogram import LatencyHistogram
+from .SimulationClock import SimulationClock
+from .ServiceQueue import ServiceQueue
+from .RandomStream import RandomStream
+from .RetryPolicy import RetryPolicy
+from .CachePolicy import CachePolicy
+from .RedundancyScheme import RedundancyScheme, ReplicationScheme, ErasureCodingScheme
+from .storage_types import StorageNodeType, DataObject, StorageMediumType, OperationOutcome
 from .storage_config import HIERARCHICAL_STORAGE_CONFIG
 from .HierarchicalStorage.HierarchicalStorageSystem import HierarchicalStorageSystem
\ No newline at end of file
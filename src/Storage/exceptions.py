@@ -23,4 +23,10 @@ class StorageNodeFailureException(Exception):
     pass
 class StorageNodeUnavailableException(Exception):
     """Exception raised when the storage node is unavailable."""
-    pass
\ No newline at end of file
+    pass
+
+class RequestAbandonedException(Exception):
+    """Exception raised when the retry policy gives up a request, with the time the client waited."""
+    def __init__(self, message: str, response_time: float = 0):
+        super().__init__(message)
+        self.response_time = response_time
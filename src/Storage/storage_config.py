@@ -7,6 +7,9 @@ MB = 1024 * KB  # 1 MB = 1024 KB
 GB = 1024 * MB  # 1 GB = 1024 MB
 TB = 1024 * GB  # 1 TB = 1024 GB
 
+MS_PER_HOUR = 3_600_000
+HOURS_PER_MONTH = 730  # Billing month used by the $/GB-month storage rates
+
 # TODO: we need to use reasonable values for the storage medium configuration, we can measure if we don't find
 STORAGE_MEDIUM_CONFIG = {
     StorageMediumType.NVMe: {
@@ -20,6 +23,7 @@ STORAGE_MEDIUM_CONFIG = {
         "read_latency": (0.1, 0.3),  # milliseconds
         "write_latency": (0.4, 0.6),  # milliseconds
         "delete_latency": (0.05, 0.1),  # milliseconds
+        "service_channels": 4,  # parallel requests served when queueing is enabled
     },
     StorageMediumType.SSD: {
         "write_throughput": (410, 512),  # KB/ms
@@ -32,6 +36,7 @@ STORAGE_MEDIUM_CONFIG = {
         "read_latency": (0.2, 0.4),  # milliseconds
         "write_latency": (0.5, 0.7),  # milliseconds
         "delete_latency": (0.1, 0.2),  # milliseconds
+        "service_channels": 2,  # parallel requests served when queueing is enabled
     },
     StorageMediumType.HDD: {
         "write_throughput": (102, 154),  # KB/ms
@@ -44,6 +49,7 @@ STORAGE_MEDIUM_CONFIG = {
         "read_latency": (1, 3),  # milliseconds
         "write_latency": (4, 6),  # milliseconds
         "delete_latency": (0.5, 1),  # milliseconds
+        "service_channels": 1,  # parallel requests served when queueing is enabled
     },
 }
 
@@ -52,6 +58,7 @@ STORAGE_NODE_CONFIG = {
         "read_cost": 0.0000004, # dollars per KB
         "write_cost": 0.0000005, # dollars per KB
         "delete_cost": 0.0000003, # dollars per KB
+        "storage_cost_per_gb_month": 0.125, # dollars per GB stored for a month
         "process_time": 500,  # milliseconds
         "inter_node_latency": 1000,  # milliseconds
         "network_speed": 1220703,  # KB/ms
@@ -60,11 +67,13 @@ STORAGE_NODE_CONFIG = {
         "network_write_latency": 0.1,  # milliseconds
         "network_read_latency": 0.05,  # milliseconds
         "network_delete_latency": 0.02,  # milliseconds
+        "service_channels": 8,  # parallel requests served when queueing is enabled
     },
     StorageNodeType.MEDIUM: {
         "read_cost": 0.0000001, # dollars per KB
         "write_cost": 0.0000002, # dollars per KB
         "delete_cost": 0.0000001, # dollars per KB
+        "storage_cost_per_gb_month": 0.08, # dollars per GB stored for a month
         "process_time": 1000,  # milliseconds
         "inter_node_latency": 5000,  # milliseconds
         "network_speed": 610351,  # KB/ms
@@ -73,11 +82,13 @@ STORAGE_NODE_CONFIG = {
         "network_write_latency": 0.2,  # milliseconds
         "network_read_latency": 0.1,  # milliseconds
         "network_delete_latency": 0.05,  # milliseconds
+        "service_channels": 4,  # parallel requests served when queueing is enabled
     },
     StorageNodeType.SLOW: {
         "read_cost": 0.00000002, # dollars per KB
         "write_cost": 0.00000003, # dollars per KB
         "delete_cost": 0.00000001, # dollars per KB
+        "storage_cost_per_gb_month": 0.0125, # dollars per GB stored for a month
         "process_time": 2000,  # milliseconds
         "inter_node_latency": 10000,  # milliseconds
         "network_speed": 122070,  # KB/ms
@@ -86,12 +97,88 @@ STORAGE_NODE_CONFIG = {
         "network_write_latency": 0.3,  # milliseconds
         "network_read_latency": 0.2,  # milliseconds
         "network_delete_latency": 0.1,  # milliseconds
+        "service_channels": 2,  # parallel requests served when queueing is enabled
     }
 }
 
+# FIFO service queues in front of the nodes and media (see ServiceQueue), with the service_channels
+# of the node and medium configs. When disabled, requests are served instantly whatever the load.
+SERVICE_QUEUE_CONFIG = {
+    "enabled": False,
+}
+
+# Background migrations of the data between tiers by temperature (see MigrationEngine).
+# Temperatures are those of DataObject.get_temperature(), a tier is never filled above its high watermark.
+MIGRATION_CONFIG = {
+    "enabled": False,
+    "interval": 1000,  # milliseconds of simulated time between two migration rounds
+    "promote_temperature": 0.9,  # files at least this hot move one tier up
+    "demote_temperature": 0.6,  # files at most this hot move one tier down
+    "hotness_decay": 0.1,  # hotness lost per round by the files not accessed during the round
+    # Fraction of the tier capacity above which its coldest files are demoted, down to the low watermark
+    "high_watermark": {
+        StorageNodeType.FAST: 0.9,
+        StorageNodeType.MEDIUM: 0.9,
+        StorageNodeType.SLOW: 1.0,
+    },
+    "low_watermark": {
+        StorageNodeType.FAST: 0.7,
+        StorageNodeType.MEDIUM: 0.75,
+        StorageNodeType.SLOW: 1.0,
+    },
+    "bandwidth": 100,  # KB/ms of replica data migrated, None for no limit
+    "iops": 1000,  # replicas migrated per second, None for no limit
+}
+
+# Read cache of the MEDIUM and SLOW tiers data in a slice of the FAST tier capacity (see ReadCache).
+READ_CACHE_CONFIG = {
+    "enabled": False,
+    # Eviction policy of every cache shard (see CachePolicy): "lru", "lfu", "arc" or "s3fifo",
+    # or a dict with the "name" and the parameters of the policy
+    "policy": "lru",
+    "capacity_fraction": 0.1,  # fraction of the capacity of every FAST medium reserved for the cache
+}
+
+WRITE_BACK_CONFIG = {
+    "enabled": False,
+    "capacity_fraction": 0.05,  # fraction of the capacity of every FAST medium reserved for the buffer
+    "bandwidth": 50,  # KB/ms destaged to the MEDIUM and SLOW tiers by the whole buffer, None for no limit
+}
+
 HIERARCHICAL_STORAGE_CONFIG = {
     "num_fast_nodes":3,
     "num_medium_nodes": 3,
     "num_slow_nodes": 3,
     "num_data_replica": 3,
-}
\ No newline at end of file
+    # Redundancy of the data of each tier (see RedundancyScheme): "replication" stores num_data_replica copies,
+    # {"name": "erasure", "k": 2, "m": 1} stores k data fragments and m parity fragments on k+m nodes
+    # (k and m are required, k+m at most the nodes of the tier).
+    # A scheme or its parameters for every tier, or per StorageNodeType. None replicates on every tier.
+    "redundancy": None,
+    # Replicas are written/read in parallel, the client is acknowledged after the quorum
+    # (clamped to the replicas written): write after W replicas, read after R replicas,
+    # with 1 ≤ R, W ≤ num_data_replica. None waits for all the replicas written (W = N).
+    "write_quorum": None,
+    "read_quorum": 1,
+    # Retries of the unavailable or failed replicas (see RetryPolicy): a RetryPolicy or its parameters,
+    # for every request type or per RequestType. None retries forever without waiting.
+    "retry_policy": None,
+    # Service queues of the nodes and media, the parameters missing from the dict are those of SERVICE_QUEUE_CONFIG.
+    "service_queue": SERVICE_QUEUE_CONFIG,
+    # Replica every read attempt is sent to (see ReplicaSelector): "uniform", "least_outstanding", "ewma",
+    # "power_of_two" or "hedged", or a dict with the "name" and the parameters of the strategy.
+    "replica_selection": "uniform",
+    # Background tier migrations, the parameters missing from the dict are those of MIGRATION_CONFIG.
+    "migration": MIGRATION_CONFIG,
+    # Read cache on the FAST tier, the parameters missing from the dict are those of READ_CACHE_CONFIG.
+    "read_cache": READ_CACHE_CONFIG,
+    # Write-back buffer on the FAST tier, the parameters missing from the dict are those of WRITE_BACK_CONFIG.
+    "write_back": WRITE_BACK_CONFIG,
+}
+# Estimated System Response (ESR) weights per tier:
+# ESR = 10 × Σ(tier1) + 2 × Σ(tier2) + 1 × Σ(tier3)
+ESR_TIER_WEIGHTS = {
+    StorageNodeType.FAST: 10,    # tier_1 (highest performance)
+    StorageNodeType.MEDIUM: 2,   # tier_2 (medium performance)
+    StorageNodeType.SLOW: 1,     # tier_3 (lowest performance)
+}
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 from dataclasses import dataclass, field
 import random
 import math
@@ -19,6 +19,16 @@ class StorageMediumType(Enum):
     SSD = "SSD"
     HDD = "HDD"
 
+class OperationOutcome(IntEnum):
+    """Outcome code of a storage operation, returned by the non-raising and batched operations."""
+    SUCCESS = 0
+    NOT_FOUND = 1
+    UNAVAILABLE = 2
+    FAILURE = 3
+    INSUFFICIENT_CAPACITY = 4
+    ALREADY_EXISTS = 5
+    TIMEOUT = 6
+
 @dataclass
 class DataObject:
     """
@@ -0,0 +1,43 @@
+import numpy as np
+
+# exp(-40) is below half the float64 epsilon, so 1 - 0.5 × exp(-x) and 1 / (1 + exp(-x)) already
+# round to exactly 1.0 there. Clipping the exponents avoids slow subnormal results.
+EXPONENT_FLOOR = -40.0
+
+def compute_temperatures(total_accesses: np.ndarray, sizes: np.ndarray, hotness_levels: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of DataObject.get_temperature() over a whole file population.
+
+    The scalar version clamps exponents above 700 to a result of 1.0. Here the exponentials are
+    taken of the negated exponents, which cannot overflow and give exactly 1.0 for all large
+    exponents.
+
+    Args:
+        total_accesses (np.ndarray): Number of accesses (reads + writes + deletes) per file.
+        sizes (np.ndarray): Size of each file in KB.
+        hotness_levels (np.ndarray): Explicit hotness level of each file.
+
+    Returns:
+        np.ndarray: The temperature of each file.
+    """
+    total_accesses = np.asarray(total_accesses, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+
+    # temperature = 1 - 0.5 / exp(0.01 × req_time)
+    temperature = np.multiply(total_accesses, -0.01)
+    np.maximum(temperature, EXPONENT_FLOOR, out=temperature)
+    np.exp(temperature, out=temperature)
+    temperature *= -0.5
+    temperature += 1
+
+    # ratio = exp(x) / (1 + exp(x)) = 1 / (1 + exp(-x)), with x = 5 × (size / 1000) × req_time
+    ratio = np.multiply(sizes, -0.005)
+    ratio *= total_accesses
+    np.maximum(ratio, EXPONENT_FLOOR, out=ratio)
+    np.exp(ratio, out=ratio)
+    ratio += 1
+    np.reciprocal(ratio, out=ratio)
+
+    # Pick based on ratio condition, then give priority to the hotness level if higher
+    np.copyto(ratio, temperature, where=ratio > 0.8)
+    return np.maximum(ratio, hotness_levels, out=ratio)
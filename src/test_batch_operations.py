@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched operations of the storage system (write_many, read_many, delete_many).
+
+The same seeded writes, reads and deletes are run one by one and in batches on two identical
+systems. The batches must give the same response times, the same node, medium and client
+counters, the same replica locations and ESR sums, and leave the random generators in the same
+state, since their random numbers are only pre-drawn in blocks. Deletes from a node holding the
+data on several media must pick the media with the same draws from a stream as one by one.
+"""
+
+import pickle
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator, StorageMedium, StorageNode
+from Storage.RandomStream import RandomStream, GLOBAL_RANDOM
+from Storage.storage_types import StorageNodeType, StorageMediumType, DataObject, OperationOutcome
+
+NUM_WRITES = 500
+NUM_READS = 5000
+NUM_DELETES = 200
+
+def create_system(seed: int = 1) -> HierarchicalStorageSystem:
+    random.seed(seed)
+    np.random.seed(seed)
+    system = HierarchicalStorageSystem()
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    return system
+
+def create_operations(seed: int = 9) -> tuple:
+    """Seeded writes, then reads and deletes of IDs that partly do not exist."""
+    rng = random.Random(seed)
+    node_types = list(StorageNodeType)
+    writes = [
+        (node_types[i % len(node_types)], DataObject(id=f"file_{i}", size=rng.randint(10, 5000)))
+        for i in range(NUM_WRITES)
+    ]
+    reads = [f"file_{rng.randrange(NUM_WRITES + 20)}" for _ in range(NUM_READS)]
+    deletes = [f"file_{rng.randrange(NUM_WRITES + 20)}" for _ in range(NUM_DELETES)]
+    return writes, reads, deletes
+
+def histogram_state(histogram) -> tuple:
+    return histogram.total_count, histogram.total, histogram.min, histogram.max, histogram.counts.tolist()
+
+def system_state(system: HierarchicalStorageSystem) -> list:
+    """Counters of the system, its nodes and media, and the state of the random generators."""
+    state = []
+    for node in system.get_all_nodes():
+        state.append((
+            node.num_reads, node.num_writes, node.num_deletes, node.num_unavailable,
+            node.total_read_response_time, node.total_write_response_time, node.total_delete_response_time,
+            node.total_cost,
+            [histogram_state(histogram) for histogram in node.response_time_histograms.values()],
+        ))
+        for medium in node.storage_media:
+            state.append((
+                medium.num_reads, medium.num_writes, medium.num_deletes, medium.num_unavailable,
+                medium.total_read_response_time, medium.total_write_response_time,
+                medium.total_delete_response_time, medium.used_capacity,
+            ))
+    data_manager = system.data_manager
+    state.append((
+        data_manager.get_num_successful_write(),
+        data_manager.get_num_unsuccessful_write(),
+        data_manager.get_num_successful_read(),
+        data_manager.get_num_unsuccessful_read(),
+        dict(data_manager.esr_tracker.tier_sums),
+        data_manager.replica_locations.tolist(),
+        [histogram_state(histogram) for histogram in data_manager.client_response_time_histograms.values()],
+    ))
+    state.append((random.getstate(), pickle.dumps(np.random.get_state())))
+    return state
+
+def run_one_by_one(system: HierarchicalStorageSystem, writes: list, reads: list, deletes: list) -> list:
+    """Run the operations with the raising single operations, a failed operation takes 0 ms."""
+    response_times = []
+    operations = (
+        [lambda i=i: system.write_to_node(*writes[i], i) for i in range(len(writes))]
+        + [lambda i=i: system.read_data(reads[i], NUM_WRITES + i) for i in range(len(reads))]
+        + [lambda i=i: system.delete_data(deletes[i], NUM_WRITES + NUM_READS + i) for i in range(len(deletes))]
+    )
+    for timestamp, operation in enumerate(operations):
+        system.advance_time(timestamp * 0.5)
+        try:
+            response_times.append(operation())
+        except Exception:
+            # Failed operations are part of the model
+            response_times.append(0)
+    return response_times
+
+def run_batched(system: HierarchicalStorageSystem, writes: list, reads: list, deletes: list) -> tuple:
+    """Run the operations with one batch per operation type, return the response times and outcome codes."""
+    timestamps = np.arange(NUM_WRITES + NUM_READS + NUM_DELETES)
+    times = timestamps * 0.5
+    write_range = slice(0, NUM_WRITES)
+    read_range = slice(NUM_WRITES, NUM_WRITES + NUM_READS)
+    delete_range = slice(NUM_WRITES + NUM_READS, None)
+
+    write_times, write_outcomes = system.write_many(
+        [node_type for node_type, _ in writes], [data for _, data in writes],
+        timestamps[write_range].tolist(), times[write_range].tolist(),
+    )
+    read_times, read_outcomes = system.read_many(reads, timestamps[read_range].tolist(), times[read_range].tolist())
+    delete_times, delete_outcomes = system.delete_many(
+        deletes, timestamps[delete_range].tolist(), times[delete_range].tolist()
+    )
+    response_times = np.concatenate([write_times, read_times, delete_times]).tolist()
+    outcomes = np.concatenate([write_outcomes, read_outcomes, delete_outcomes])
+    return response_times, outcomes
+
+def test_batches_match_single_operations():
+    """Batched operations have the same results and effects as the single operations in order."""
+    print("=== Testing batched operations against single operations ===")
+    writes, reads, deletes = create_operations()
+
+    single = create_system()
+    expected_times = run_one_by_one(single, writes, reads, deletes)
+    expected_state = system_state(single)
+
+    batched = create_system()
+    writes, reads, deletes = create_operations()
+    response_times, outcomes = run_batched(batched, writes, reads, deletes)
+
+    counts = {outcome.name: int(np.sum(outcomes == outcome)) for outcome in OperationOutcome}
+    print(f"Outcomes: {counts}")
+    assert counts["SUCCESS"] > 0 and counts["NOT_FOUND"] > 0
+    assert response_times == expected_times
+    assert system_state(batched) == expected_state
+
+def delete_from_media(stream, num_files: int = 50) -> list:
+    """Delete files held by all three media of a node, return the outcomes and the media left after each delete."""
+    np.random.seed(5)
+    media = [StorageMedium(name=f"medium_{i}", type=StorageMediumType.SSD) for i in range(3)]
+    node = StorageNode(name="node", node_type=StorageNodeType.FAST, storage_mediums=media)
+    for i in range(num_files):
+        for medium in media:
+            medium.transfer_in(DataObject(id=f"file_{i}", size=100))
+    results = []
+    for i in range(num_files):
+        results.append(node.try_delete(f"file_{i}", stream))
+    stream.close()
+    return results + [pickle.dumps(np.random.get_state())]
+
+def test_multi_media_deletes_draw_from_stream():
+    """A delete picks the media holding the data with draws of its stream, as one by one."""
+    print("=== Testing deletes from several media ===")
+    expected = delete_from_media(GLOBAL_RANDOM)
+    counts = {outcome.name: sum(result[0] == outcome for result in expected[:-1]) for outcome in OperationOutcome}
+    print(f"Outcomes: {counts}")
+    assert counts["SUCCESS"] > 0
+    assert delete_from_media(RandomStream(16)) == expected
+
+if __name__ == "__main__":
+    test_batches_match_single_operations()
+    test_multi_media_deletes_draw_from_stream()
+    print("\nAll batched operation tests passed.")
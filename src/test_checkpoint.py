@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the checkpoint and resume of simulations.
+
+A seeded simulation is interrupted after some operations, then resumed from its latest
+checkpoint by a new Simulator with different random generator states. The results must be
+identical to those of an uninterrupted run, with both the sequential and the event engine.
+"""
+
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Simulation import Simulator
+from Simulation.Trace import Trace
+from Simulation.sim_config import SIM_CONFIG
+from Algorithms.Heuristic import LoadBalancingGreedy
+
+CHECKPOINT_INTERVAL = 500
+CRASH_AFTER = 1700
+
+class SimulatedCrash(BaseException):
+    """Stops a simulation, not caught by the error handling of the operations."""
+
+class CrashingSimulator(Simulator):
+    """Simulator that crashes before its operation number `crash_after` + 1."""
+
+    def __init__(self, *args, crash_after: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.crash_after = crash_after
+        self.num_executed = 0
+
+    def _execute_operation(self, op, algorithm):
+        self.num_executed += 1
+        if self.num_executed > self.crash_after:
+            raise SimulatedCrash()
+        return super()._execute_operation(op, algorithm)
+
+def create_trace(num_operations: int = 3000, num_files: int = 300, seed: int = 3) -> Trace:
+    """Create a seeded access pattern of writes, reads and deletes 50 ms apart on average."""
+    rng = random.Random(seed)
+    operations = []
+    written = set()
+    time = 0.0
+    for i in range(num_operations):
+        time += rng.expovariate(1 / 50)
+        file_id = f"file_{rng.randrange(num_files)}"
+        if file_id not in written or rng.random() < 0.2:
+            operation_type = "write"
+            written.add(file_id)
+        elif rng.random() < 0.1:
+            operation_type = "delete"
+            written.discard(file_id)
+        else:
+            operation_type = "read"
+        operations.append({
+            "file_id": file_id,
+            "size": rng.randint(10, 5000),
+            "operation_type": operation_type,
+            "time": round(time, 3),
+            "operation_num": i,
+        })
+    return Trace.from_operations(operations)
+
+def summarize(sim: Simulator) -> tuple:
+    """Results of a simulation to compare."""
+    metrics = sim.metrics_calculator
+    system = sim.storage_system
+    return (
+        metrics.calculate_total_cost(),
+        metrics.calculate_total_read_response_time(),
+        metrics.calculate_estimated_system_response(),
+        metrics.optimization_function(),
+        system.get_num_successful_write(),
+        system.get_num_successful_read(),
+        system.get_num_unsuccessful_read(),
+        [(node.num_reads, node.num_writes, node.num_deletes, node.total_cost) for node in system.get_all_nodes()],
+        sim.engine_stats,
+    )
+
+def run_interrupted_and_resumed(trace: Trace, checkpoint_path: str) -> tuple:
+    """Crash a seeded run after CRASH_AFTER operations and resume it from its latest checkpoint."""
+    random.seed(5)
+    np.random.seed(5)
+    sim = CrashingSimulator(trace=trace, crash_after=CRASH_AFTER)
+    sim.checkpoint_path = checkpoint_path
+    try:
+        sim.execute_access_pattern(LoadBalancingGreedy(sim.storage_system))
+        raise AssertionError("The simulation did not crash")
+    except SimulatedCrash:
+        pass
+    assert os.path.exists(checkpoint_path)
+
+    # The restored state replaces these generator states
+    random.seed(99)
+    np.random.seed(99)
+    resumed = Simulator(trace=trace)
+    resumed.resume_from_checkpoint(checkpoint_path)
+    return summarize(resumed)
+
+def test_resume_matches_uninterrupted_run():
+    """A run resumed from a checkpoint ends with the results of an uninterrupted run."""
+    trace = create_trace()
+    config = {name: SIM_CONFIG.get(name) for name in ("engine", "checkpoint_interval_ops")}
+    try:
+        for engine in ("sequential", "event"):
+            print(f"=== Testing checkpoint resume with the {engine} engine ===")
+            SIM_CONFIG["engine"] = engine
+            SIM_CONFIG["checkpoint_interval_ops"] = None
+            random.seed(5)
+            np.random.seed(5)
+            sim = Simulator(trace=trace)
+            sim.execute_access_pattern(LoadBalancingGreedy(sim.storage_system))
+            expected = summarize(sim)
+
+            SIM_CONFIG["checkpoint_interval_ops"] = CHECKPOINT_INTERVAL
+            with tempfile.TemporaryDirectory(prefix="checkpoint-") as checkpoint_dir:
+                resumed = run_interrupted_and_resumed(trace, os.path.join(checkpoint_dir, "checkpoint.bin"))
+            print(f"Uninterrupted: {expected[:4]}\nResumed:       {resumed[:4]}")
+            assert resumed == expected
+    finally:
+        SIM_CONFIG.update(config)
+
+if __name__ == "__main__":
+    test_resume_matches_uninterrupted_run()
+    print("\nAll checkpoint tests passed.")
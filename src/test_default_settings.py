@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script checking that the default storage settings reproduce the results of the storage
+system before the service queues, quorums, replica selectors, read cache, write-back buffer
+and redundancy schemes were added.
+
+A seeded mix of writes, overwrites, reads and deletes is run on the default system and its
+counters are compared with BASELINE, the counters the same workload gave originally.
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG
+from Storage.storage_types import StorageNodeType, DataObject
+
+NUM_FILES = 300
+NUM_OPERATIONS = 4000
+
+# Counters of the workload before the new settings existed
+BASELINE = {
+    "successful_writes": 983,
+    "successful_reads": 2844,
+    "unsuccessful_reads": 0,
+    "num_files": 300,
+    "num_replicas": 849,
+    "used_storage": {"FAST": 700584, "MEDIUM": 708117, "SLOW": 758247},
+    # Reads, writes, deletes and unavailabilities of the nodes of each tier
+    "tier_requests": {"FAST": [944, 924, 150, 20], "MEDIUM": [977, 990, 156, 109], "SLOW": [923, 1035, 213, 222]},
+    "tier_costs": {"FAST": 0.0008846, "MEDIUM": 0.0003113, "SLOW": 5.164e-05},
+    "read_response_time": 3320716.5961344377,
+    "write_response_time": 3557183.8143691644,
+    "delete_response_time": 657229.6429562701,
+}
+
+def run_workload(config: dict = None, seed: int = 7) -> dict:
+    """Run the seeded workload on a storage system and return its counters, `config` overrides HIERARCHICAL_STORAGE_CONFIG."""
+    random.seed(seed)
+    np.random.seed(seed)
+    system = HierarchicalStorageSystem({**HIERARCHICAL_STORAGE_CONFIG, **(config or {})})
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    node_types = list(StorageNodeType)
+    rng = random.Random(seed)
+
+    for i in range(NUM_OPERATIONS):
+        data_id = f"file_{rng.randrange(NUM_FILES):03d}"
+        operation = rng.random()
+        try:
+            if operation < 0.15 or not system.has_data(data_id):
+                data = DataObject(id=data_id, size=rng.randint(1, 5000))
+                system.write_to_node(node_types[int(data_id[5:]) % len(node_types)], data, i)
+            elif operation < 0.95:
+                system.read_data(data_id, i)
+            else:
+                system.delete_data(data_id, i)
+        except Exception:
+            # Failed operations are part of the model
+            continue
+
+    return {
+        "successful_writes": system.get_num_successful_write(),
+        "successful_reads": system.get_num_successful_read(),
+        "unsuccessful_reads": system.get_num_unsuccessful_read(),
+        "num_files": system.get_num_files(),
+        "num_replicas": system.get_num_replicas(),
+        "used_storage": {node_type.name: system.get_used_storage_size(node_type) for node_type in node_types},
+        "tier_requests": {
+            node_type.name: [
+                sum(getattr(node, counter) for node in system.get_nodes(node_type))
+                for counter in ("num_reads", "num_writes", "num_deletes", "num_unavailable")
+            ]
+            for node_type in node_types
+        },
+        "tier_costs": {
+            node_type.name: sum(node.total_cost for node in system.get_nodes(node_type)) for node_type in node_types
+        },
+        "read_response_time": system.get_total_read_response_time(),
+        "write_response_time": system.get_total_write_response_time(),
+        "delete_response_time": system.get_total_delete_response_time(),
+    }
+
+def assert_matches_baseline(counters: dict):
+    """Compare counters with BASELINE, the floating-point totals to rounding."""
+    for name, expected in BASELINE.items():
+        value = counters[name]
+        if isinstance(expected, float):
+            assert math.isclose(value, expected, rel_tol=1e-12), f"{name}: {value} != {expected}"
+        elif name == "tier_costs":
+            for tier, cost in expected.items():
+                assert math.isclose(value[tier], cost, rel_tol=1e-9), f"{name} {tier}: {value[tier]} != {cost}"
+        else:
+            assert value == expected, f"{name}: {value} != {expected}"
+
+def test_defaults_match_baseline():
+    """The default settings give the original counters."""
+    print("=== Testing default settings against the baseline counters ===")
+    counters = run_workload()
+    print(f"Writes: {counters['successful_writes']}, reads: {counters['successful_reads']}, "
+          f"replicas: {counters['num_replicas']}")
+    assert_matches_baseline(counters)
+
+if __name__ == "__main__":
+    test_defaults_match_baseline()
+    print("\nAll default settings tests passed.")
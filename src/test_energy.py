@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for the energy of the storage media over simulated time.
+
+The idle energy is integrated from the first operation, so shifting every timestamp of an
+access pattern (e.g. to epoch milliseconds) must not change the energy.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.storage_types import StorageNodeType, DataObject
+
+EPOCH_MS = 1_700_000_000_000
+
+def run_writes(start_time: float, num_files: int = 200, seed: int = 6):
+    """Write `num_files` files 50 ms apart from `start_time`, return the energy of each node."""
+    random.seed(seed)
+    np.random.seed(seed)
+    system = HierarchicalStorageSystem()
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    node_types = list(StorageNodeType)
+    for i in range(num_files):
+        system.tick(start_time + 50 * i)
+        try:
+            system.write_to_node(node_types[i % len(node_types)], DataObject(id=f"file_{i}", size=100), i)
+        except Exception:
+            continue
+    return {node.name: node.get_energy() for node in system.get_all_nodes()}, system.clock.elapsed()
+
+def test_energy_independent_of_start_time():
+    """The same operations use the same energy from t=0 and from an epoch timestamp."""
+    print("=== Testing energy with absolute timestamps ===")
+    energy, span = run_writes(0)
+    epoch_energy, epoch_span = run_writes(EPOCH_MS)
+    print(f"Span: {span} ms from 0, {epoch_span} ms from epoch, total energy {sum(energy.values()):.3f} J "
+          f"from 0, {sum(epoch_energy.values()):.3f} J from epoch")
+    assert span == epoch_span == 50 * 199
+    assert energy.keys() == epoch_energy.keys()
+    for name, value in energy.items():
+        assert np.isclose(value, epoch_energy[name], rtol=1e-12), name
+
+if __name__ == "__main__":
+    test_energy_independent_of_start_time()
+    print("\nAll energy tests passed.")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the incrementally maintained Estimated System Response (ESR).
+
+It runs a seeded mix of writes, overwrites, reads, deletes and hotness changes and checks that
+the ESR maintained by the EstimatedSystemResponseTracker matches:
+- the batch recomputation of MetricsCalculator.calculate_estimated_system_response_batch()
+- the scalar formula over DataObject.get_temperature(), as the ESR was first computed
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.storage_config import ESR_TIER_WEIGHTS
+from Storage.storage_types import StorageNodeType, DataObject
+
+NUM_FILES = 400
+NUM_OPERATIONS = 6000
+
+def run_operations(seed: int = 2):
+    """Create a storage system and run a seeded mix of operations on it."""
+    random.seed(seed)
+    np.random.seed(seed)
+    system = HierarchicalStorageSystem()
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    node_types = list(StorageNodeType)
+    rng = random.Random(seed)
+
+    for i in range(NUM_OPERATIONS):
+        system.advance_time(i)
+        data_id = f"file_{rng.randrange(NUM_FILES):04d}"
+        operation = rng.random()
+        try:
+            if operation < 0.3 or not system.data_manager.has_data(data_id):
+                data = DataObject(id=data_id, size=rng.randint(1, 5000))
+                system.write_to_node(rng.choice(node_types), data, i)
+            elif operation < 0.9:
+                system.read_data(data_id, i)
+            elif operation < 0.97:
+                system.delete_data(data_id, i)
+            else:
+                data_object = system.data_manager.data_objects[data_id]
+                data_object.hotness_level = rng.random()
+                system.data_manager.refresh_data(data_id)
+        except Exception:
+            # Failed operations are part of the model
+            continue
+    return system
+
+def scalar_esr(system) -> float:
+    """ESR from the per-object scalar temperatures of the data stored on each tier."""
+    data_manager = system.data_manager
+    tier_sums = {node_type: [] for node_type in StorageNodeType}
+    for data_id, data_object in data_manager.data_objects.items():
+        if not data_manager.has_data(data_id) or not len(data_manager.get_replica_node_indices(data_id)):
+            continue
+        node_type = data_manager.get_data_tier(data_id)
+        tier_sums[node_type].append(10 * data_object.get_temperature() * data_object.size / 10000)
+    return sum(ESR_TIER_WEIGHTS.get(node_type, 1) * math.fsum(values) for node_type, values in tier_sums.items())
+
+def test_incremental_matches_batch():
+    """The incremental ESR equals the batch and scalar recomputations."""
+    print("=== Testing incremental ESR against batch recomputation ===")
+    system = run_operations()
+    metrics = system.metrics_calculator
+
+    incremental = metrics.calculate_estimated_system_response()
+    batch = metrics.calculate_estimated_system_response_batch()
+    scalar = scalar_esr(system)
+    print(f"Incremental: {incremental:.10f}, batch: {batch:.10f}, scalar: {scalar:.10f}")
+    assert math.isclose(incremental, batch, rel_tol=1e-9)
+    assert math.isclose(incremental, scalar, rel_tol=1e-9)
+
+def test_tier_sums_are_reanchored():
+    """The tier sums do not drift from the exact sums of the tracked contributions."""
+    print("=== Testing ESR tier sums against exact sums ===")
+    tracker = run_operations().data_manager.esr_tracker
+    tier_sums = dict(tracker.tier_sums)
+    tracker.rebuild()
+    for node_type, tier_sum in tier_sums.items():
+        print(f"{node_type.name}: incremental {tier_sum:.10f}, exact {tracker.tier_sums[node_type]:.10f}")
+        assert math.isclose(tier_sum, tracker.tier_sums[node_type], rel_tol=1e-12, abs_tol=1e-9)
+
+if __name__ == "__main__":
+    test_incremental_matches_batch()
+    test_tier_sums_are_reanchored()
+    print("\nAll ESR tracker tests passed.")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the background tier migrations (MigrationEngine).
+
+The nodes and media of the system are always available and never fail, and their media are small,
+so that the tier utilizations, migration sizes and budgets of every round can be worked out by hand.
+The hotness of the files is set directly, their temperature is max(0.505, hotness) with a single
+access (see DataObject.get_temperature()). Every tier has 3 nodes and files 3 replicas, so a file
+of S KB uses S / capacity of its tier and moves 3 × S KB.
+"""
+
+import copy
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.storage_config import (
+    HIERARCHICAL_STORAGE_CONFIG,
+    MIGRATION_CONFIG,
+    STORAGE_NODE_CONFIG,
+    STORAGE_MEDIUM_CONFIG,
+)
+from Storage.storage_types import StorageNodeType, StorageMediumType, DataObject
+
+# Capacity in KB of the medium of every node
+MEDIUM_CAPACITIES = {StorageMediumType.NVMe: 10000, StorageMediumType.SSD: 20000, StorageMediumType.HDD: 100000}
+
+def create_system(migration: dict) -> HierarchicalStorageSystem:
+    """Create a reliable system with small media and the given migration parameters."""
+    node_config = copy.deepcopy(STORAGE_NODE_CONFIG)
+    for parameters in node_config.values():
+        parameters.update(availability=1.0, failure_rate=0.0)
+    medium_config = copy.deepcopy(STORAGE_MEDIUM_CONFIG)
+    for medium_type, parameters in medium_config.items():
+        parameters.update(availability=1.0, error_rate=0.0, capacity=MEDIUM_CAPACITIES[medium_type])
+
+    random.seed(2)
+    np.random.seed(2)
+    config = {**HIERARCHICAL_STORAGE_CONFIG, "migration": {**MIGRATION_CONFIG, "enabled": True, **migration}}
+    system = HierarchicalStorageSystem(config, node_config, medium_config)
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    return system
+
+def write(system: HierarchicalStorageSystem, node_type: StorageNodeType, data_id: str, size: int, hotness: float, timestamp: int):
+    """Write a file and set its hotness, writes make files hot at random."""
+    system.write_to_node(node_type, DataObject(id=data_id, size=size), timestamp)
+    data_object = system.data_manager.data_objects[data_id]
+    data_object.hotness_level = hotness
+    system.data_manager.refresh_data(data_id)
+
+def stats_counts(system: HierarchicalStorageSystem) -> tuple:
+    stats = system.migration_engine.stats
+    return stats.pressure_demotions, stats.demotions, stats.promotions, stats.deferred, stats.blocked
+
+def test_full_fast_tier_and_hot_file():
+    """
+    A full FAST tier is brought back under its low watermark, a hot SLOW file is promoted within
+    the budget, its debt delays the next moves, and it is kept out of FAST above the high watermark.
+    """
+    print("=== Testing migrations with a full FAST tier and a hot SLOW file ===")
+    # 6000 KB per 1000 ms round, no cooling
+    system = create_system({"interval": 1000, "bandwidth": 6, "iops": None, "hotness_decay": 0})
+    # FAST at 5 × 1900 / 10000 = 0.95, above its 0.9 high watermark, f2 is the coldest
+    for i in range(5):
+        write(system, StorageNodeType.FAST, f"f{i}", 1900, 0.7 if i == 2 else 0.8, i)
+    write(system, StorageNodeType.SLOW, "hot", 3500, 1.0, 5)
+    data_manager = system.data_manager
+    assert abs(system.get_utilization(StorageNodeType.FAST) - 0.95) < 1e-12
+    system.tick(0)
+
+    # Round 1, budget 6000: f2 then f0 (the first of the ties) demoted to reach 0.57 <= 0.7, the
+    # second one overdraws the budget to 6000 - 2 × 5700 = -5400, the hot file waits
+    system.tick(1000)
+    print(f"Round 1: {stats_counts(system)}, FAST {system.get_utilization(StorageNodeType.FAST):.2f}")
+    assert stats_counts(system) == (2, 0, 0, 1, 0)
+    assert data_manager.get_data_tier("f2") == data_manager.get_data_tier("f0") == StorageNodeType.MEDIUM
+    assert abs(system.get_utilization(StorageNodeType.FAST) - 0.57) < 1e-12
+
+    # Round 2, budget 600: FAST is under its high watermark, the hot file moves up to MEDIUM (10500 KB)
+    system.tick(2000)
+    assert stats_counts(system) == (2, 0, 1, 1, 0)
+    assert data_manager.get_data_tier("hot") == StorageNodeType.MEDIUM
+
+    # Round 3, budget 600 - 10500 + 6000 = -3900: the debt of round 2 defers the hot file again
+    system.tick(3000)
+    assert stats_counts(system) == (2, 0, 1, 2, 0)
+    assert system.migration_engine._budget_kb == -3900
+
+    # Round 4, budget 2100: FAST would reach 0.57 + 0.35 = 0.92, above its high watermark
+    system.tick(4000)
+    print(f"Round 4: {stats_counts(system)}, stats {system.migration_engine.stats}")
+    assert stats_counts(system) == (2, 0, 1, 2, 1)
+    assert data_manager.get_data_tier("hot") == StorageNodeType.MEDIUM
+    assert system.get_utilization(StorageNodeType.FAST) <= MIGRATION_CONFIG["high_watermark"][StorageNodeType.FAST]
+
+    stats = system.migration_engine.stats
+    assert stats.rounds == 4
+    assert stats.migrated_kb == 2 * 5700 + 10500
+    assert stats.migration_time > 0
+
+def test_idle_files_cool_down():
+    """Files not accessed during a round lose hotness_decay and are demoted once cold."""
+    print("=== Testing the cooling of idle files ===")
+    system = create_system({"interval": 1000, "bandwidth": None, "iops": None, "hotness_decay": 0.1})
+    write(system, StorageNodeType.MEDIUM, "idle", 1000, 0.75, 0)
+    data_manager = system.data_manager
+    system.tick(0)
+
+    # Round 1: 0.75 -> 0.65, still above the 0.6 demote temperature
+    system.tick(1000)
+    assert system.migration_engine.stats.cooled == 1
+    assert data_manager.get_data_tier("idle") == StorageNodeType.MEDIUM
+
+    # A file written during round 2 is not idle
+    system.advance_time(1500)
+    write(system, StorageNodeType.MEDIUM, "new", 1000, 0.75, 1)
+
+    # Round 2: only "idle" cools, to 0.55, and is demoted
+    system.tick(2000)
+    stats = system.migration_engine.stats
+    print(f"Round 2: cooled {stats.cooled}, demotions {stats.demotions}")
+    assert stats.cooled == 2 and stats.demotions == 1
+    assert data_manager.get_data_tier("idle") == StorageNodeType.SLOW
+    assert data_manager.get_data_tier("new") == StorageNodeType.MEDIUM
+    assert abs(data_manager.data_objects["idle"].hotness_level - 0.55) < 1e-12
+
+    # Round 3: both cool, "new" to 0.65 stays, "idle" is on the slowest tier already
+    system.tick(3000)
+    assert stats.cooled == 4 and stats.demotions == 1
+    assert data_manager.get_data_tier("new") == StorageNodeType.MEDIUM
+
+def test_disabled_by_default():
+    """Without "migration" enabled, no round runs and nothing moves."""
+    print("=== Testing the migrations disabled by default ===")
+    assert not MIGRATION_CONFIG["enabled"]
+    system = HierarchicalStorageSystem()
+    system.tick(0)
+    system.tick(10 * MIGRATION_CONFIG["interval"])
+    assert system.migration_engine.stats.rounds == 0
+
+if __name__ == "__main__":
+    test_full_fast_tier_and_hot_file()
+    test_idle_files_cool_down()
+    test_disabled_by_default()
+    print("\nAll migration tests passed.")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the write and read quorums of the DataManager.
+
+Replicas are written and read in parallel, so the client waits for the W-th (R-th) fastest
+replica. On nodes and media that are always available and never fail, every replica takes one
+attempt and its latency is the response time recorded by its node, so the client response times
+can be checked exactly against the replica latencies.
+"""
+
+import copy
+import math
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG, STORAGE_NODE_CONFIG, STORAGE_MEDIUM_CONFIG
+from Storage.storage_types import StorageNodeType, DataObject, RequestType
+
+def create_reliable_system(config: dict) -> HierarchicalStorageSystem:
+    """Create a system whose nodes and media are always available and never fail."""
+    node_config = copy.deepcopy(STORAGE_NODE_CONFIG)
+    for parameters in node_config.values():
+        parameters.update(availability=1.0, failure_rate=0.0)
+    medium_config = copy.deepcopy(STORAGE_MEDIUM_CONFIG)
+    for parameters in medium_config.values():
+        parameters.update(availability=1.0, error_rate=0.0)
+
+    random.seed(11)
+    np.random.seed(11)
+    system = HierarchicalStorageSystem({**HIERARCHICAL_STORAGE_CONFIG, **config}, node_config, medium_config)
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    return system
+
+def node_response_times(system: HierarchicalStorageSystem, node_type: StorageNodeType, request_type: RequestType) -> list:
+    """Total response time of every node of a tier for a request type."""
+    attribute = f"total_{request_type.name.lower()}_response_time"
+    return [getattr(node, attribute) for node in system.get_nodes(node_type)]
+
+def replica_latencies(before: list, after: list) -> list:
+    """Latencies of the replicas of one request, from the node totals before and after it, fastest first."""
+    return sorted(end - start for start, end in zip(before, after) if end != start)
+
+def test_write_acknowledged_after_w_replicas():
+    """A write is acknowledged when the W-th fastest replica is written, all N replicas are written."""
+    print("=== Testing the write quorum ===")
+    for write_quorum in (1, 2, 3):
+        system = create_reliable_system({"write_quorum": write_quorum})
+        before = node_response_times(system, StorageNodeType.MEDIUM, RequestType.WRITE)
+        client_time = system.write_to_node(StorageNodeType.MEDIUM, DataObject(id="file", size=2000), 0)
+        latencies = replica_latencies(before, node_response_times(system, StorageNodeType.MEDIUM, RequestType.WRITE))
+        print(f"W={write_quorum}: replicas {[round(latency, 3) for latency in latencies]}, client {client_time:.3f} ms")
+        assert len(latencies) == 3
+        assert math.isclose(client_time, latencies[write_quorum - 1])
+
+def test_read_waits_for_r_replicas():
+    """A read returns when the R-th fastest of the R replicas it reads answers."""
+    print("=== Testing the read quorum ===")
+    for read_quorum in (1, 2, 3):
+        system = create_reliable_system({"read_quorum": read_quorum})
+        system.write_to_node(StorageNodeType.SLOW, DataObject(id="file", size=2000), 0)
+        before = node_response_times(system, StorageNodeType.SLOW, RequestType.READ)
+        client_time = system.read_data("file", 1)
+        latencies = replica_latencies(before, node_response_times(system, StorageNodeType.SLOW, RequestType.READ))
+        print(f"R={read_quorum}: replicas {[round(latency, 3) for latency in latencies]}, client {client_time:.3f} ms")
+        assert len(latencies) == read_quorum
+        assert math.isclose(client_time, latencies[-1])
+        histogram = system.data_manager.client_response_time_histograms[RequestType.READ]
+        assert histogram.total_count == 1 and math.isclose(histogram.total, client_time)
+
+def test_write_quorum_defaults_to_all_replicas():
+    """The default write quorum waits for all N replicas, whatever N is."""
+    print("=== Testing the default write quorum ===")
+    assert HIERARCHICAL_STORAGE_CONFIG["write_quorum"] is None
+    for num_replicas in (1, 2, 3):
+        system = create_reliable_system({"num_data_replica": num_replicas})
+        before = node_response_times(system, StorageNodeType.FAST, RequestType.WRITE)
+        client_time = system.write_to_node(StorageNodeType.FAST, DataObject(id="file", size=2000), 0)
+        latencies = replica_latencies(before, node_response_times(system, StorageNodeType.FAST, RequestType.WRITE))
+        assert len(latencies) == num_replicas
+        assert math.isclose(client_time, latencies[-1])
+
+def test_quorums_are_validated():
+    """Quorums outside [1, N] are rejected."""
+    print("=== Testing quorum validation ===")
+    for quorums in ({"write_quorum": 0}, {"write_quorum": 4}, {"read_quorum": 0}, {"read_quorum": 4}):
+        try:
+            HierarchicalStorageSystem({**HIERARCHICAL_STORAGE_CONFIG, **quorums})
+        except ValueError:
+            continue
+        raise AssertionError(f"{quorums} accepted with {HIERARCHICAL_STORAGE_CONFIG['num_data_replica']} replicas")
+
+if __name__ == "__main__":
+    test_write_acknowledged_after_w_replicas()
+    test_read_waits_for_r_replicas()
+    test_write_quorum_defaults_to_all_replicas()
+    test_quorums_are_validated()
+    print("\nAll quorum tests passed.")
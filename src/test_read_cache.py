@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test script for the read cache (ReadCache) and its eviction policies (CachePolicy).
+
+Every policy is run on an access sequence of entries of 1 KB whose hits, misses and evictions
+were worked out by hand, including the adaptation of ARC to its ghost lists and the promotion of
+S3-FIFO entries to its main queue. On a system whose nodes never fail, the read cache is checked
+to serve hits, and to give the KB of the copies it evicts or invalidates back to the FAST media.
+"""
+
+import copy
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.CachePolicy import (
+    CACHE_POLICIES,
+    LruCachePolicy,
+    LfuCachePolicy,
+    ArcCachePolicy,
+    S3FifoCachePolicy,
+    create_cache_policy,
+)
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG, READ_CACHE_CONFIG, STORAGE_NODE_CONFIG, STORAGE_MEDIUM_CONFIG
+from Storage.storage_types import StorageNodeType, StorageMediumType, DataObject
+
+def run_sequence(policy, keys: str) -> tuple:
+    """Look up every key, admitting it on a miss. Returns the hits and the evicted keys of every admission."""
+    hits = 0
+    evictions = []
+    for key in keys.split():
+        if policy.access(key):
+            hits += 1
+        else:
+            evictions.append(policy.admit(key, 1))
+    return hits, evictions
+
+def test_lru():
+    """The least recently used entry is evicted, a hit refreshes an entry."""
+    print("=== Testing LRU ===")
+    policy = LruCachePolicy(3)
+    # a is hit once, then evicted as the least recently used by d, a and b miss again
+    hits, evictions = run_sequence(policy, "a a b c d a b")
+    print(f"Hits {hits}, evictions {evictions}")
+    assert hits == 1
+    assert evictions == [[], [], [], ["a"], ["b"], ["c"]]
+    assert [key in policy for key in "abcd"] == [True, True, False, True]
+    assert policy.used == 3 and len(policy) == 3
+
+def test_lfu():
+    """The least frequently used entry is evicted, the least recently used one among equals."""
+    print("=== Testing LFU ===")
+    policy = LfuCachePolicy(3)
+    # a is accessed twice and stays, b then c are evicted with a single access each
+    hits, evictions = run_sequence(policy, "a a b c d a b")
+    print(f"Hits {hits}, evictions {evictions}")
+    assert hits == 2
+    assert evictions == [[], [], [], ["b"], ["c"]]
+    assert [key in policy for key in "abcd"] == [True, True, False, True]
+    assert policy.used == 3
+
+def test_arc_adapts_to_ghost_hits():
+    """A hit in the ghost list of T1 grows the target of T1, a hit in the ghost list of T2 shrinks it."""
+    print("=== Testing ARC ===")
+    policy = ArcCachePolicy(3)
+    # T1 [b], T2 [a] after the hit of a, then d evicts b from T1 to its ghost list B1
+    assert run_sequence(policy, "a b a c d") == (1, [[], [], [], ["b"]])
+    assert policy.target_recent == 0
+    # b is a ghost of T1: the target grows by 1 KB, c leaves T1 for B1 and b joins a in T2
+    assert policy.admit("b", 1) == ["c"]
+    assert policy.target_recent == 1
+    # T1 [d] is at its target, e evicts a from T2 to its ghost list B2
+    assert policy.admit("e", 1) == ["a"]
+    # a is a ghost of T2: the target shrinks by 1 KB, T1 above it loses d
+    assert policy.admit("a", 1) == ["d"]
+    assert policy.target_recent == 0
+    assert [key in policy for key in "abcde"] == [True, True, False, False, True]
+    # a and b are in T2, a hit on e moves it there too
+    assert policy.access("e") and policy.used == 3
+
+    # Invalidating data drops its ghost, c admitted again is new data and does not adapt the target.
+    # T1 is empty, the least recently used entry of T2 is evicted.
+    policy.remove("c")
+    assert policy.admit("c", 1) == ["b"] and policy.target_recent == 0
+
+def test_s3fifo_promotes_accessed_entries():
+    """Entries hit in the small queue move to the main queue, one-hit entries leave as ghosts."""
+    print("=== Testing S3-FIFO ===")
+    policy = S3FifoCachePolicy(5, small_fraction=0.4)
+    # f needs room: a was hit in the small queue and moves to the main queue, b is evicted
+    hits, evictions = run_sequence(policy, "a b a c d e f")
+    print(f"Hits {hits}, evictions {evictions}")
+    assert hits == 1
+    assert evictions == [[], [], [], [], [], ["b"]]
+    # b is a ghost, admitted again it goes to the main queue and c leaves the small queue
+    assert policy.admit("b", 1) == ["c"]
+    # A scan of new entries only goes through the small queue, a and b stay
+    hits, evictions = run_sequence(policy, "g h i")
+    assert hits == 0 and evictions == [["d"], ["e"], ["f"]]
+    assert all(key in policy for key in "abghi")
+
+    # Entries of the main queue accessed since their last pass are reinserted instead of evicted.
+    # With a small queue of 1 KB, d moves a to the main queue and evicts b.
+    policy = S3FifoCachePolicy(3, small_fraction=1 / 3)
+    assert run_sequence(policy, "a a b c d") == (1, [[], [], [], ["b"]])
+    assert policy.access("a")
+    # The ghost b goes to the main queue with a, c leaves the small queue
+    assert policy.admit("b", 1) == ["c"]
+    # The small queue holds d only, the main queue evicts: a is reinserted, b is not
+    assert policy.admit("e", 1) == ["b"] and "a" in policy
+
+def test_hit_ratios():
+    """The hit ratios of the policies on a frequent key followed by a scan longer than the cache."""
+    print("=== Testing hit ratios ===")
+    keys = "x x x s1 s2 s3 x"
+    ratios = {name: run_sequence(create_cache_policy(name, 3), keys)[0] / 7 for name in CACHE_POLICIES}
+    print(f"Hit ratios: {ratios}")
+    # s3 evicts x from LRU only: LFU evicts s1, ARC keeps x in T2, S3-FIFO moved x to its main queue
+    assert ratios == {"lru": 2 / 7, "lfu": 3 / 7, "arc": 3 / 7, "s3fifo": 3 / 7}
+    try:
+        create_cache_policy("fifo", 3)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Unknown policy accepted")
+
+def create_cached_system(policy: str) -> HierarchicalStorageSystem:
+    """Create a reliable system with a read cache of 1000 KB per FAST medium."""
+    node_config = copy.deepcopy(STORAGE_NODE_CONFIG)
+    for parameters in node_config.values():
+        parameters.update(availability=1.0, failure_rate=0.0)
+    medium_config = copy.deepcopy(STORAGE_MEDIUM_CONFIG)
+    for parameters in medium_config.values():
+        parameters.update(availability=1.0, error_rate=0.0)
+    medium_config[StorageMediumType.NVMe]["capacity"] = 10000
+
+    random.seed(4)
+    np.random.seed(4)
+    config = {**HIERARCHICAL_STORAGE_CONFIG, "read_cache": {"enabled": True, "policy": policy, "capacity_fraction": 0.1}}
+    system = HierarchicalStorageSystem(config, node_config, medium_config)
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    return system
+
+def test_cache_space_returned_to_fast_media():
+    """The copies evicted or invalidated give their KB back to the cache slice of their FAST medium."""
+    print("=== Testing the cache slice of the FAST media ===")
+    for name in CACHE_POLICIES:
+        system = create_cached_system(name)
+        cache = system.data_manager.read_cache
+        # 1000 KB of the 10000 KB of every FAST medium are reserved for its shard
+        for _, medium, policy in cache.shards:
+            assert medium.cache_capacity == 1000 and medium.capacity == 9000 and policy.capacity == 1000
+        # Four files of 400 KB on SLOW cached by the same shard
+        _, medium, policy = cache._shard("file_0")
+        data_ids = [data_id for data_id in (f"file_{i}" for i in range(100)) if cache._shard(data_id)[1] is medium][:4]
+        for i, data_id in enumerate(data_ids):
+            system.write_to_node(StorageNodeType.SLOW, DataObject(id=data_id, size=400), i)
+
+        first, second, third, fourth = data_ids
+        system.read_data(first, 10)
+        system.read_data(second, 11)
+        assert medium.cache_used == 800 == policy.used
+        system.read_data(first, 12)
+        assert cache.stats.hits == 1 and cache.stats.fills == 2
+        # Two copies fit in 1000 KB, the third evicts the one not hit with every policy
+        system.read_data(third, 13)
+        assert cache.stats.evictions == 1 and medium.cache_used == 800 == policy.used
+        assert second not in policy and first in policy and third in policy
+
+        # Rewriting or deleting data drops its copy
+        system.write_to_node(StorageNodeType.SLOW, DataObject(id=first, size=400), 14)
+        assert cache.stats.invalidations == 1 and medium.cache_used == 400 == policy.used
+        system.delete_data(third, 15)
+        assert cache.stats.invalidations == 2 and medium.cache_used == 0 == policy.used
+        # A read of data not cached is a miss, not an invalidation
+        system.read_data(fourth, 16)
+        print(f"{name}: {cache.stats}")
+        assert cache.stats.misses == 4 and medium.cache_used == 400
+        assert cache.stats.hit_ratio() == 1 / 5
+        # Data migrated to the FAST tier is no longer cached
+        assert system.data_manager.migrate(fourth, StorageNodeType.FAST) is not None
+        assert cache.stats.invalidations == 3 and medium.cache_used == 0 == policy.used
+
+def test_disabled_by_default():
+    """The read cache is off by default and reserves no FAST capacity."""
+    print("=== Testing the read cache disabled by default ===")
+    assert not READ_CACHE_CONFIG["enabled"]
+    system = HierarchicalStorageSystem()
+    assert system.data_manager.read_cache is None
+    assert all(medium.cache_capacity == 0 for node in system.get_all_nodes() for medium in node.storage_media)
+
+if __name__ == "__main__":
+    test_lru()
+    test_lfu()
+    test_arc_adapts_to_ghost_hits()
+    test_s3fifo_promotes_accessed_entries()
+    test_hit_ratios()
+    test_cache_space_returned_to_fast_media()
+    test_disabled_by_default()
+    print("\nAll read cache tests passed.")
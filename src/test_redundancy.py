@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the redundancy schemes of the tiers (RedundancyScheme).
+
+On a system whose nodes never fail, the SLOW tier stores its data with a 2+1 erasure code that
+fits its 3 nodes. The fragments, the capacity they take, the encode time, the fragments read and
+the degraded and unreadable reads are checked against values worked out by hand.
+"""
+
+import math
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator, ReplicationScheme, ErasureCodingScheme
+from Storage.RandomStream import GLOBAL_RANDOM
+from Storage.RedundancyScheme import create_redundancy_scheme
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG
+from Storage.storage_types import StorageNodeType, DataObject, OperationOutcome, RequestType
+from test_default_settings import run_workload, assert_matches_baseline
+from test_quorums import create_reliable_system, node_response_times, replica_latencies
+
+ERASURE_2_1 = {"name": "erasure", "k": 2, "m": 1}
+
+def test_defaults_to_replication():
+    """Every tier replicates num_data_replica times by default."""
+    print("=== Testing the default redundancy ===")
+    assert HIERARCHICAL_STORAGE_CONFIG["redundancy"] is None
+    for config in (None, "replication", {"name": "replication"}):
+        assert create_redundancy_scheme(config, 3) == ReplicationScheme(3)
+    system = HierarchicalStorageSystem()
+    assert all(scheme == ReplicationScheme(3) for scheme in system.data_manager.redundancy.values())
+    for redundancy in ("replication", {"name": "replication"}):
+        assert_matches_baseline(run_workload({"redundancy": redundancy}))
+
+def test_erasure_needs_k_and_m():
+    """An erasure code needs its k and m, k+m fragments must fit the nodes of the tier."""
+    print("=== Testing the erasure code parameters ===")
+    for config in ("erasure", {"name": "erasure"}, {"name": "erasure", "k": 2}):
+        try:
+            create_redundancy_scheme(config, 3)
+        except ValueError:
+            continue
+        raise AssertionError(f"{config} accepted")
+    assert create_redundancy_scheme(ERASURE_2_1, 3) == ErasureCodingScheme(2, 1)
+
+    # 4+2 needs 6 nodes, the default tiers have 3
+    try:
+        HierarchicalStorageSystem({**HIERARCHICAL_STORAGE_CONFIG, "redundancy": {"name": "erasure", "k": 4, "m": 2}})
+    except ValueError as error:
+        print(f"4+2: {error}")
+    else:
+        raise AssertionError("4+2 erasure coding accepted on 3 nodes")
+    HierarchicalStorageSystem({**HIERARCHICAL_STORAGE_CONFIG, "num_slow_nodes": 6, "redundancy": {StorageNodeType.SLOW: {"name": "erasure", "k": 4, "m": 2}}})
+
+def test_fragments_of_erasure_coded_tier():
+    """2+1 fragments of ceil(size / 2) KB on the 3 SLOW nodes, reads gather 2 of them."""
+    print("=== Testing a 2+1 erasure-coded tier ===")
+    system = create_reliable_system({"redundancy": {StorageNodeType.SLOW: ERASURE_2_1}})
+    metrics_calculator = MetricsCalculator(system)
+    system.initialize_metrics_calculator(metrics_calculator)
+    data_manager = system.data_manager
+    for i, node_type in enumerate(StorageNodeType):
+        system.write_to_node(node_type, DataObject(id=f"file_{i}", size=1201), i)
+
+    # 1.5 times the size of the data instead of 3 times, rounded up to whole fragments of 601 KB
+    assert [node.get_used_capacity() for node in system.get_nodes(StorageNodeType.SLOW)] == [601] * 3
+    assert data_manager.get_stored_size("file_2") == 1803
+    overheads = {StorageNodeType.FAST: 3 * 1201, StorageNodeType.MEDIUM: 3 * 1201, StorageNodeType.SLOW: 1803}
+    for node_type, tier_info in metrics_calculator.get_tiers_capacities_info_with_data_objects().items():
+        print(f"{node_type.name}: replicas sizes {tier_info['replicas_sizes']}")
+        assert tier_info["replicas_sizes"] == [overheads[node_type]]
+    # Only the erasure-coded write encodes, 1201 KB at 1000 KB/ms
+    stats = data_manager.redundancy_stats
+    assert stats.encodes == 1 and math.isclose(stats.encode_time, 1.201)
+
+    # A read waits for the slower of the 2 fragments it gathers, nothing is decoded
+    before = node_response_times(system, StorageNodeType.SLOW, RequestType.READ)
+    client_time = system.read_data("file_2", 3)
+    latencies = replica_latencies(before, node_response_times(system, StorageNodeType.SLOW, RequestType.READ))
+    assert len(latencies) == 2 and math.isclose(client_time, latencies[-1])
+    assert stats.degraded_reads == 0
+
+def test_degraded_and_unreadable_reads():
+    """A fragment read in place of an unavailable one is decoded, fewer than k fragments are unreadable."""
+    print("=== Testing degraded and unreadable reads ===")
+    system = create_reliable_system({"redundancy": {StorageNodeType.SLOW: ERASURE_2_1}})
+    data_manager = system.data_manager
+    system.write_to_node(StorageNodeType.SLOW, DataObject(id="file", size=1000), 0)
+    stats = data_manager.redundancy_stats
+
+    # A node that is never available: the reads choosing it read the third fragment instead
+    unavailable = system.get_nodes(StorageNodeType.SLOW)[0]
+    unavailable.availability = 0.0
+    for i in range(20):
+        system.read_data("file", i + 1)
+    print(f"Unavailable attempts {unavailable.num_unavailable}, {stats}")
+    # A read is degraded once however many of its attempts found the node unavailable
+    assert 0 < stats.degraded_reads <= unavailable.num_unavailable
+    # 1000 KB decoded at 500 KB/ms per degraded read
+    assert math.isclose(stats.decode_time, 2 * stats.degraded_reads)
+
+    # With 1 fragment left of the 2 needed, the data cannot be rebuilt
+    for node in system.get_nodes(StorageNodeType.SLOW)[:2]:
+        system.delete_node(node.id)
+    assert data_manager.try_read("file", 21, GLOBAL_RANDOM) == (OperationOutcome.FAILURE, 0)
+    assert stats.unreadable == 1
+
+if __name__ == "__main__":
+    test_defaults_to_replication()
+    test_erasure_needs_k_and_m()
+    test_fragments_of_erasure_coded_tier()
+    test_degraded_and_unreadable_reads()
+    print("\nAll redundancy tests passed.")
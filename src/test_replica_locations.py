@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the replica location matrix of the DataManager.
+
+It writes more distinct files than the matrix initially has rows (INITIAL_DATA_ROWS), so the
+matrix has to grow, and checks that:
+- every acknowledged write is counted and located, none is lost while the matrix grows
+- the matrix lists exactly the nodes whose media store the data, as a dict of node sets did
+- the replica counts per tier stay available after a node holding replicas is deleted
+- the tier of data is that of its replicas on existing nodes, the data of a deleted tier has none
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.HierarchicalStorage.DataManager import INITIAL_DATA_ROWS
+from Storage.RandomStream import GLOBAL_RANDOM
+from Storage.storage_types import StorageNodeType, DataObject, OperationOutcome
+from Storage.exceptions import (
+    StorageMediumUnavailableException,
+    StorageMediumFailureException,
+    StorageNodeUnavailableException,
+    StorageNodeFailureException,
+    InsufficientCapacityException,
+    DataAlreadyExistsException,
+)
+
+STORAGE_EXCEPTIONS = (
+    StorageMediumUnavailableException,
+    StorageMediumFailureException,
+    StorageNodeUnavailableException,
+    StorageNodeFailureException,
+    InsufficientCapacityException,
+    DataAlreadyExistsException,
+)
+NUM_FILES = 3 * INITIAL_DATA_ROWS
+
+def create_system(num_files: int = NUM_FILES, seed: int = 1):
+    """Create a storage system and write `num_files` distinct files over the tiers, return it and the acknowledged IDs."""
+    random.seed(seed)
+    np.random.seed(seed)
+    system = HierarchicalStorageSystem()
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    node_types = list(StorageNodeType)
+
+    acknowledged = []
+    for i in range(num_files):
+        system.advance_time(i)
+        data = DataObject(id=f"file_{i:05d}", size=random.randint(1, 100))
+        try:
+            system.write_to_node(node_types[i % len(node_types)], data, i)
+        except STORAGE_EXCEPTIONS:
+            # Failed writes are part of the model, any other exception fails the test
+            continue
+        acknowledged.append(data.id)
+    return system, acknowledged
+
+def stored_replica_nodes(system):
+    """Build the dict of node ID sets of every data from what the storage media actually store."""
+    replica_nodes = {}
+    for node in system.node_manager.get_all_nodes():
+        for medium in node.storage_media:
+            for data_id in medium.data_objects:
+                replica_nodes.setdefault(data_id, set()).add(node.id)
+    return replica_nodes
+
+def test_matrix_growth():
+    """Every acknowledged write past the initial rows of the matrix is counted and located."""
+    print("=== Testing replica location matrix growth ===")
+    system, acknowledged = create_system()
+    data_manager = system.data_manager
+
+    print(f"Writes: {NUM_FILES}, acknowledged: {len(acknowledged)}, successful: {system.get_num_successful_write()}")
+    assert len(acknowledged) > INITIAL_DATA_ROWS
+    assert system.get_num_successful_write() == len(acknowledged)
+    assert len(data_manager.replica_locations) >= len(data_manager.data_ids)
+    for data_id in acknowledged:
+        assert len(data_manager.get_replica_node_indices(data_id)) > 0, f"{data_id} has no replicas"
+
+def test_matrix_matches_stored_replicas():
+    """The matrix holds the same replica locations as the media contents."""
+    print("=== Testing replica location matrix against stored replicas ===")
+    system, _ = create_system()
+    data_manager = system.data_manager
+    expected = stored_replica_nodes(system)
+
+    located = {
+        data_id: {node.id for node in data_manager.get_replica_nodes(data_id)}
+        for data_id in data_manager.data_ids
+        if len(data_manager.get_replica_node_indices(data_id))
+    }
+    print(f"Data located: {len(located)}, data stored: {len(expected)}")
+    assert located == expected
+    assert data_manager.get_num_replicas() == sum(len(nodes) for nodes in expected.values())
+
+def test_tier_replica_counts_after_node_deletion():
+    """Replicas on a deleted node are no longer counted in their tier."""
+    print("=== Testing tier replica counts after a node deletion ===")
+    system, _ = create_system()
+    data_manager = system.data_manager
+    counts = data_manager.get_tier_replica_counts()
+
+    node = max(system.node_manager.get_nodes(StorageNodeType.MEDIUM), key=lambda node: node.num_writes)
+    num_stored = sum(len(medium.data_objects) for medium in node.storage_media)
+    assert num_stored > 0
+    system.delete_node(node.id)
+
+    counts_after = data_manager.get_tier_replica_counts()
+    print(f"Before: {counts}, after deleting a node with {num_stored} replicas: {counts_after}")
+    assert counts_after[StorageNodeType.MEDIUM] == counts[StorageNodeType.MEDIUM] - num_stored
+    assert counts_after[StorageNodeType.FAST] == counts[StorageNodeType.FAST]
+    assert counts_after[StorageNodeType.SLOW] == counts[StorageNodeType.SLOW]
+
+def test_data_tiers_after_node_deletion():
+    """Deleted nodes (tier code -1) never resolve to a tier, their replicas are skipped."""
+    print("=== Testing data tiers after node deletions ===")
+    system, acknowledged = create_system()
+    data_manager = system.data_manager
+    medium_code = system.node_manager.get_tier_code(StorageNodeType.MEDIUM)
+    tier_codes = data_manager.get_rows_tier_codes()
+    medium_ids = [data_id for data_id in acknowledged if tier_codes[data_manager.data_index[data_id]] == medium_code]
+    assert medium_ids
+
+    # The data keeps its tier and stays readable from its other replicas
+    system.delete_node(system.node_manager.get_nodes(StorageNodeType.MEDIUM)[0].id)
+    assert (data_manager.get_rows_tier_codes() == tier_codes).all()
+    for data_id in medium_ids:
+        outcome, _ = data_manager.try_read(data_id, NUM_FILES, GLOBAL_RANDOM)
+        assert outcome != OperationOutcome.NOT_FOUND
+
+    # The data of a tier without nodes is not stored anywhere, not on the SLOW tier (tier_types[-1])
+    for node in list(system.node_manager.get_nodes(StorageNodeType.MEDIUM)):
+        system.delete_node(node.id)
+    slow_sum = data_manager.esr_tracker.tier_sums[StorageNodeType.SLOW]
+    for data_id in medium_ids:
+        row = data_manager.data_index[data_id]
+        assert data_manager.get_rows_tier_codes()[row] == -1
+        assert data_manager.try_read(data_id, NUM_FILES, GLOBAL_RANDOM) == (OperationOutcome.NOT_FOUND, 0)
+        data_manager.refresh_data(data_id)
+        assert data_manager.esr_tracker._tiers[row] is None
+    print(f"MEDIUM data: {len(medium_ids)}, SLOW ESR sum {slow_sum} -> {data_manager.esr_tracker.tier_sums[StorageNodeType.SLOW]}")
+    assert data_manager.esr_tracker.tier_sums[StorageNodeType.SLOW] == slow_sum
+
+if __name__ == "__main__":
+    test_matrix_growth()
+    test_matrix_matches_stored_replicas()
+    test_tier_replica_counts_after_node_deletion()
+    test_data_tiers_after_node_deletion()
+    print("\nAll replica location tests passed.")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for the replica selection strategies of the reads (ReplicaSelector).
+
+The selectors are fed reads by hand and their choices checked against the outstanding reads and
+response time averages worked out from them. On a system whose nodes never fail, the reads are
+checked to spread uniformly by default, and a hedged read to return with the first replica to answer.
+"""
+
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem
+from Storage.HierarchicalStorage.ReplicaSelector import (
+    ReplicaSelector,
+    LeastOutstandingReplicaSelector,
+    EwmaReplicaSelector,
+    PowerOfTwoReplicaSelector,
+    HedgedReplicaSelector,
+    create_replica_selector,
+)
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG
+from Storage.storage_types import StorageNodeType, DataObject, RequestType
+from test_quorums import create_reliable_system, node_response_times, replica_latencies
+
+NUM_SELECTIONS = 6000
+
+def selection_frequencies(selector: ReplicaSelector, candidates: list, now: float) -> dict:
+    """Frequency of every position over NUM_SELECTIONS seeded selections among all the candidates."""
+    random.seed(5)
+    counts = Counter(selector.select(candidates, len(candidates), now) for _ in range(NUM_SELECTIONS))
+    return {position: counts[position] / NUM_SELECTIONS for position in range(len(candidates))}
+
+def test_uniform_by_default():
+    """The default selector reads every replica with the same probability."""
+    print("=== Testing the default uniform selection ===")
+    assert HIERARCHICAL_STORAGE_CONFIG["replica_selection"] == "uniform"
+    node_manager = HierarchicalStorageSystem().data_manager.node_manager
+    for config in (None, "uniform", {"name": "uniform"}):
+        assert type(create_replica_selector(config, node_manager)) is ReplicaSelector
+
+    frequencies = selection_frequencies(ReplicaSelector(node_manager), [4, 5, 6], 0)
+    print(f"Frequencies: {frequencies}")
+    assert all(abs(frequency - 1 / 3) < 0.03 for frequency in frequencies.values())
+
+    # With R=1, the reads of one file are spread over the three nodes holding its replicas
+    system = create_reliable_system({"read_quorum": 1})
+    system.write_to_node(StorageNodeType.SLOW, DataObject(id="file", size=100), 0)
+    for i in range(900):
+        system.read_data("file", i + 1)
+    reads = [node.num_reads for node in system.get_nodes(StorageNodeType.SLOW)]
+    print(f"Reads per SLOW node: {reads}")
+    assert sum(reads) == 900 and all(abs(num_reads - 300) < 60 for num_reads in reads)
+
+def test_least_outstanding():
+    """Reads go to the replica with the fewest reads in progress, ties are broken at random."""
+    print("=== Testing the least outstanding selection ===")
+    selector = LeastOutstandingReplicaSelector(None)
+    # Node 0 busy from 0 to 10 ms, node 1 from 0 to 5 ms, node 2 from 2 to 4 ms and 2 to 12 ms
+    selector.on_read(0, 0, 10)
+    selector.on_read(1, 0, 5)
+    selector.on_read(2, 2, 2)
+    selector.on_read(2, 2, 10)
+    candidates = [0, 1, 2]
+    assert [selector.outstanding(node_index, 3) for node_index in candidates] == [1, 1, 2]
+    assert set(selection_frequencies(selector, candidates, 3)) == {0, 1, 2}
+    assert selection_frequencies(selector, candidates, 3)[2] == 0
+    # At 6 ms node 1 and the first read of node 2 are done
+    assert selection_frequencies(selector, candidates, 6)[1] == 1
+    # At 11 ms only node 2 is still reading
+    assert selection_frequencies(selector, candidates, 11)[2] == 0
+    # Only the first `remaining` candidates are read
+    assert selector.select([2, 0, 1], 1, 11) == 0
+
+    selector.reset()
+    assert selector.outstanding(2, 3) == 0
+
+def test_ewma():
+    """Reads go to the lowest EWMA × (outstanding reads + 1), nodes not read yet first."""
+    print("=== Testing the EWMA selection ===")
+    selector = EwmaReplicaSelector(None, ewma_alpha=0.5)
+    selector.on_read(0, 0, 10)
+    selector.on_read(1, 0, 12)
+    selector.on_read(1, 20, 20)
+    # 12 + 0.5 × (20 - 12)
+    assert selector.ewma(0) == 10 and selector.ewma(1) == 16 and selector.ewma(2) == 0
+    assert selector.select([0, 1, 2], 3, 50) == 2
+    assert selector.select([0, 1, 2], 2, 50) == 0
+
+    # Two reads in progress on node 0 weigh it 10 × 3 = 30 against 16 for node 1
+    selector.on_read(0, 50, 10)
+    selector.on_read(0, 50, 10)
+    assert selector.ewma(0) == 10
+    assert selector.select([0, 1], 2, 55) == 1
+    assert selector.select([0, 1], 2, 60) == 0
+
+    try:
+        EwmaReplicaSelector(None, ewma_alpha=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ewma_alpha=0 accepted")
+
+def test_power_of_two():
+    """The less loaded of two replicas sampled at random is read, the most loaded replica never is."""
+    print("=== Testing the power of two choices selection ===")
+    selector = PowerOfTwoReplicaSelector(None)
+    # Nodes 0 to 3 with 0 to 3 reads in progress, from 0 to 100 ms
+    for node_index in range(4):
+        for _ in range(node_index):
+            selector.on_read(node_index, 0, 100)
+    frequencies = selection_frequencies(selector, [0, 1, 2, 3], 50)
+    print(f"Frequencies: {frequencies}")
+    # A replica is read when the other one of the pair is more loaded: 3 pairs of 6, 2 pairs, 1 pair, none
+    for position, expected in enumerate((3 / 6, 2 / 6, 1 / 6, 0)):
+        assert abs(frequencies[position] - expected) < 0.03
+
+    # With two replicas both are inspected, then the EWMA breaks the tie of the loads
+    selector.reset()
+    selector.on_read(0, 0, 8)
+    selector.on_read(1, 0, 4)
+    assert selector.select([0, 1], 2, 10) == 1
+
+def test_hedged_delay():
+    """The hedge delay of a tier is the percentile of its read times, once it has enough samples."""
+    print("=== Testing the hedge delays ===")
+    system = HierarchicalStorageSystem()
+    node_manager = system.data_manager.node_manager
+    selector = HedgedReplicaSelector(node_manager, hedge_percentile=90, min_samples=10, refresh_interval=10)
+    fast_index, slow_index = (
+        node_manager.nodes_by_index.index(system.get_nodes(node_type)[0])
+        for node_type in (StorageNodeType.FAST, StorageNodeType.SLOW)
+    )
+    for response_time in range(1, 10):
+        selector.on_read(slow_index, 0, response_time)
+    assert selector.hedge_delay(slow_index) is None
+    selector.on_read(slow_index, 0, 10)
+    # The 9th of the 10 sorted times, within the precision of the histogram
+    assert math.isclose(selector.hedge_delay(slow_index), 9, rel_tol=0.01)
+    assert selector.hedge_delay(fast_index) is None
+
+def test_hedged_read_takes_first_answer():
+    """A read slower than the hedge delay reads a second replica and returns with the first to answer."""
+    print("=== Testing hedged reads ===")
+    system = create_reliable_system({
+        "read_quorum": 1,
+        "replica_selection": {"name": "hedged", "hedge_percentile": 1, "min_samples": 1, "refresh_interval": 1000},
+    })
+    selector = system.data_manager.replica_selector
+    node_manager = system.data_manager.node_manager
+    system.write_to_node(StorageNodeType.SLOW, DataObject(id="file", size=2000), 0)
+    slow_index = node_manager.nodes_by_index.index(system.get_nodes(StorageNodeType.SLOW)[0])
+    # A delay near the lowest time the histogram tells apart, every read is hedged. It is not
+    # refreshed before 1000 more reads.
+    for _ in range(1000):
+        selector.on_read(slow_index, 0, 0.001)
+    hedge_delay = selector.hedge_delay(slow_index)
+    assert math.isclose(hedge_delay, 0.001, rel_tol=0.01)
+
+    before = node_response_times(system, StorageNodeType.SLOW, RequestType.READ)
+    client_time = system.read_data("file", 1)
+    latencies = replica_latencies(before, node_response_times(system, StorageNodeType.SLOW, RequestType.READ))
+    print(f"Replicas {[round(latency, 3) for latency in latencies]}, client {client_time:.3f} ms, stats {selector.stats}")
+    assert len(latencies) == 2 and selector.stats.hedged_reads == 1
+    hedge_time = selector.stats.hedge_device_time
+    primary_time = latencies[1] if math.isclose(hedge_time, latencies[0]) else latencies[0]
+    assert math.isclose(hedge_time, sum(latencies) - primary_time)
+    # The first answer, the second replica started hedge_delay later
+    assert math.isclose(client_time, min(primary_time, hedge_delay + hedge_time))
+    assert selector.stats.hedge_wins == (hedge_delay + hedge_time < primary_time)
+    assert math.isclose(selector.stats.hedge_time_saved, max(primary_time - client_time, 0), abs_tol=1e-9)
+    assert selector.hedge_delay(slow_index) == hedge_delay
+
+if __name__ == "__main__":
+    test_uniform_by_default()
+    test_least_outstanding()
+    test_ewma()
+    test_power_of_two()
+    test_hedged_delay()
+    test_hedged_read_takes_first_answer()
+    print("\nAll replica selection tests passed.")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the Monte Carlo replicate runner (Simulation.ReplicateRunner).
+
+It checks the Student t quantiles against tabulated values, that replicates run in parallel
+batches give the same metrics and estimates as the same seeds simulated one by one, and that the
+stopping rule is reached by metrics whose mean is near 0.
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Simulation import Simulator
+from Simulation.Trace import Trace
+from Simulation.ReplicateRunner import ReplicateRunner, t_quantile
+from Algorithms.Heuristic import TimeGreedy
+
+# Two-sided 95% quantiles of the Student t distribution per degrees of freedom
+T_TABLE = {1: 12.7062, 2: 4.3027, 3: 3.1824, 5: 2.5706, 10: 2.2281, 30: 2.0423}
+
+def create_trace(num_operations: int = 1500, num_files: int = 200, seed: int = 3) -> Trace:
+    """Create a seeded access pattern of writes, reads and deletes 50 ms apart on average."""
+    rng = random.Random(seed)
+    operations = []
+    written = set()
+    time = 0.0
+    for i in range(num_operations):
+        time += rng.expovariate(1 / 50)
+        file_id = f"file_{rng.randrange(num_files)}"
+        if file_id not in written or rng.random() < 0.2:
+            operation_type = "write"
+            written.add(file_id)
+        elif rng.random() < 0.1:
+            operation_type = "delete"
+            written.discard(file_id)
+        else:
+            operation_type = "read"
+        operations.append({
+            "file_id": file_id,
+            "size": rng.randint(10, 5000),
+            "operation_type": operation_type,
+            "time": round(time, 3),
+            "operation_num": i,
+        })
+    return Trace.from_operations(operations)
+
+def test_t_quantile():
+    """t_quantile() matches the tabulated quantiles."""
+    print("=== Testing Student t quantiles ===")
+    for degrees_of_freedom, expected in T_TABLE.items():
+        quantile = t_quantile(0.975, degrees_of_freedom)
+        print(f"  df={degrees_of_freedom}: {quantile:.4f} (table {expected})")
+        assert math.isclose(quantile, expected, abs_tol=1e-4)
+
+def test_batches_match_single_runs():
+    """Replicates run in parallel batches equal the same seeds simulated one by one."""
+    print("=== Testing replicate batches against single runs ===")
+    trace = create_trace()
+    runner = ReplicateRunner(trace, TimeGreedy, min_replicates=4, max_replicates=4, max_workers=2, base_seed=10)
+    estimates = runner.run()
+
+    single_runs = []
+    for seed in range(10, 14):
+        random.seed(seed)
+        np.random.seed(seed)
+        metrics = Simulator.simulate(trace, TimeGreedy).metrics
+        single_runs.append({name: value for name, value in metrics.items() if name != "algorithm"})
+
+    print(f"Replicates: {len(runner.replicates)}, metrics: {len(estimates)}")
+    assert runner.replicates == single_runs
+    for name, estimate in estimates.items():
+        values = [run[name] for run in single_runs]
+        assert estimate.num_replicates == 4
+        assert math.isclose(estimate.mean, float(np.mean(values)), rel_tol=1e-12, abs_tol=1e-12)
+
+def test_near_zero_mean_is_precise():
+    """A count of rare events is precise within ±0.5, no relative half-width is reached by its mean near 0."""
+    print("=== Testing the stopping rule on a near-zero mean ===")
+    runner = ReplicateRunner(create_trace(10), TimeGreedy, relative_half_width=0.05, min_replicates=6)
+    # One unsuccessful read in six replicates: mean 1/6, half-width 2.5706 * 0.4082 / sqrt(6) = 0.428
+    runner.replicates = [
+        {"total_cost": 100.0 + i % 2, "total_num_unsuccessful_read": int(i == 3)} for i in range(6)
+    ]
+    estimate = runner.estimate()["total_num_unsuccessful_read"]
+    print(f"Mean {estimate.mean:.4f}, half-width {estimate.half_width:.4f}")
+    assert math.isclose(estimate.half_width, 0.428, abs_tol=1e-3)
+    assert not estimate.is_precise(0.05)
+    assert estimate.is_precise(0.05, runner.get_absolute_half_width("total_num_unsuccessful_read"))
+    assert runner.get_absolute_half_width("total_cost") == 0.0
+    assert runner._is_precise()
+
+    # Without the absolute half-width of the counts, only max_replicates would stop the runner
+    runner.absolute_half_widths = {"total_num_unsuccessful_read": 0.0}
+    assert not runner._is_precise()
+
+if __name__ == "__main__":
+    test_t_quantile()
+    test_batches_match_single_runs()
+    test_near_zero_mean_is_precise()
+    print("\nAll replicate runner tests passed.")
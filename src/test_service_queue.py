@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the FIFO service queues of the nodes and media (ServiceQueue).
+
+It checks the waiting times, queue depths and utilization of a queue against values worked out
+by hand, and that the queues are switched on per storage system by its "service_queue" setting.
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator, ServiceQueue
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG, SERVICE_QUEUE_CONFIG
+from Storage.storage_types import StorageNodeType, DataObject
+
+def test_waits_with_two_channels():
+    """Requests beyond the free channels wait for the earliest channel to free up."""
+    print("=== Testing waits with two channels ===")
+    queue = ServiceQueue(num_channels=2)
+    # Channels free at 10 and 10, then 10 and 20, then 20 and 20
+    assert [queue.serve(0, 10), queue.serve(0, 10), queue.serve(0, 10), queue.serve(5, 10)] == [0, 0, 10, 5]
+    # The third request was still queued (starts at 10) when the fourth arrived
+    assert queue.max_queue_depth == 1
+    assert math.isclose(queue.get_mean_queue_depth(), 1 / 4)
+    assert math.isclose(queue.get_mean_wait_time(), 15 / 4)
+    # 40 ms of service on 2 channels from 0 to 20 ms
+    assert math.isclose(queue.get_utilization(), 1.0)
+
+    assert queue.serve(30, 10) == 0
+    print(f"Summary: {queue.get_summary()}")
+    assert math.isclose(queue.get_utilization(), 50 / (2 * 40))
+
+    queue.reset()
+    assert queue.num_served == 0 and queue.serve(0, 10) == 0
+
+def test_out_of_order_arrival():
+    """A request arriving before an admitted one is accepted and waits behind it."""
+    print("=== Testing out-of-order arrivals ===")
+    queue = ServiceQueue(num_channels=1)
+    assert queue.serve(10, 5) == 0
+    # Arrives before the first request but is admitted after it, it waits for its channel
+    assert queue.serve(8, 5) == 7
+    assert queue.serve(30, 5) == 0
+    assert queue.num_served == 3 and queue.max_queue_depth == 0
+
+def write_burst(config: dict = None, num_files: int = 30) -> HierarchicalStorageSystem:
+    """Write files to the FAST tier all at simulated time 0, with the same seed on every system."""
+    random.seed(3)
+    np.random.seed(3)
+    system = HierarchicalStorageSystem({**HIERARCHICAL_STORAGE_CONFIG, **(config or {})})
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    for i in range(num_files):
+        try:
+            system.write_to_node(StorageNodeType.FAST, DataObject(id=f"file_{i}", size=1000), i)
+        except Exception:
+            # Failed writes are part of the model
+            continue
+    return system
+
+def test_queues_enabled_per_system():
+    """The "service_queue" setting of a system switches its queues, the module config is left as is."""
+    print("=== Testing service queues enabled per system ===")
+    assert not SERVICE_QUEUE_CONFIG["enabled"]
+    queued = write_burst({"service_queue": {"enabled": True}})
+    plain = write_burst()
+    assert not SERVICE_QUEUE_CONFIG["enabled"]
+
+    for node in plain.get_all_nodes():
+        assert node.service_queue is None
+        assert all(medium.service_queue is None for medium in node.storage_media)
+
+    fast_nodes = queued.get_nodes(StorageNodeType.FAST)
+    for node in queued.get_all_nodes():
+        assert node.service_queue is not None
+        assert all(medium.service_queue is not None for medium in node.storage_media)
+    total_wait = sum(node.service_queue.total_wait_time for node in fast_nodes)
+    print(f"Write time without queues {plain.get_total_write_response_time():.3f} ms, "
+          f"with queues {queued.get_total_write_response_time():.3f} ms, node waits {total_wait:.3f} ms")
+    assert sum(node.service_queue.num_served for node in fast_nodes) > 0
+    # Simultaneous writes beyond the channels of a node wait for them
+    assert total_wait > 0
+    assert queued.get_total_write_response_time() > plain.get_total_write_response_time()
+
+if __name__ == "__main__":
+    test_waits_with_two_channels()
+    test_out_of_order_arrival()
+    test_queues_enabled_per_system()
+    print("\nAll service queue tests passed.")
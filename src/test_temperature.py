@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized temperature kernel (Storage.temperature.compute_temperatures).
+
+It checks that the kernel matches the scalar DataObject.get_temperature() to floating-point
+tolerance on a seeded file population, including the ratio > 0.8 switch, the clamped exponents
+and the max with hotness_level, and reports the speedup.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage.storage_types import DataObject
+from Storage.temperature import compute_temperatures
+
+NUM_FILES = 100_000
+
+def create_population(num_files: int = NUM_FILES, seed: int = 4):
+    """Create data objects covering cold, warm, hot and overflowing exponents."""
+    rng = random.Random(seed)
+    data_objects = []
+    for i in range(num_files):
+        data_object = DataObject(id=f"file_{i}", size=rng.choice((0, 1, rng.randint(1, 100), rng.randint(1, 10**6))))
+        data_object._num_read_access = rng.choice((0, 1, rng.randint(0, 50), rng.randint(0, 10**6)))
+        data_object._num_write_access = rng.randint(0, 3)
+        data_object.hotness_level = rng.choice((0.0, 0.0, rng.random(), 1.0))
+        data_objects.append(data_object)
+    return data_objects
+
+def test_vectorized_matches_scalar():
+    """compute_temperatures() gives the temperatures of get_temperature()."""
+    print("=== Testing vectorized temperatures against scalar temperatures ===")
+    data_objects = create_population()
+    total_accesses = np.array([data_object.get_total_accesses() for data_object in data_objects], dtype=np.float64)
+    sizes = np.array([data_object.size for data_object in data_objects], dtype=np.float64)
+    hotness_levels = np.array([data_object.hotness_level for data_object in data_objects])
+
+    start = time.perf_counter()
+    expected = np.array([data_object.get_temperature() for data_object in data_objects])
+    scalar_time = time.perf_counter() - start
+    start = time.perf_counter()
+    temperatures = compute_temperatures(total_accesses, sizes, hotness_levels)
+    vectorized_time = time.perf_counter() - start
+
+    print(f"Files: {len(data_objects)}, scalar {scalar_time:.3f}s, vectorized {vectorized_time:.4f}s, "
+          f"speedup {scalar_time / vectorized_time:.0f}x")
+    np.testing.assert_allclose(temperatures, expected, rtol=1e-12, atol=1e-15)
+
+def test_ratio_switch():
+    """Files on both sides of the ratio > 0.8 switch pick the same branch as the scalar version."""
+    print("=== Testing the ratio switch ===")
+    data_objects = []
+    for size in range(0, 2000, 7):
+        data_object = DataObject(id=f"file_{size}", size=size)
+        data_object._num_read_access = 1
+        data_objects.append(data_object)
+
+    temperatures = compute_temperatures(
+        np.ones(len(data_objects)),
+        np.array([data_object.size for data_object in data_objects], dtype=np.float64),
+        np.zeros(len(data_objects)),
+    )
+    expected = np.array([data_object.get_temperature() for data_object in data_objects])
+    np.testing.assert_allclose(temperatures, expected, rtol=1e-12, atol=1e-15)
+
+if __name__ == "__main__":
+    test_vectorized_matches_scalar()
+    test_ratio_switch()
+    print("\nAll temperature tests passed.")
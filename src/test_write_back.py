@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the write-back buffer of the FAST tier (WriteBackBuffer).
+
+A buffer of 1000 KB per FAST medium, destaged at 10 KB/ms per medium, is driven past the capacity
+of one of its shards. The stall, coalescing, destage and occupancy figures are checked against
+values worked out by hand, the destages being recorded instead of written to a tier. On a system
+whose nodes never fail, buffered writes are checked to reach their tier when they are destaged.
+"""
+
+import copy
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from Storage import HierarchicalStorageSystem, MetricsCalculator
+from Storage.HierarchicalStorage.WriteBackBuffer import WriteBackBuffer
+from Storage.RandomStream import GLOBAL_RANDOM
+from Storage.storage_config import HIERARCHICAL_STORAGE_CONFIG, WRITE_BACK_CONFIG, STORAGE_NODE_CONFIG, STORAGE_MEDIUM_CONFIG
+from Storage.storage_types import StorageNodeType, StorageMediumType, DataObject, OperationOutcome
+
+# 3 FAST media of 10000 KB, a tenth of which is buffer, destaged at 10 KB/ms each
+BUFFER_CONFIG = {"enabled": True, "capacity_fraction": 0.1, "bandwidth": 30}
+
+def create_reliable_system(config: dict = None) -> HierarchicalStorageSystem:
+    """Create a system with FAST media of 10000 KB whose nodes and media never fail."""
+    node_config = copy.deepcopy(STORAGE_NODE_CONFIG)
+    for parameters in node_config.values():
+        parameters.update(availability=1.0, failure_rate=0.0)
+    medium_config = copy.deepcopy(STORAGE_MEDIUM_CONFIG)
+    for parameters in medium_config.values():
+        parameters.update(availability=1.0, error_rate=0.0)
+    medium_config[StorageMediumType.NVMe]["capacity"] = 10000
+
+    random.seed(6)
+    np.random.seed(6)
+    system = HierarchicalStorageSystem({**HIERARCHICAL_STORAGE_CONFIG, **(config or {})}, node_config, medium_config)
+    system.initialize_metrics_calculator(MetricsCalculator(system))
+    return system
+
+def test_shard_past_capacity():
+    """Overwrites coalesce, a write to a full shard stalls until the destage frees its space."""
+    print("=== Testing a buffer shard past its capacity ===")
+    system = create_reliable_system()
+    destaged = []
+    failing = set()
+
+    def destage(write, stream):
+        destaged.append(write.data.id)
+        return (OperationOutcome.FAILURE, 0) if write.data.id in failing else (OperationOutcome.SUCCESS, 5.0)
+
+    buffer = WriteBackBuffer(system.data_manager.node_manager, BUFFER_CONFIG, destage)
+    # Data IDs of the same shard
+    shard = buffer.shards[0]
+    first, second, third = [data_id for data_id in (f"file_{i}" for i in range(100)) if buffer._shard(data_id) is shard][:3]
+    failing.add(third)
+    assert shard.capacity == 1000 and shard.bandwidth == 10 and shard.medium.capacity == 9000
+
+    def write(data_id: str, size: int, now: float) -> float:
+        before = shard.node.total_write_response_time
+        outcome, response_time = buffer.try_write(DataObject(id=data_id, size=size), StorageNodeType.SLOW, 0, now, GLOBAL_RANDOM)
+        assert outcome == OperationOutcome.SUCCESS
+        assert shard.medium.buffer_used == shard.used
+        # Client time = stall + the write of the node to its buffer slice, to the rounding of the node total
+        return round(response_time - (shard.node.total_write_response_time - before), 9)
+
+    # 0 ms: 600 KB. 10 ms: 100 KB of it destaged, 300 KB more fit (900 KB)
+    assert write(first, 600, 0) == 0
+    assert write(second, 300, 10) == 0
+    assert shard.used == 900 and shard.head_progress == 100
+
+    # 20 ms: the overwrite of the first write replaces it, its 200 KB destaged are lost, 500 KB used
+    assert write(first, 200, 20) == 0
+    assert buffer.stats.coalesced == 1 and buffer.stats.coalesced_kb == 600
+    assert shard.used == 500 and list(shard.writes) == [second, first]
+    # The second write (300 KB) is destaged at 20 + 30 = 50 ms, the first one (200 KB) at 70 ms
+    assert shard.time_when_free(300) == 50 and shard.time_when_free(301) == 70
+    assert buffer.next_destage_time() == 50
+
+    # 30 ms: 700 KB need 1200 KB, the write stalls until 200 KB are freed, at 50 ms
+    assert write(third, 700, 30) == 20
+    assert buffer.stats.stalls == 1 and buffer.stats.stall_time == 20
+    assert destaged == [second] and shard.used == 900
+
+    # The first write is destaged at 70 ms, the third one at 70 + 70 = 140 ms and fails
+    assert not buffer.advance(60, GLOBAL_RANDOM)
+    assert buffer.advance(200, GLOBAL_RANDOM)
+    stats = buffer.stats
+    print(f"Stats: {stats}")
+    assert destaged == [second, first, third]
+    assert stats.destages == 3 and stats.destaged_kb == 1200 and stats.destage_failures == 1
+    assert stats.destage_time > 2 * 5.0
+    assert stats.buffered_writes == 4 and stats.buffered_kb == 1800 and stats.max_occupancy == 900
+    assert shard.used == 0 and shard.medium.buffer_used == 0 and buffer.next_destage_time() == float("inf")
+
+    # KB in the buffer: 600 × 10 + 900 × 10 + 500 × 20 + 900 × 20 + 700 × 70 over 200 ms
+    assert buffer.get_mean_occupancy(200) == 97000 / 200
+
+    # A delete of buffered data drops its write before its destage
+    write(first, 100, 200)
+    assert buffer.discard(first) is not None and buffer.discard(first) is None
+    assert buffer.stats.discarded == 1 and shard.used == 0 and shard.medium.buffer_used == 0
+
+def test_destage_to_tier():
+    """A buffered write is acknowledged by the buffer and stored on its tier by its destage."""
+    print("=== Testing the destage to the tiers ===")
+    system = create_reliable_system({"write_back": BUFFER_CONFIG})
+    buffer = system.data_manager.write_buffer
+    system.write_to_node(StorageNodeType.SLOW, DataObject(id="file", size=500), 0)
+    assert "file" in buffer and buffer.stats.buffered_writes == 1
+    assert all(node.num_writes == 0 for node in system.get_nodes(StorageNodeType.SLOW))
+    # The buffered data is read from the buffer
+    system.read_data("file", 1)
+    assert buffer.stats.reads == 1
+
+    # 500 KB at 10 KB/ms
+    assert system.next_tick_time == 50
+    system.tick(50)
+    assert "file" not in buffer and buffer.stats.destages == 1
+    assert system.data_manager.get_data_tier("file") == StorageNodeType.SLOW
+    assert sum(node.num_writes for node in system.get_nodes(StorageNodeType.SLOW)) == 3
+
+def test_disabled_by_default():
+    """The write-back buffer is off by default and reserves no FAST capacity."""
+    print("=== Testing the write-back buffer disabled by default ===")
+    assert not WRITE_BACK_CONFIG["enabled"]
+    system = HierarchicalStorageSystem()
+    assert system.data_manager.write_buffer is None
+    assert all(medium.buffer_capacity == 0 for node in system.get_all_nodes() for medium in node.storage_media)
+
+if __name__ == "__main__":
+    test_shard_past_capacity()
+    test_destage_to_tier()
+    test_disabled_by_default()
+    print("\nAll write-back buffer tests passed.")
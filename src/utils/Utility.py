@@ -54,6 +54,10 @@ def calculate_optimization_value(cost, response_time, replicas, unavailability,
 
     return optimization_value
 
+def format_energy(joules: float) -> str:
+    """Format an energy in joules together with its value in kWh."""
+    return f"{joules:.3f} J ({joules / 3_600_000:.6f} kWh)"
+
 def format_data_size(file_size: int) -> str:
     """
     Formats the file size into KB, MB, or GB.
@@ -1,7 +1,9 @@
 import logging
 import os
+import io
 import datetime
 import csv
+from contextlib import contextmanager
 
 # Toggle to control whether logs are printed to the console
 SHOW_CONSOLE_LOG = False  # Set to False to disable console output
@@ -22,6 +24,18 @@ MAIN_LOG_FILE = os.path.join(LOG_DIR, f"{time} - project.log")
 RESULT_LOG_FILE = os.path.join(LOG_DIR, f"{time} - results.log")
 RESULT_CSV_FILE = os.path.join(LOG_DIR, f"{time} - results.csv")
 
+def get_series_file_path(name: str) -> str:
+    """Path of a binary metrics series file of this run."""
+    return os.path.join(LOG_DIR, f"{time} - {name} - series.bin")
+
+def get_tiers_info_file_path(name: str) -> str:
+    """Path of the tiers information JSONL file of a simulation of this run."""
+    return os.path.join(LOG_DIR, f"{time} - {name} - tiers_info.jsonl")
+
+def get_checkpoint_file_path(name: str) -> str:
+    """Path of the checkpoint file of a simulation of this run."""
+    return os.path.join(LOG_DIR, f"{time} - {name} - checkpoint.bin")
+
 def setup_logger(
     name="ProjectLogger", 
     log_file=MAIN_LOG_FILE, 
@@ -114,3 +128,19 @@ def result_logger(name="ResultLogger",
 # Initialize the loggers
 logger = setup_logger()
 resultLogger = result_logger()
+
+@contextmanager
+def capture_result_log():
+    """
+    Redirect the result logger to a string buffer, e.g. in a worker process whose results
+    are logged by the parent process.
+    """
+    buffer = io.StringIO()
+    handler = logging.StreamHandler(buffer)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handlers = resultLogger.handlers[:]
+    resultLogger.handlers = [handler]
+    try:
+        yield buffer
+    finally:
+        resultLogger.handlers = handlers